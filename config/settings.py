@@ -87,6 +87,8 @@ else:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            # 테스트 DB도 파일로 (in-memory 공유 캐시는 동시 쓰기 시 즉시 table locked 에러)
+            'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
         }
     }
 
@@ -124,6 +126,9 @@ STORAGES = {
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
+# 캐시 버전(CacheVersion 테이블) 확인 주기(초) - 다른 프로세스의 변경은 최대 이만큼 늦게 반영
+VERSION_CHECK_INTERVAL = float(os.getenv('VERSION_CHECK_INTERVAL', '1'))
+
 # 스태프 인증
 STAFF_PASSWORD = os.getenv('STAFF_PASSWORD', 'q51!')
 
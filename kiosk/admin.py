@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import CarBrand, CarModel, FuelType, EngineOil, OilProduct, OilPrice
+from django.db import transaction
+
+from . import pricing
+from .models import CarBrand, CarModel, FuelType, EngineOil, OilProduct, OilPrice, OilPriceRevision
 
 
 @admin.register(CarBrand)
@@ -47,3 +50,44 @@ class OilPriceAdmin(admin.ModelAdmin):
     list_filter = ['oil_product', 'fuel_type', 'car_model__brand']
     search_fields = ['car_model__name', 'car_model__parent__name']
     list_editable = ['price']
+
+    # 저장/삭제는 직원 가격 저장과 같은 일괄 반영 경로로 → 가격 이력 기록, 매트릭스 버전 1회 증가
+
+    def save_model(self, request, obj, form, change):
+        key = (obj.car_model_id, obj.oil_product_id, obj.fuel_type_id)
+        cells = {}
+        if change:
+            old = OilPrice.objects.values_list('car_model_id', 'oil_product_id', 'fuel_type_id').get(pk=obj.pk)
+            cells[old] = None
+        cells[key] = obj.price
+        with transaction.atomic():
+            pricing.bulk_apply(cells)
+        obj.pk = OilPrice.objects.values_list('pk', flat=True).get(
+            car_model_id=key[0], oil_product_id=key[1], fuel_type_id=key[2],
+        )
+
+    def delete_model(self, request, obj):
+        self.delete_queryset(request, OilPrice.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        keys = queryset.values_list('car_model_id', 'oil_product_id', 'fuel_type_id')
+        with transaction.atomic():
+            pricing.bulk_apply(dict.fromkeys(keys))
+
+
+@admin.register(OilPriceRevision)
+class OilPriceRevisionAdmin(admin.ModelAdmin):
+    """가격 이력은 추가 전용 - 조회만"""
+    list_display = ['car_model_name', 'oil_product', 'fuel_type', 'price', 'effective_from', 'source', 'applied_at']
+    list_filter = ['source', 'oil_product', 'fuel_type', 'car_model__brand']
+    search_fields = ['car_model_name']
+    date_hierarchy = 'effective_from'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
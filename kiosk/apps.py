@@ -4,3 +4,40 @@ from django.apps import AppConfig
 class KioskConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'kiosk'
+
+    def ready(self):
+        from django.db.models.signals import post_save, post_delete
+        from . import catalog, price_history, pricing, views
+        from .models import CarBrand, CarModel, FuelType, OilProduct, OilPrice, AdditionalService
+        from .models import Reservation, ServiceOrder, ServiceOrderItem, service_item_changed, order_saved, order_deleted
+
+        # 카탈로그 스냅샷 무효화
+        for model in (CarBrand, CarModel, FuelType):
+            post_save.connect(catalog.invalidate, sender=model, dispatch_uid=f'catalog_save_{model.__name__}')
+            post_delete.connect(catalog.invalidate, sender=model, dispatch_uid=f'catalog_delete_{model.__name__}')
+
+        # 가격 매트릭스 증분 갱신 / 무효화
+        post_save.connect(pricing.on_price_saved, sender=OilPrice, dispatch_uid='price_matrix_save')
+        post_delete.connect(pricing.on_price_deleted, sender=OilPrice, dispatch_uid='price_matrix_delete')
+        for model in (OilProduct, FuelType):
+            post_save.connect(pricing.invalidate, sender=model, dispatch_uid=f'price_matrix_save_{model.__name__}')
+            post_delete.connect(pricing.invalidate, sender=model, dispatch_uid=f'price_matrix_delete_{model.__name__}')
+
+        # 추가 서비스 캐시 버전
+        post_save.connect(pricing.invalidate_services, sender=AdditionalService, dispatch_uid='service_save')
+        post_delete.connect(pricing.invalidate_services, sender=AdditionalService, dispatch_uid='service_delete')
+
+        # 추가 서비스 가격 이력
+        post_save.connect(price_history.on_service_saved, sender=AdditionalService, dispatch_uid='service_price_revision')
+
+        # 주문 합계 (비정규화) 갱신
+        post_save.connect(service_item_changed, sender=ServiceOrderItem, dispatch_uid='order_totals_save')
+        post_delete.connect(service_item_changed, sender=ServiceOrderItem, dispatch_uid='order_totals_delete')
+
+        # 일별 주문 집계 증분 갱신
+        post_save.connect(order_saved, sender=ServiceOrder, dispatch_uid='daily_stats_save')
+        post_delete.connect(order_deleted, sender=ServiceOrder, dispatch_uid='daily_stats_delete')
+
+        # 오늘의 현황 사이드바 - 삭제는 델타 피드 리셋
+        for model in (Reservation, ServiceOrder):
+            post_delete.connect(views.on_sidebar_item_deleted, sender=model, dispatch_uid=f'sidebar_delete_{model.__name__}')
@@ -0,0 +1,157 @@
+"""
+차종 카탈로그 스냅샷
+브랜드 → 차종 → 세대 트리를 카탈로그 버전별로 한 번만 빌드하고 JSON을 미리 인코딩해 둔다.
+CarBrand/CarModel/FuelType 저장·삭제 시그널로 버전을 올려 무효화한다.
+버전 카운터(카탈로그·가격 매트릭스·추가 서비스)는 CacheVersion 테이블에 두어 웹 워커와 커맨드 프로세스가 공유한다.
+"""
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from .models import CacheVersion, CarBrand, CarModel, FuelType
+
+VERSION_KEY = 'kiosk:catalog_version'
+
+# 스냅샷 캐시 (프로세스 레벨)
+_snapshot_cache = {
+    'version': None,
+    'snapshot': None,
+}
+_build_lock = threading.Lock()
+
+# 버전 카운터 프로세스 메모 (원본은 CacheVersion 테이블)
+_versions = {
+    'values': {},
+    'checked_at': None,
+}
+_versions_lock = threading.Lock()
+
+
+class CatalogSnapshot:
+    """카탈로그 스냅샷 (읽기 전용)"""
+
+    def __init__(self, version, brands, fuels):
+        self.version = version
+        self.brands = brands
+        self.fuels = fuels
+        self.brand_map = {b['id']: b for b in brands}
+        self.fuel_map = {f['id']: f for f in fuels}
+
+        # 차종/세대 id → 표시용 정보 (템플릿에서 car_model.parent.name 형태로 사용)
+        self.model_map = {}
+        for b in brands:
+            for m in b['models']:
+                self.model_map[m['id']] = {'id': m['id'], 'name': m['name'], 'brand_id': b['id'], 'parent': None}
+                for g in m.get('generations', ()):
+                    self.model_map[g['id']] = {
+                        'id': g['id'], 'name': g['name'], 'brand_id': b['id'],
+                        'parent': {'id': m['id'], 'name': m['name']},
+                    }
+        self.brands_json = json.dumps(brands, ensure_ascii=False)
+        self.brands_flat_json = json.dumps([
+            {
+                'id': b['id'],
+                'name': b['name'],
+                'models': [{'id': m['id'], 'name': m['name']} for m in b['models']],
+            }
+            for b in brands
+        ], ensure_ascii=False)
+        self.fuels_json = json.dumps(fuels, ensure_ascii=False)
+
+
+def _check_interval():
+    return getattr(settings, 'VERSION_CHECK_INTERVAL', 1.0)
+
+
+def get_version(key=VERSION_KEY, fresh=False):
+    """
+    현재 버전 (DB 공유). 프로세스 메모를 VERSION_CHECK_INTERVAL초마다 전체 키 쿼리 1회로 갱신하므로
+    다른 프로세스(임포트/cron 커맨드, 다른 워커)의 변경은 최대 그만큼 늦게 보인다.
+    fresh=True면 메모를 건너뛰고 DB에서 바로 읽는다 (클라이언트에 돌려주는 버전 등).
+    """
+    now = time.monotonic()
+    checked_at = _versions['checked_at']
+    if fresh or checked_at is None or now - checked_at >= _check_interval():
+        stored = CacheVersion.objects.values_list('key', 'version')
+        with _versions_lock:
+            values = _versions['values']
+            for k, v in stored:
+                # 단조 증가 - 이 프로세스가 이미 본 값보다 내려가지 않게 (롤백된 증가 등)
+                values[k] = max(v, values.get(k, 1))
+            _versions['checked_at'] = now
+    return _versions['values'].get(key, 1)
+
+
+def bump_version(key=VERSION_KEY):
+    """버전 증가 → 모든 프로세스의 캐시 무효화 (행 잠금으로 원자적 증가). 새 버전 반환"""
+    known = _versions['values'].get(key, 1)
+    for attempt in range(2):
+        try:
+            with transaction.atomic():
+                row = CacheVersion.objects.select_for_update().filter(key=key).first()
+                if row is None:
+                    row = CacheVersion.objects.create(key=key, version=known + 1)
+                else:
+                    row.version = max(row.version, known) + 1
+                    row.save(update_fields=['version'])
+            break
+        except IntegrityError:
+            # 다른 프로세스가 먼저 행을 만듦 → 잠그고 다시 증가
+            if attempt:
+                raise
+    with _versions_lock:
+        _versions['values'][key] = max(row.version, _versions['values'].get(key, 1))
+    return row.version
+
+
+def _build(version):
+    """브랜드/차종/세대/연료 스냅샷 빌드 (쿼리 3회)"""
+    models_by_brand = {}
+    generations_by_parent = {}
+    for m in CarModel.objects.order_by('order', 'name').values('id', 'name', 'brand_id', 'parent_id'):
+        if m['parent_id'] is None:
+            models_by_brand.setdefault(m['brand_id'], []).append(m)
+        else:
+            generations_by_parent.setdefault(m['parent_id'], []).append({'id': m['id'], 'name': m['name']})
+
+    brands = []
+    for brand in CarBrand.objects.values('id', 'name'):
+        models_data = []
+        for m in models_by_brand.get(brand['id'], []):
+            model_info = {'id': m['id'], 'name': m['name']}
+            gens = generations_by_parent.get(m['id'])
+            if gens:
+                model_info['generations'] = gens
+            models_data.append(model_info)
+        brands.append({
+            'id': brand['id'],
+            'name': brand['name'],
+            'models': models_data,
+        })
+
+    fuels = list(FuelType.objects.values('id', 'name'))
+    return CatalogSnapshot(version, brands, fuels)
+
+
+def get_snapshot():
+    """현재 버전의 카탈로그 스냅샷 반환 (버전이 같으면 DB 조회 없음)"""
+    version = get_version()
+    snapshot = _snapshot_cache['snapshot']
+    if snapshot is not None and _snapshot_cache['version'] == version:
+        return snapshot
+
+    with _build_lock:
+        snapshot = _snapshot_cache['snapshot']
+        if snapshot is None or _snapshot_cache['version'] != version:
+            snapshot = _build(version)
+            _snapshot_cache['snapshot'] = snapshot
+            _snapshot_cache['version'] = version
+    return snapshot
+
+
+def invalidate(**kwargs):
+    """시그널 핸들러: 카탈로그 변경 시 (커밋 후) 버전 증가"""
+    transaction.on_commit(bump_version)
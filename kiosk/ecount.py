@@ -5,15 +5,25 @@
 import json
 import logging
 import math
-import urllib.request
-from datetime import datetime, timedelta
+import time
+from datetime import timedelta
 
 from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
 from django.utils import timezone
 
+from .integrations import IntegrationError, get_client, maybe_sent
+from .models import EcountSession, EcountSlipJob, ServiceOrder, business_date
+
 logger = logging.getLogger(__name__)
 
-# 세션 캐시 (프로세스 레벨)
+# 세션은 EcountSession 행(pk=1)에 두고 워커끼리 공유, 프로세스에는 사본만 보관
+SESSION_TTL = 1080  # 18분 (세션 20분, 여유 2분)
+LOGIN_LEASE = 30  # 로그인 진행 표시 유지 시간(초) - 로그인 워커가 죽으면 이후 다른 워커가 이어받음
+LOGIN_POLL = 0.1
+
+# 세션 사본 (프로세스 레벨)
 _session_cache = {
     'session_id': None,
     'host_url': None,
@@ -21,10 +31,16 @@ _session_cache = {
 }
 
 
-def _login():
-    """이카운트 로그인 → SESSION_ID 반환"""
+def _client(host):
+    """이카운트 호스트별 공유 HTTP 클라이언트"""
+    if not host.startswith('http'):
+        host = f'https://{host}'
+    return get_client('ecount', host, connect_timeout=3, read_timeout=15)
+
+
+def _request_login():
+    """OAPILogin 호출 → (SESSION_ID, HOST_URL)"""
     zone = settings.ECOUNT_ZONE
-    url = f'https://oapi{zone}.ecount.com/OAPI/V2/OAPILogin'
     data = {
         'COM_CODE': settings.ECOUNT_COM_CODE,
         'USER_ID': settings.ECOUNT_USER_ID,
@@ -32,59 +48,99 @@ def _login():
         'LAN_TYPE': 'ko-KR',
         'ZONE': zone,
     }
-    req = urllib.request.Request(
-        url,
-        data=json.dumps(data).encode('utf-8'),
-        headers={'Content-Type': 'application/json'},
+    # 로그인은 재시도해도 세션만 새로 발급되므로 멱등 취급
+    resp = _client(f'oapi{zone}.ecount.com').post(
+        '/OAPI/V2/OAPILogin', json=data, endpoint='OAPILogin', idempotent=True, timeout=(3, 10),
     )
-    resp = urllib.request.urlopen(req, timeout=10)
-    result = json.loads(resp.read().decode('utf-8'))
+    result = resp.json()
 
     if result.get('Data', {}).get('Code') != '00':
         raise Exception(f"이카운트 로그인 실패: {result}")
 
     datas = result['Data']['Datas']
-    _session_cache['session_id'] = datas['SESSION_ID']
-    _session_cache['host_url'] = datas['HOST_URL']
-    _session_cache['logged_in_at'] = datetime.now()
+    return datas['SESSION_ID'], datas.get('HOST_URL') or ''
+
+
+def _is_fresh(logged_in_at, now):
+    return logged_in_at is not None and (now - logged_in_at).total_seconds() < SESSION_TTL
+
+
+def _remember(session):
+    _session_cache['session_id'] = session.session_id
+    _session_cache['host_url'] = session.host_url
+    _session_cache['logged_in_at'] = session.logged_in_at
+    return session.session_id
+
+
+def _login():
+    """
+    공유 세션 갱신 (single-flight) → SESSION_ID 반환.
+    로그인 표시(refreshing_until)를 조건부 UPDATE로 먼저 잡은 워커 하나만 로그인하고,
+    나머지는 공유 행에 새 세션이 기록될 때까지 기다렸다가 그대로 쓴다.
+    """
+    EcountSession.objects.get_or_create(pk=1)
+    deadline = time.monotonic() + LOGIN_LEASE
+    while True:
+        now = timezone.now()
+        session = EcountSession.objects.get(pk=1)
+        if session.session_id and _is_fresh(session.logged_in_at, now):
+            return _remember(session)
+
+        acquired = EcountSession.objects.filter(pk=1).filter(
+            Q(refreshing_until__isnull=True) | Q(refreshing_until__lt=now),
+        ).update(refreshing_until=now + timedelta(seconds=LOGIN_LEASE))
+        if acquired:
+            break
+        if time.monotonic() > deadline:
+            raise Exception('이카운트 로그인 대기 시간 초과')
+        time.sleep(LOGIN_POLL)
 
+    try:
+        session_id, host_url = _request_login()
+    except Exception:
+        EcountSession.objects.filter(pk=1).update(refreshing_until=None)
+        raise
+
+    session = EcountSession(pk=1, session_id=session_id, host_url=host_url, logged_in_at=timezone.now())
+    EcountSession.objects.filter(pk=1).update(
+        session_id=session.session_id, host_url=session.host_url,
+        logged_in_at=session.logged_in_at, refreshing_until=None,
+    )
     logger.info("이카운트 로그인 성공")
-    return datas['SESSION_ID']
+    return _remember(session)
 
 
 def _get_session():
-    """캐시된 세션 반환, 20분 초과 시 재로그인"""
-    if _session_cache['session_id'] and _session_cache['logged_in_at']:
-        elapsed = (datetime.now() - _session_cache['logged_in_at']).total_seconds()
-        if elapsed < 1080:  # 18분 (여유 2분)
-            return _session_cache['session_id']
+    """세션 반환 - 프로세스 사본 → 공유 행 순으로 확인하고, 18분이 지났으면 재로그인"""
+    if _session_cache['session_id'] and _is_fresh(_session_cache['logged_in_at'], timezone.now()):
+        return _session_cache['session_id']
     return _login()
 
 
+def _expire_session(session_id):
+    """세션 만료 응답을 받았을 때 - 같은 세션일 때만 공유 행을 비움 (다른 워커가 이미 갱신했으면 유지)"""
+    _session_cache['session_id'] = None
+    EcountSession.objects.filter(pk=1, session_id=session_id).update(session_id='')
+
+
+def _api_host():
+    """로그인 응답의 HOST_URL (없으면 존 기본 호스트)"""
+    return _session_cache['host_url'] or f'oapi{settings.ECOUNT_ZONE}.ecount.com'
+
+
 def _build_remarks(order):
     """
     적요 문자열 생성 - 기존 수기 형식에 맞춤:
     시간 차종 차번 전화 오일 금액 추가서비스 주행거리
     예: 12:50 싼타페 DM 13나0845 010-3314-2214 메0w30es 161,384 디톡스
+    쿼리 없음 - car_model/parent는 select_related, services는 prefetch 되어 있어야 한다.
     """
-    from .models import ServiceOrder
-
     parts = []
 
-    # 순번: 오늘 완료된 주문 중 현재 주문보다 먼저 완료된 건수 + 1
+    # 순번: 완료 전환 시 발급된 완료 영업일 내 순번
     completed = order.completed_at or order.created_at
     local_time = timezone.localtime(completed) if completed else None
-    if local_time:
-        day_start = local_time.replace(hour=0, minute=0, second=0, microsecond=0)
-        day_end = day_start + timedelta(days=1)
-        seq = ServiceOrder.objects.filter(
-            status='completed',
-            completed_at__gte=day_start,
-            completed_at__lt=completed,
-        ).count() + 1
-        parts.append(f"{seq}.")
-    else:
-        parts.append('-.')
+    parts.append(f"{order.completion_seq}." if order.completion_seq else '-.')
 
     # 시간
     parts.append(local_time.strftime('%H:%M') if local_time else '-')
@@ -120,165 +176,323 @@ def _build_remarks(order):
     return ' '.join(parts)
 
 
-def create_sales_slip(order):
-    """
-    시공 완료 시 매출전표 생성.
-    Returns: {'success': True, 'slip_no': '...'} or {'success': False, 'error': '...'}
-    """
-    try:
-        session_id = _get_session()
-    except Exception as e:
-        logger.error(f"이카운트 로그인 실패: {e}")
-        return {'success': False, 'error': f'이카운트 로그인 실패: {e}'}
-
-    # 총액에서 공급가액/부가세 분리 (VAT 포함가 기준)
+def _sales_row(order):
+    """매출전표 BulkDatas - 총액(VAT 포함)에서 공급가액/부가세 분리"""
     total = order.total_price
     supply_amt = math.floor(total / 1.1)
     vat_amt = total - supply_amt
 
-    # 전표 일자
-    completed_at = order.completed_at or timezone.now()
-    trx_date = timezone.localtime(completed_at).strftime('%Y%m%d')
+    return {
+        'TRX_DATE': (order.completed_date or business_date()).strftime('%Y%m%d'),
+        'TAX_GUBUN': '11',
+        'CUST': settings.ECOUNT_CUST,
+        'CR_CODE': settings.ECOUNT_CR_CODE,
+        'SUPPLY_AMT': str(supply_amt),
+        'VAT_AMT': str(vat_amt),
+        'ACCT_NO': settings.ECOUNT_ACCT_NO,
+        'REMARKS': _build_remarks(order)[:200],
+        'SITE_CD': settings.ECOUNT_SITE_CD,
+    }
 
-    remarks = _build_remarks(order)
 
-    zone = settings.ECOUNT_ZONE
-    url = f'https://oapi{zone}.ecount.com/OAPI/V2/InvoiceAuto/SaveInvoiceAuto?SESSION_ID={session_id}'
-
-    payload = {
-        'InvoiceAutoList': [{
-            'BulkDatas': {
-                'TRX_DATE': trx_date,
-                'TAX_GUBUN': '11',
-                'CUST': settings.ECOUNT_CUST,
-                'CR_CODE': settings.ECOUNT_CR_CODE,
-                'SUPPLY_AMT': str(supply_amt),
-                'VAT_AMT': str(vat_amt),
-                'ACCT_NO': settings.ECOUNT_ACCT_NO,
-                'REMARKS': remarks[:200],
-                'SITE_CD': settings.ECOUNT_SITE_CD,
-            }
-        }]
+def _purchase_row(order):
+    """멤버십 할인 매입전표 BulkDatas - 20% 할인, 최대 15,000원 (VAT 포함)"""
+    rate = getattr(settings, 'MEMBERSHIP_DISCOUNT_RATE', 0.2)
+    cap = getattr(settings, 'MEMBERSHIP_DISCOUNT_MAX', 15000)
+    discount_total = min(math.floor(order.total_price * rate), cap)
+    supply_amt = math.floor(discount_total / 1.1)
+    vat_amt = discount_total - supply_amt
+
+    return {
+        'TRX_DATE': (order.completed_date or business_date()).strftime('%Y%m%d'),
+        'TAX_GUBUN': '21',
+        'CUST': settings.ECOUNT_PURCHASE_CUST,
+        'DR_CODE': settings.ECOUNT_PURCHASE_DR_CODE,
+        'SUPPLY_AMT': str(supply_amt),
+        'VAT_AMT': str(vat_amt),
+        'ACCT_NO': settings.ECOUNT_PURCHASE_ACCT_NO,
+        'REMARKS': (_build_remarks(order) + ' 멤버쉽할인')[:200],
+        'SITE_CD': settings.ECOUNT_SITE_CD,
     }
 
+
+SLIP_ROWS = {
+    'sales': _sales_row,
+    'purchase': _purchase_row,
+}
+
+# SaveInvoiceAuto 1회 호출에 담는 최대 전표 수
+BATCH_SIZE = getattr(settings, 'ECOUNT_BATCH_SIZE', 50)
+
+# 마지막 전표 API 호출 시각 (min_interval 속도 제한용, 프로세스 레벨)
+_throttle = {
+    'last_call': None,
+}
+
+
+def _request_invoices(session_id, rows):
+    # 전표 저장은 비멱등 - 연결 실패 외에는 재시도하지 않음
+    resp = _client(_api_host()).post(
+        '/OAPI/V2/InvoiceAuto/SaveInvoiceAuto',
+        params={'SESSION_ID': session_id},
+        json={'InvoiceAutoList': [{'BulkDatas': row} for row in rows]},
+        endpoint='SaveInvoiceAuto',
+    )
+    raw = resp.content
     try:
-        req = urllib.request.Request(
-            url,
-            data=json.dumps(payload).encode('utf-8'),
-            headers={'Content-Type': 'application/json; charset=utf-8'},
-        )
-        resp = urllib.request.urlopen(req, timeout=15)
-        raw = resp.read()
-
-        # 응답 파싱
-        result = json.loads(raw.decode('utf-8', errors='replace'))
-        data = result.get('Data', {})
-
-        if data.get('SuccessCnt', 0) > 0:
-            slip_nos = data.get('SlipNos', [])
-            slip_no = slip_nos[0] if slip_nos else ''
-            logger.info(f"이카운트 매출전표 생성: {slip_no} (주문#{order.id})")
-            return {'success': True, 'slip_no': slip_no}
-
-        # 실패 시 세션 만료 가능성 → 재로그인 후 1회 재시도
-        details = data.get('ResultDetails', [])
-        error_msg = details[0].get('TotalError', '') if details else '알 수 없는 오류'
-
-        # 세션 만료 감지
-        if '세션' in str(raw) or result.get('Status') == '401':
-            _session_cache['session_id'] = None
-            try:
-                session_id = _login()
-                url = f'https://oapi{zone}.ecount.com/OAPI/V2/InvoiceAuto/SaveInvoiceAuto?SESSION_ID={session_id}'
-                req = urllib.request.Request(
-                    url,
-                    data=json.dumps(payload).encode('utf-8'),
-                    headers={'Content-Type': 'application/json; charset=utf-8'},
-                )
-                resp = urllib.request.urlopen(req, timeout=15)
-                result = json.loads(resp.read().decode('utf-8', errors='replace'))
-                data = result.get('Data', {})
-                if data.get('SuccessCnt', 0) > 0:
-                    slip_nos = data.get('SlipNos', [])
-                    slip_no = slip_nos[0] if slip_nos else ''
-                    logger.info(f"이카운트 매출전표 생성 (재시도): {slip_no}")
-                    return {'success': True, 'slip_no': slip_no}
-            except Exception:
-                pass
-
-        logger.warning(f"이카운트 매출전표 실패: {error_msg} (주문#{order.id})")
-        return {'success': False, 'error': error_msg}
+        return raw, json.loads(raw.decode('utf-8', errors='replace'))
+    except ValueError as e:
+        # 서버가 요청을 받은 뒤의 응답 오류 - 전표가 저장됐을 수 있음
+        raise IntegrationError(f'이카운트 SaveInvoiceAuto 응답 해석 실패: {e}') from e
+
+
+def _session_for_invoices(login):
+    """전표 저장 전 세션 확보 - 여기서 난 실패는 전표 요청을 보내기 전이므로 재시도해도 안전"""
+    try:
+        return login()
+    except Exception as e:
+        raise IntegrationError(f'이카운트 로그인 실패: {e}', maybe_sent=False) from e
+
 
+def _save_invoices(rows):
+    """SaveInvoiceAuto 호출 → 응답 Data. 세션 만료로 실패하면 재로그인 후 1회 재시도"""
+    session_id = _session_for_invoices(_get_session)
+    raw, result = _request_invoices(session_id, rows)
+    data = result.get('Data') or {}
+    if not data.get('SuccessCnt') and ('세션' in str(raw) or result.get('Status') == '401'):
+        _expire_session(session_id)
+        raw, result = _request_invoices(_session_for_invoices(_login), rows)
+        data = result.get('Data') or {}
+    return data
+
+
+def _map_results(count, data):
+    """
+    응답 Data → 요청 줄 순서대로 결과 목록.
+    SlipNos는 성공한 줄에 대해서만 순서대로 오므로 ResultDetails의 줄별 성공 여부에 맞춰 배정한다.
+    """
+    slip_nos = iter(data.get('SlipNos') or [])
+    if data.get('SuccessCnt', 0) >= count:
+        return [{'success': True, 'slip_no': next(slip_nos, '')} for _ in range(count)]
+
+    details = data.get('ResultDetails') or []
+    results = []
+    for i in range(count):
+        detail = details[i] if i < len(details) else {}
+        if detail.get('IsSuccess'):
+            results.append({'success': True, 'slip_no': next(slip_nos, '')})
+        else:
+            results.append({'success': False, 'error': detail.get('TotalError') or '알 수 없는 오류'})
+    return results
+
+
+def submit_slips(items, batch_size=None, min_interval=0):
+    """
+    전표 일괄 제출.
+    전체가 거부된 배치는 반으로 나눠 다시 보내 문제 있는 줄만 실패로 남긴다.
+
+    Args:
+        items: [(key, BulkDatas), ...]
+        batch_size: 1회 호출당 최대 줄 수 (기본 BATCH_SIZE)
+        min_interval: API 호출 간 최소 간격(초) - 대량 백필 속도 제한용
+
+    Returns:
+        dict: {key: {'success': True, 'slip_no': '...'} or {'success': False, 'error': '...'}}
+        요청이 이카운트에 도달했을 수 있는 실패(읽기 타임아웃, 5xx)는 'uncertain': True -
+        전표 저장은 비멱등이라 다시 보내면 중복 전표가 생길 수 있다.
+    """
+    batch_size = batch_size or BATCH_SIZE
+    batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+    results = {}
+
+    while batches:
+        batch = batches.pop(0)
+        last_call = _throttle['last_call']
+        if min_interval and last_call is not None:
+            time.sleep(max(0, last_call + min_interval - time.monotonic()))
+        _throttle['last_call'] = time.monotonic()
+
+        try:
+            data = _save_invoices([row for _, row in batch])
+        except Exception as e:
+            uncertain = maybe_sent(e)
+            logger.error(f"이카운트 전표 API 호출 실패 ({len(batch)}건{', 저장 여부 불명' if uncertain else ''}): {e}")
+            for key, _ in batch:
+                results[key] = {'success': False, 'error': str(e), 'uncertain': uncertain}
+            continue
+
+        if not data.get('SuccessCnt') and len(batch) > 1:
+            mid = len(batch) // 2
+            batches[:0] = [batch[:mid], batch[mid:]]
+            continue
+
+        for (key, _), result in zip(batch, _map_results(len(batch), data)):
+            results[key] = result
+    return results
+
+
+def create_sales_slip(order):
+    """
+    시공 완료 시 매출전표 생성 (단건).
+    Returns: {'success': True, 'slip_no': '...'} or {'success': False, 'error': '...'}
+    """
+    try:
+        row = _sales_row(order)
     except Exception as e:
-        logger.error(f"이카운트 API 호출 실패: {e}")
         return {'success': False, 'error': str(e)}
+    return submit_slips([(order.pk, row)])[order.pk]
 
 
 def create_purchase_slip(order):
     """
-    멤버십 할인 매입전표 생성.
-    20% 할인, 최대 15,000원.
+    멤버십 할인 매입전표 생성 (단건).
     Returns: {'success': True, 'slip_no': '...'} or {'success': False, 'error': '...'}
     """
     try:
-        session_id = _get_session()
+        row = _purchase_row(order)
     except Exception as e:
-        logger.error(f"이카운트 로그인 실패: {e}")
-        return {'success': False, 'error': f'이카운트 로그인 실패: {e}'}
+        return {'success': False, 'error': str(e)}
+    return submit_slips([(order.pk, row)])[order.pk]
 
-    # 할인 금액 계산 (VAT 포함)
-    rate = getattr(settings, 'MEMBERSHIP_DISCOUNT_RATE', 0.2)
-    cap = getattr(settings, 'MEMBERSHIP_DISCOUNT_MAX', 15000)
-    discount_total = min(math.floor(order.total_price * rate), cap)
-    supply_amt = math.floor(discount_total / 1.1)
-    vat_amt = discount_total - supply_amt
 
-    # 전표 일자
-    completed_at = order.completed_at or timezone.now()
-    trx_date = timezone.localtime(completed_at).strftime('%Y%m%d')
+# ============================================
+# 전표 아웃박스
+# ============================================
 
-    remarks = _build_remarks(order) + ' 멤버쉽할인'
+# 재시도: 30초부터 2배씩, 최대 1시간 간격, 8회 실패 시 중단
+MAX_ATTEMPTS = 8
+BACKOFF_BASE = 30
+BACKOFF_MAX = 3600
+# 워커가 작업을 가져간 뒤 다른 워커가 다시 가져가지 못하는 시간
+CLAIM_LEASE = timedelta(minutes=5)
 
-    zone = settings.ECOUNT_ZONE
-    url = f'https://oapi{zone}.ecount.com/OAPI/V2/InvoiceAuto/SaveInvoiceAuto?SESSION_ID={session_id}'
-
-    payload = {
-        'InvoiceAutoList': [{
-            'BulkDatas': {
-                'TRX_DATE': trx_date,
-                'TAX_GUBUN': '21',
-                'CUST': settings.ECOUNT_PURCHASE_CUST,
-                'DR_CODE': settings.ECOUNT_PURCHASE_DR_CODE,
-                'SUPPLY_AMT': str(supply_amt),
-                'VAT_AMT': str(vat_amt),
-                'ACCT_NO': settings.ECOUNT_PURCHASE_ACCT_NO,
-                'REMARKS': remarks[:200],
-                'SITE_CD': settings.ECOUNT_SITE_CD,
-            }
-        }]
-    }
+SLIP_FIELDS = {
+    'sales': 'ecount_slip_no',
+    'purchase': 'ecount_purchase_slip_no',
+}
 
-    try:
-        req = urllib.request.Request(
-            url,
-            data=json.dumps(payload).encode('utf-8'),
-            headers={'Content-Type': 'application/json; charset=utf-8'},
-        )
-        resp = urllib.request.urlopen(req, timeout=15)
-        result = json.loads(resp.read().decode('utf-8', errors='replace'))
-        data = result.get('Data', {})
 
-        if data.get('SuccessCnt', 0) > 0:
-            slip_nos = data.get('SlipNos', [])
-            slip_no = slip_nos[0] if slip_nos else ''
-            logger.info(f"이카운트 매입전표(멤버십) 생성: {slip_no} (주문#{order.id})")
-            return {'success': True, 'slip_no': slip_no}
+def enqueue_slips(order, completed=False):
+    """
+    주문 저장 트랜잭션 안에서 호출 - 필요한 전표 작업을 아웃박스에 기록.
+    (주문, 전표 종류)당 작업 1건이며, 실패한 작업은 다시 저장할 때 재시도 대기로 돌린다.
+    """
+    if not settings.ECOUNT_API_KEY:
+        return
 
-        details = data.get('ResultDetails', [])
-        error_msg = details[0].get('TotalError', '') if details else '알 수 없는 오류'
-        logger.warning(f"이카운트 매입전표 실패: {error_msg} (주문#{order.id})")
-        return {'success': False, 'error': error_msg}
+    kinds = set()
+    if completed and not order.ecount_slip_no:
+        kinds.add('sales')
+    if order.membership_discount and not order.ecount_purchase_slip_no:
+        kinds.add('purchase')
 
-    except Exception as e:
-        logger.error(f"이카운트 매입전표 API 호출 실패: {e}")
-        return {'success': False, 'error': str(e)}
+    jobs = {job.kind: job for job in EcountSlipJob.objects.filter(order=order)}
+    kinds |= {kind for kind, job in jobs.items() if job.status == 'failed'}
+
+    for kind in kinds:
+        job = jobs.get(kind)
+        if job is None:
+            EcountSlipJob.objects.create(order=order, kind=kind)
+        elif job.status == 'failed':
+            EcountSlipJob.objects.filter(pk=job.pk).update(
+                status='pending', attempts=0, next_attempt_at=timezone.now(), updated_at=timezone.now(),
+            )
+
+
+def _backoff(attempts):
+    return timedelta(seconds=min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX))
+
+
+def _claim(job, now):
+    """작업 선점 (next_attempt_at을 임대 만료 시각으로 밀어 둠). 다른 워커가 먼저 가져갔으면 False"""
+    return EcountSlipJob.objects.filter(
+        pk=job.pk, status='pending', next_attempt_at=job.next_attempt_at,
+    ).update(next_attempt_at=now + CLAIM_LEASE) == 1
+
+
+def _record(job, result):
+    """
+    작업 결과 기록 → 'done' | 'retry' | 'failed'.
+    전표번호 기록과 작업 완료 처리는 한 트랜잭션으로 묶는다.
+    저장 여부가 불확실한 실패는 'unknown'(확인 필요)으로 두고 재시도하지 않는다.
+    """
+    field = SLIP_FIELDS[job.kind]
+    now = timezone.now()
+    if result.get('success'):
+        with transaction.atomic():
+            ServiceOrder.objects.filter(pk=job.order_id, **{field: ''}).update(**{field: result['slip_no']})
+            EcountSlipJob.objects.filter(pk=job.pk).update(
+                status='done', slip_no=result['slip_no'], attempts=F('attempts') + 1,
+                last_error='', updated_at=now,
+            )
+        logger.info(f"이카운트 {job.get_kind_display()} 생성: {result['slip_no']} (주문#{job.order_id})")
+        return 'done'
+
+    attempts = job.attempts + 1
+    if result.get('uncertain'):
+        EcountSlipJob.objects.filter(pk=job.pk).update(
+            status='unknown', attempts=attempts,
+            last_error=result.get('error', '알 수 없는 오류'), updated_at=now,
+        )
+        logger.error(
+            f"이카운트 {job.get_kind_display()} 저장 여부 불명 - 재시도 중단, 이카운트에서 확인 필요 (주문#{job.order_id})"
+        )
+        return 'failed'
+
+    outcome = 'failed' if attempts >= MAX_ATTEMPTS else 'retry'
+    EcountSlipJob.objects.filter(pk=job.pk).update(
+        status='failed' if outcome == 'failed' else 'pending',
+        attempts=attempts,
+        last_error=result.get('error', '알 수 없는 오류'),
+        next_attempt_at=now + _backoff(attempts),
+        updated_at=now,
+    )
+    if outcome == 'failed':
+        logger.error(f"이카운트 {job.get_kind_display()} {attempts}회 실패 - 재시도 중단 (주문#{job.order_id})")
+    else:
+        logger.warning(f"이카운트 {job.get_kind_display()} 실패: {result.get('error')} (주문#{job.order_id})")
+    return outcome
+
+
+def process_jobs(jobs, batch_size=None, min_interval=0):
+    """
+    선점한 작업들을 묶어서 제출. 주문에 이미 전표번호가 있으면 API를 호출하지 않는다.
+    Returns: {'done': n, 'retry': n, 'failed': n}
+    """
+    stats = {'done': 0, 'retry': 0, 'failed': 0}
+    by_pk = {}
+    items = []
+    for job in jobs:
+        slip_no = getattr(job.order, SLIP_FIELDS[job.kind])
+        if slip_no:
+            stats[_record(job, {'success': True, 'slip_no': slip_no})] += 1
+            continue
+        try:
+            row = SLIP_ROWS[job.kind](job.order)
+        except Exception as e:
+            stats[_record(job, {'success': False, 'error': str(e)})] += 1
+            continue
+        by_pk[job.pk] = job
+        items.append((job.pk, row))
+
+    for pk, result in submit_slips(items, batch_size, min_interval).items():
+        stats[_record(by_pk[pk], result)] += 1
+    return stats
+
+
+def process_outbox(limit=50, batch_size=None, min_interval=0, queryset=None):
+    """
+    처리 시각이 된 전표 작업을 선점해 일괄 처리.
+    queryset으로 대상 작업을 좁힐 수 있다 (백필 커맨드).
+    Returns: {'done': n, 'retry': n, 'failed': n}
+    """
+    now = timezone.now()
+    if queryset is None:
+        queryset = EcountSlipJob.objects.all()
+    jobs = (
+        queryset.filter(status='pending', next_attempt_at__lte=now)
+        .select_related('order', 'order__car_model', 'order__car_model__parent')
+        .prefetch_related('order__services')
+        .order_by('next_attempt_at')[:limit]
+    )
+    return process_jobs([job for job in jobs if _claim(job, now)], batch_size, min_interval)
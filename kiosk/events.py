@@ -0,0 +1,95 @@
+"""
+스태프 화면 실시간 이벤트 (Server-Sent Events)
+프로세스 내 브로드캐스터가 주문 생성/상태 변경/예약 변경 이벤트를 구독자들에게 팬아웃한다.
+구독자는 asyncio 큐 하나뿐이라 ASGI(config.asgi, Procfile web의 uvicorn)로 서비스하면 대기 중인 연결이 워커 스레드를 잡지 않는다.
+브로드캐스터는 프로세스 단위이므로 스트림은 이벤트를 발행하는 프로세스와 같은 곳에서 서비스해야 한다 (웹 프로세스 1개).
+"""
+import asyncio
+import json
+import logging
+import threading
+
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+# 구독자별 대기 이벤트 상한 (넘치면 느린 구독자로 보고 끊음)
+QUEUE_SIZE = 100
+
+
+class Subscription:
+    """구독자 하나 = 이벤트 루프 + asyncio 큐"""
+
+    __slots__ = ('loop', 'queue', 'closed')
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.closed = False
+
+    def _put(self, message):
+        # 구독자 루프 안에서 실행됨
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.closed = True
+            logger.warning("SSE 구독자 큐 초과 - 연결 종료")
+
+
+class Broadcaster:
+    """프로세스 내 이벤트 팬아웃 (스레드 안전)"""
+
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        """현재 이벤트 루프에 구독자 등록 (async 컨텍스트에서 호출)"""
+        subscription = Subscription(asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscription.closed = True
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def publish(self, event, data):
+        """이벤트 발행 - 어느 스레드에서나 호출 가능"""
+        message = f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._put, message)
+            except RuntimeError:
+                # 루프가 이미 닫힘
+                self.unsubscribe(subscription)
+
+
+broadcaster = Broadcaster()
+
+
+async def stream(keepalive=15):
+    """SSE 본문 생성기 - 첫 반복 시 구독, 이벤트가 없으면 keepalive 주석 전송"""
+    subscription = broadcaster.subscribe()
+    try:
+        yield 'retry: 3000\n\n'
+        while not subscription.closed:
+            try:
+                yield await asyncio.wait_for(subscription.queue.get(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+    finally:
+        broadcaster.unsubscribe(subscription)
+
+
+def publish(event, **data):
+    """트랜잭션 커밋 후 이벤트 발행"""
+    transaction.on_commit(lambda: broadcaster.publish(event, data))
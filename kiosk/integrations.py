@@ -0,0 +1,251 @@
+"""
+외부 연동 HTTP 클라이언트 (이카운트, 뿌리오 공용)
+호스트별 keep-alive 커넥션 풀, 연결/읽기 타임아웃 분리, 지터 재시도,
+장애 시 빠르게 실패하는 서킷 브레이커, 엔드포인트별 지연 히스토그램을 제공한다.
+"""
+import logging
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+logger = logging.getLogger(__name__)
+
+# 멱등 메서드 - 응답 실패/타임아웃 시 재시도해도 안전
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+# 지연 히스토그램 버킷 상한(초)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, float('inf'))
+
+
+class IntegrationError(Exception):
+    """
+    외부 연동 호출 실패 (네트워크 오류, 타임아웃, 5xx).
+    maybe_sent: 요청이 서버에 도달했을 수 있음 (읽기 타임아웃, 5xx 등)
+    """
+
+    def __init__(self, message, maybe_sent=True):
+        super().__init__(message)
+        self.maybe_sent = maybe_sent
+
+
+class CircuitOpenError(IntegrationError):
+    """서킷 브레이커 열림 - 호출하지 않고 즉시 실패"""
+
+    def __init__(self, message):
+        super().__init__(message, maybe_sent=False)
+
+
+def maybe_sent(e):
+    """
+    요청이 서버에 도달했을 수 있는 실패인지.
+    비멱등 요청은 이 경우 재시도하면 중복 처리될 수 있다 - 연결 수립 실패만 False.
+    """
+    if isinstance(e, IntegrationError):
+        return e.maybe_sent
+    if isinstance(e, requests.ConnectTimeout):
+        return False
+    if isinstance(e, requests.ConnectionError) and e.args:
+        return not isinstance(getattr(e.args[0], 'reason', None), NewConnectionError)
+    return isinstance(e, requests.RequestException)
+
+
+class CircuitBreaker:
+    """
+    연속 실패가 failure_threshold회 쌓이면 열림 → reset_timeout 동안 즉시 실패.
+    이후 시험 호출 1건만 통과시켜(half-open) 성공하면 닫고, 실패하면 다시 연다.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self.probing:
+                self.probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.probing or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self.probing = False
+
+
+class LatencyHistogram:
+    """누적 지연 히스토그램 (버킷별 건수 + 합계)"""
+
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds, error=False):
+        with self._lock:
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    self.counts[i] += 1
+                    break
+            self.count += 1
+            self.total += seconds
+            if error:
+                self.errors += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'count': self.count,
+                'errors': self.errors,
+                'avg_ms': round(self.total / self.count * 1000, 1) if self.count else None,
+                'buckets': {
+                    ('+Inf' if bound == float('inf') else f'{bound}s'): n
+                    for bound, n in zip(LATENCY_BUCKETS, self.counts)
+                },
+            }
+
+
+class IntegrationClient:
+    """호스트 하나에 대한 풀링 클라이언트 (스레드 안전)"""
+
+    def __init__(self, name, base_url, connect_timeout=3, read_timeout=10, retries=2,
+                 backoff=0.2, pool_size=10, failure_threshold=5, reset_timeout=30):
+        self.name = name
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.histograms = {}
+        self._histograms_lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _histogram(self, endpoint):
+        histogram = self.histograms.get(endpoint)
+        if histogram is None:
+            with self._histograms_lock:
+                histogram = self.histograms.setdefault(endpoint, LatencyHistogram())
+        return histogram
+
+    def _sleep_before_retry(self, attempt):
+        # 지수 백오프 + full jitter
+        time.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+
+    def request(self, method, path, endpoint=None, idempotent=None, timeout=None, **kwargs):
+        """
+        요청 전송 → requests.Response (4xx는 그대로 반환).
+
+        Args:
+            endpoint: 히스토그램 이름 (기본: path)
+            idempotent: 재시도 허용 여부 (기본: 메서드 기준). 비멱등 요청은
+                        서버에 도달하지 않은 연결 실패일 때만 재시도한다.
+
+        Raises:
+            CircuitOpenError: 브레이커가 열려 있음
+            IntegrationError: 재시도 후에도 네트워크 오류/타임아웃/5xx
+        """
+        method = method.upper()
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        histogram = self._histogram(endpoint or path)
+
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                raise CircuitOpenError(f'{self.name} 서킷 열림 - 호출 생략')
+
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, timeout=timeout or self.timeout, **kwargs)
+            except requests.RequestException as e:
+                histogram.observe(time.perf_counter() - start, error=True)
+                self.breaker.record_failure()
+                # 연결 자체가 안 된 경우는 요청이 서버에 도달하지 않았으므로 비멱등 요청도 재시도 가능
+                sent = maybe_sent(e)
+                retryable = idempotent or not sent
+                if retryable and attempt < self.retries:
+                    self._sleep_before_retry(attempt)
+                    attempt += 1
+                    continue
+                raise IntegrationError(f'{self.name} {endpoint or path} 호출 실패: {e}', maybe_sent=sent) from e
+
+            failed = response.status_code >= 500
+            histogram.observe(time.perf_counter() - start, error=failed)
+            if not failed:
+                self.breaker.record_success()
+                return response
+
+            self.breaker.record_failure()
+            if idempotent and attempt < self.retries:
+                self._sleep_before_retry(attempt)
+                attempt += 1
+                continue
+            raise IntegrationError(f'{self.name} {endpoint or path} 응답 오류: {response.status_code}')
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+
+# 클라이언트 레지스트리 (프로세스 레벨, 호스트별 1개)
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(name, base_url, **options):
+    """이름+호스트별 공유 클라이언트 (처음 호출 시 생성)"""
+    key = (name, base_url.rstrip('/'))
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = IntegrationClient(name, base_url, **options)
+                _clients[key] = client
+    return client
+
+
+def latency_stats():
+    """전체 연동 지연/서킷 상태 {'이름 호스트': {'circuit', 'endpoints': {엔드포인트: 히스토그램}}}"""
+    return {
+        f'{client.name} {client.base_url}': {
+            'circuit': client.breaker.state,
+            'endpoints': {endpoint: h.snapshot() for endpoint, h in list(client.histograms.items())},
+        }
+        for client in list(_clients.values())
+    }
@@ -0,0 +1,34 @@
+"""
+적용 시각이 지난 예약 가격 변경을 현재 가격 테이블에 반영하는 커맨드.
+반영한 이력은 처리 완료로 기록하므로 다시 실행해도 중복 반영하지 않는다.
+캐시 버전은 DB 공유라 웹 워커들도 버전 확인 주기 안에 새 가격을 읽는다.
+
+사용법:
+    python manage.py activate_price_revisions          # 1회 처리 (cron)
+    python manage.py activate_price_revisions --loop   # 상주 워커 (Procfile scheduler, 매분)
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from kiosk.price_history import activate_due
+
+
+class Command(BaseCommand):
+    help = '적용 시각이 지난 예약 가격 변경을 반영합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='종료하지 않고 주기적으로 처리')
+        parser.add_argument('--interval', type=float, default=60, help='--loop 처리 간격(초)')
+
+    def handle(self, *args, **options):
+        while True:
+            stats = activate_due()
+            if any(stats.values()) or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(
+                    f"오일 이력 {stats['oil_revisions']}건 → 셀 {stats['oil_cells']}개, "
+                    f"추가 서비스 이력 {stats['service_revisions']}건 → 서비스 {stats['services']}개 반영"
+                ))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,106 @@
+"""
+완료 주문 중 이카운트 전표가 없는 건을 일괄 생성하는 커맨드 (월말 정리용).
+전표 작업을 아웃박스에 기록한 뒤 묶음 제출하므로 배치 크기만큼 한 번의 API 호출로 처리된다.
+
+사용법:
+    python manage.py backfill_ecount_slips --from 2026-01-01 --to 2026-01-31
+    python manage.py backfill_ecount_slips --from 2026-01-01 --to 2026-01-31 --rate 10 --dry-run
+"""
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+
+from kiosk.ecount import BATCH_SIZE, process_outbox
+from kiosk.models import EcountSlipJob, ServiceOrder, business_date
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f'날짜 형식 오류 (YYYY-MM-DD): {value}')
+
+
+class Command(BaseCommand):
+    help = '기간 내 완료 주문 중 이카운트 전표가 없는 건을 묶음으로 생성합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='date_from', required=True, help='완료 영업일 시작 (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='date_to', help='완료 영업일 끝 (YYYY-MM-DD, 기본: 오늘)')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='API 호출당 전표 수')
+        parser.add_argument('--rate', type=float, default=20, help='분당 최대 API 호출 수')
+        parser.add_argument('--dry-run', action='store_true', help='대상 건수만 출력')
+
+    def handle(self, *args, **options):
+        date_from = _parse_date(options['date_from'])
+        date_to = _parse_date(options['date_to']) if options['date_to'] else business_date()
+
+        orders = ServiceOrder.objects.filter(
+            status='completed',
+            completed_date__range=(date_from, date_to),
+        ).filter(
+            Q(ecount_slip_no='') | Q(membership_discount=True, ecount_purchase_slip_no=''),
+        )
+
+        existing = {
+            (order_id, kind): status
+            for order_id, kind, status in EcountSlipJob.objects.filter(order__in=orders)
+            .values_list('order_id', 'kind', 'status')
+        }
+        new_jobs = []
+        retry = []
+        for order_id, slip_no, membership, purchase_slip_no in orders.values_list(
+            'id', 'ecount_slip_no', 'membership_discount', 'ecount_purchase_slip_no',
+        ):
+            kinds = []
+            if not slip_no:
+                kinds.append('sales')
+            if membership and not purchase_slip_no:
+                kinds.append('purchase')
+            for kind in kinds:
+                status = existing.get((order_id, kind))
+                if status is None:
+                    new_jobs.append(EcountSlipJob(order_id=order_id, kind=kind))
+                elif status == 'failed':
+                    retry.append((order_id, kind))
+
+        self.stdout.write(f'{date_from} ~ {date_to}: 신규 {len(new_jobs)}건, 실패 재시도 {len(retry)}건')
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('=== DRY RUN - 변경 없음 ==='))
+            return
+        # enqueue_slips와 같은 조건 - 연동 설정이 없으면 작업을 만들지 않음
+        if not settings.ECOUNT_API_KEY:
+            self.stdout.write(self.style.WARNING('ECOUNT_API_KEY 미설정 - 전표 작업을 만들지 않습니다.'))
+            return
+
+        EcountSlipJob.objects.bulk_create(new_jobs, ignore_conflicts=True)
+        for order_id, kind in retry:
+            EcountSlipJob.objects.filter(order_id=order_id, kind=kind, status='failed').update(
+                status='pending', attempts=0, next_attempt_at=timezone.now(),
+            )
+
+        # 대상 작업이 남지 않을 때까지 묶음 제출 (실패 건은 백오프 후 워커가 이어서 처리)
+        # 제출 직전에 한 묶음만 선점 - 속도 제한으로 대기하는 동안 선점 임대(CLAIM_LEASE)가 끝나
+        # 다른 워커가 같은 작업을 다시 가져가는 일이 없도록
+        jobs = EcountSlipJob.objects.filter(
+            order__completed_date__range=(date_from, date_to), order__status='completed',
+        )
+        batch_size = max(1, options['batch_size'])
+        min_interval = 60 / options['rate'] if options['rate'] > 0 else 0
+        totals = {'done': 0, 'retry': 0, 'failed': 0}
+        while True:
+            stats = process_outbox(
+                limit=batch_size, batch_size=batch_size, min_interval=min_interval, queryset=jobs,
+            )
+            if not any(stats.values()):
+                break
+            for key, value in stats.items():
+                totals[key] += value
+            self.stdout.write(f"  완료 {stats['done']} / 재시도 대기 {stats['retry']} / 실패 {stats['failed']}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"\n=== 결과 ===\n  완료: {totals['done']}\n  재시도 대기: {totals['retry']}\n  실패: {totals['failed']}"
+        ))
@@ -0,0 +1,40 @@
+"""
+현재 오일 가격 전체를 단가표(Excel) 또는 CSV로 내보내는 커맨드.
+Excel은 import_oil_prices와 같은 시트/열 배치라 그대로 다시 임포트할 수 있다.
+
+사용법:
+    python manage.py export_oil_prices 단가표.xlsx
+    python manage.py export_oil_prices 가격.csv
+"""
+from django.core.management.base import BaseCommand
+
+from kiosk.price_sheet import csv_lines, write_workbook
+
+
+class Command(BaseCommand):
+    help = '현재 오일 가격을 단가표(xlsx) 또는 CSV로 내보냅니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', type=str, help='저장할 파일 경로 (.xlsx 또는 .csv)')
+        parser.add_argument('--format', choices=['xlsx', 'csv'], help='형식 (기본: 확장자로 판단)')
+
+    def handle(self, *args, **options):
+        path = options['file']
+        fmt = options['format'] or ('csv' if path.lower().endswith('.csv') else 'xlsx')
+
+        if fmt == 'csv':
+            lines = 0
+            with open(path, 'w', encoding='utf-8', newline='') as f:
+                for line in csv_lines():
+                    f.write(line)
+                    lines += 1
+            self.stdout.write(self.style.SUCCESS(f'{path}: 가격 {lines - 1}건'))
+            return
+
+        with open(path, 'wb') as f:
+            stats = write_workbook(f)
+        self.stdout.write(self.style.SUCCESS(f"{path}: 차종 {stats['models']}개, 가격 {stats['cells']}건"))
+        if stats['skipped_brands']:
+            self.stdout.write(self.style.WARNING(
+                f"단가표 배치에 없는 브랜드 제외: {', '.join(stats['skipped_brands'])}"
+            ))
@@ -0,0 +1,29 @@
+"""
+이카운트 전표 아웃박스 처리 워커
+사용법:
+    python manage.py process_ecount_outbox          # 1회 처리 (cron)
+    python manage.py process_ecount_outbox --loop   # 상주 워커
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from kiosk.ecount import process_outbox
+
+
+class Command(BaseCommand):
+    help = '대기 중인 이카운트 전표 작업을 처리합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='종료하지 않고 주기적으로 처리')
+        parser.add_argument('--interval', type=float, default=10, help='--loop 처리 간격(초)')
+        parser.add_argument('--limit', type=int, default=50, help='1회 처리 최대 건수')
+
+    def handle(self, *args, **options):
+        while True:
+            stats = process_outbox(limit=options['limit'])
+            if any(stats.values()):
+                self.stdout.write(f"완료 {stats['done']} / 재시도 {stats['retry']} / 실패 {stats['failed']}")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
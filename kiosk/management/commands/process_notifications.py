@@ -0,0 +1,30 @@
+"""
+고객 알림(알림톡/SMS) 발송 큐 처리 워커
+사용법:
+    python manage.py process_notifications          # 1회 처리 (cron)
+    python manage.py process_notifications --loop   # 상주 워커
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from kiosk.services import RATE_LIMIT, process_notifications
+
+
+class Command(BaseCommand):
+    help = '대기 중인 고객 알림을 발송합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='종료하지 않고 주기적으로 처리')
+        parser.add_argument('--interval', type=float, default=5, help='--loop 처리 간격(초)')
+        parser.add_argument('--limit', type=int, default=50, help='1회 처리 최대 건수')
+        parser.add_argument('--rate', type=float, default=RATE_LIMIT, help='초당 최대 발송 요청 수')
+
+    def handle(self, *args, **options):
+        while True:
+            stats = process_notifications(limit=options['limit'], rate=options['rate'])
+            if any(stats.values()):
+                self.stdout.write(f"발송 {stats['sent']} / 재시도 {stats['retry']} / 실패 {stats['failed']}")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,52 @@
+"""
+내일 예약 고객에게 전날 안내 SMS를 발송하는 커맨드 (매일 저녁 cron - railway/reservation-reminders.json, 18:00 KST).
+대상 예약을 한 번에 조회해 뿌리오 다건 발송 1회로 보내고, 예약별 발송 상태를 기록하므로
+다시 실행해도 이미 보낸 예약에는 보내지 않는다.
+
+사용법:
+    python manage.py send_reservation_reminders --dry-run
+    python manage.py send_reservation_reminders --date 2026-03-14
+"""
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from kiosk.models import business_date
+from kiosk.services import (
+    REMINDER_BATCH_SIZE, reservation_reminder_message, reservation_reminders, send_reservation_reminders,
+)
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f'날짜 형식 오류 (YYYY-MM-DD): {value}')
+
+
+class Command(BaseCommand):
+    help = '내일 예약 고객에게 전날 안내를 발송합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='예약일 (YYYY-MM-DD, 기본: 내일)')
+        parser.add_argument('--batch-size', type=int, default=REMINDER_BATCH_SIZE, help='요청당 수신자 수')
+        parser.add_argument('--dry-run', action='store_true', help='대상과 본문만 출력')
+
+    def handle(self, *args, **options):
+        day = _parse_date(options['date']) if options['date'] else business_date() + timedelta(days=1)
+
+        reminders = reservation_reminders(day)
+        self.stdout.write(f'{day}: 안내 대상 {len(reminders)}건')
+
+        if options['dry_run']:
+            message, message_type = reservation_reminder_message()
+            self.stdout.write(f'[{message_type}]\n{message}')
+            for reservation_id, key, time in reminders[:10]:
+                self.stdout.write(f'  예약#{reservation_id} {time:%H:%M} {key}')
+            self.stdout.write(self.style.WARNING('=== DRY RUN - 발송 안 함 ==='))
+            return
+
+        stats = send_reservation_reminders(reminders, day, batch_size=max(1, options['batch_size']))
+        self.stdout.write(self.style.SUCCESS(
+            f"\n=== 결과 ===\n  발송: {stats['sent']}\n  실패: {stats['failed']}\n  요청: {stats['requests']}"
+        ))
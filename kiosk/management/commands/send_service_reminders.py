@@ -0,0 +1,55 @@
+"""
+오일 교체 시기가 된 고객에게 안내 SMS를 일괄 발송하는 커맨드 (매일 1회 cron - railway/service-reminders.json, 10:00 KST).
+예상 주행거리(하루 평균 주행거리 기준) 또는 경과 일수로 정한 안내 예정일이 지난
+고객의 최신 완료 주문을 고르고, 뿌리오 다건 발송으로 묶어 보낸다.
+
+사용법:
+    python manage.py send_service_reminders --dry-run
+    python manage.py send_service_reminders --batch-size 500 --rate 2
+"""
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from kiosk.models import business_date
+from kiosk.services import REMINDER_BATCH_SIZE, REMINDER_MAX_OVERDUE, due_reminders, send_service_reminders
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f'날짜 형식 오류 (YYYY-MM-DD): {value}')
+
+
+class Command(BaseCommand):
+    help = '오일 교체 시기가 된 고객에게 교체 안내를 일괄 발송합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='기준일 (YYYY-MM-DD, 기본: 오늘)')
+        parser.add_argument('--max-overdue', type=int, default=REMINDER_MAX_OVERDUE, help='예정일이 이 일수보다 오래 지난 주문은 제외')
+        parser.add_argument('--batch-size', type=int, default=REMINDER_BATCH_SIZE, help='요청당 수신자 수')
+        parser.add_argument('--rate', type=float, default=1, help='초당 최대 발송 요청 수')
+        parser.add_argument('--dry-run', action='store_true', help='대상 건수만 출력')
+
+    def handle(self, *args, **options):
+        today = _parse_date(options['date']) if options['date'] else business_date()
+        batch_size = max(1, options['batch_size'])
+
+        start = time.perf_counter()
+        reminders = due_reminders(today, max_overdue=options['max_overdue'])
+        elapsed = time.perf_counter() - start
+        requests = -(-len(reminders) // batch_size)
+        self.stdout.write(f'{today}: 안내 대상 {len(reminders)}명 (조회 {elapsed:.2f}초), 발송 요청 {requests}회')
+
+        if options['dry_run']:
+            for order_id, key, car_number in reminders[:10]:
+                self.stdout.write(f'  주문#{order_id} {key} {car_number or "-"}')
+            self.stdout.write(self.style.WARNING('=== DRY RUN - 발송 안 함 ==='))
+            return
+
+        stats = send_service_reminders(reminders, batch_size=batch_size, rate=options['rate'])
+        self.stdout.write(self.style.SUCCESS(
+            f"\n=== 결과 ===\n  발송: {stats['sent']}\n  확인 필요: {stats['unknown']}\n  실패: {stats['failed']}\n  요청: {stats['requests']}"
+        ))
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.10 on 2026-10-17 21:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kiosk', '0013_serviceorder_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reservation',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='수정일시'),
+        ),
+        migrations.AlterField(
+            model_name='serviceorder',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='수정일시'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.10 on 2026-10-17 21:27
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_totals(apps, schema_editor):
+    ServiceOrder = apps.get_model('kiosk', 'ServiceOrder')
+    ServiceOrderItem = apps.get_model('kiosk', 'ServiceOrderItem')
+
+    items_sum = Subquery(
+        ServiceOrderItem.objects.filter(order=OuterRef('pk'))
+        .order_by()
+        .values('order')
+        .annotate(total=Sum('price'))
+        .values('total')[:1]
+    )
+    ServiceOrder.objects.update(services_total=Coalesce(items_sum, Value(0)))
+    ServiceOrder.objects.update(total_price=F('oil_price') + F('services_total'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kiosk', '0014_index_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='serviceorder',
+            name='services_total',
+            field=models.PositiveIntegerField(default=0, verbose_name='추가 서비스 합계'),
+        ),
+        migrations.AddField(
+            model_name='serviceorder',
+            name='total_price',
+            field=models.PositiveIntegerField(default=0, verbose_name='총 금액'),
+        ),
+        migrations.RunPython(backfill_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.10 on 2026-10-17 21:29
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_daily_stats(apps, schema_editor):
+    ServiceOrder = apps.get_model('kiosk', 'ServiceOrder')
+    DailyOrderStats = apps.get_model('kiosk', 'DailyOrderStats')
+
+    completed = Q(status='completed')
+    rows = (
+        ServiceOrder.objects.annotate(day=TruncDate('created_at'))
+        .order_by()
+        .values('day')
+        .annotate(
+            orders=Count('id'),
+            completed=Count('id', filter=completed),
+            revenue=Sum('total_price', filter=completed),
+        )
+    )
+    DailyOrderStats.objects.bulk_create([
+        DailyOrderStats(date=row['day'], orders=row['orders'], completed=row['completed'], revenue=row['revenue'] or 0)
+        for row in rows
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kiosk', '0015_serviceorder_totals'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyOrderStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True, verbose_name='일자')),
+                ('orders', models.IntegerField(default=0, verbose_name='주문 수')),
+                ('completed', models.IntegerField(default=0, verbose_name='완료 수')),
+                ('revenue', models.BigIntegerField(default=0, verbose_name='완료 매출')),
+            ],
+            options={
+                'verbose_name': '일별 주문 집계',
+                'verbose_name_plural': '일별 주문 집계',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.RunPython(backfill_daily_stats, migrations.RunPython.noop),
+    ]
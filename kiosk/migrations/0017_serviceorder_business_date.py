@@ -0,0 +1,37 @@
+# Generated by Django 5.2.10 on 2026-10-17 21:40
+
+from django.db import migrations, models
+from django.db.models.functions import TruncDate
+
+
+def backfill_business_dates(apps, schema_editor):
+    ServiceOrder = apps.get_model('kiosk', 'ServiceOrder')
+    # TruncDate는 현재 TIME_ZONE(Asia/Seoul) 기준으로 날짜를 자름
+    ServiceOrder.objects.update(business_date=TruncDate('created_at'))
+    ServiceOrder.objects.filter(completed_at__isnull=False).update(completed_date=TruncDate('completed_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kiosk', '0016_daily_order_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='serviceorder',
+            name='business_date',
+            field=models.DateField(null=True, editable=False, verbose_name='영업일'),
+        ),
+        migrations.AddField(
+            model_name='serviceorder',
+            name='completed_date',
+            field=models.DateField(blank=True, db_index=True, editable=False, null=True, verbose_name='완료 영업일'),
+        ),
+        migrations.RunPython(backfill_business_dates, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='serviceorder',
+            name='business_date',
+            field=models.DateField(db_index=True, editable=False, verbose_name='영업일'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.10 on 2026-10-17 21:31
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kiosk', '0017_serviceorder_business_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EcountSlipJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('sales', '매출전표'), ('purchase', '매입전표(멤버십)')], max_length=20, verbose_name='전표 종류')),
+                ('status', models.CharField(choices=[('pending', '대기'), ('done', '완료'), ('failed', '실패')], default='pending', max_length=20, verbose_name='상태')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='시도 횟수')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='다음 시도 일시')),
+                ('last_error', models.TextField(blank=True, verbose_name='마지막 오류')),
+                ('slip_no', models.CharField(blank=True, default='', max_length=30, verbose_name='전표번호')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='생성일시')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='수정일시')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ecount_jobs', to='kiosk.serviceorder', verbose_name='주문')),
+            ],
+            options={
+                'verbose_name': '이카운트 전표 작업',
+                'verbose_name_plural': '이카운트 전표 작업',
+                'ordering': ['next_attempt_at'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='ecount_job_due_idx')],
+                'constraints': [models.UniqueConstraint(fields=('order', 'kind'), name='unique_ecount_job_per_order_kind')],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.10 on 2026-10-17 21:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kiosk', '0018_ecount_slip_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EcountSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('session_id', models.CharField(blank=True, default='', max_length=200, verbose_name='세션 ID')),
+                ('host_url', models.CharField(blank=True, default='', max_length=200, verbose_name='API 호스트')),
+                ('logged_in_at', models.DateTimeField(blank=True, null=True, verbose_name='로그인 일시')),
+                ('refreshing_until', models.DateTimeField(blank=True, null=True, verbose_name='로그인 진행 만료')),
+            ],
+            options={
+                'verbose_name': '이카운트 세션',
+                'verbose_name_plural': '이카운트 세션',
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.10 on 2026-10-17 21:36
+
+from django.db import migrations, models
+
+
+def backfill_completion_seq(apps, schema_editor):
+    ServiceOrder = apps.get_model('kiosk', 'ServiceOrder')
+    CompletionSequence = apps.get_model('kiosk', 'CompletionSequence')
+
+    # 기존 적요 순번과 같은 기준: 완료 영업일 안에서 완료 시각 순
+    orders = list(ServiceOrder.objects.filter(status='completed').only(
+        'id', 'created_at', 'completed_at', 'business_date', 'completed_date',
+    ))
+    orders.sort(key=lambda o: (o.completed_date or o.business_date, o.completed_at or o.created_at, o.id))
+
+    last_values = {}
+    for order in orders:
+        day = order.completed_date or order.business_date
+        last_values[day] = last_values.get(day, 0) + 1
+        order.completion_seq = last_values[day]
+    ServiceOrder.objects.bulk_update(orders, ['completion_seq'], batch_size=500)
+    CompletionSequence.objects.bulk_create([
+        CompletionSequence(date=day, last_value=value) for day, value in last_values.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kiosk', '0019_ecount_session'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompletionSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True, verbose_name='완료 영업일')),
+                ('last_value', models.PositiveIntegerField(default=0, verbose_name='마지막 순번')),
+            ],
+            options={
+                'verbose_name': '완료 순번',
+                'verbose_name_plural': '완료 순번',
+            },
+        ),
+        migrations.AddField(
+            model_name='serviceorder',
+            name='completion_seq',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='완료 순번'),
+        ),
+        migrations.RunPython(backfill_completion_seq, migrations.RunPython.noop),
+    ]
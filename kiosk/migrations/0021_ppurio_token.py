@@ -0,0 +1,26 @@
+# Generated by Django 5.2.10 on 2026-10-17 21:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kiosk', '0020_completion_sequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PpurioToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.TextField(blank=True, default='', verbose_name='토큰')),
+                ('expires_at', models.DateTimeField(blank=True, null=True, verbose_name='만료 일시')),
+                ('refreshing_until', models.DateTimeField(blank=True, null=True, verbose_name='발급 진행 만료')),
+            ],
+            options={
+                'verbose_name': '뿌리오 토큰',
+                'verbose_name_plural': '뿌리오 토큰',
+            },
+        ),
+    ]
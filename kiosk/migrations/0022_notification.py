@@ -0,0 +1,42 @@
+# Generated by Django 5.2.10 on 2026-10-17 21:39
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kiosk', '0021_ppurio_token'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=30, verbose_name='알림 종류')),
+                ('ref_key', models.CharField(max_length=100, unique=True, verbose_name='참조 키')),
+                ('phone', models.CharField(max_length=20, verbose_name='수신 번호')),
+                ('message', models.TextField(verbose_name='메시지')),
+                ('fallback_message', models.TextField(blank=True, verbose_name='SMS 대체 메시지')),
+                ('channel', models.CharField(choices=[('alimtalk', '알림톡'), ('sms', 'SMS')], default='alimtalk', max_length=20, verbose_name='발송 채널')),
+                ('status', models.CharField(choices=[('pending', '대기'), ('sent', '발송'), ('failed', '실패')], default='pending', max_length=20, verbose_name='상태')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='시도 횟수')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='다음 시도 일시')),
+                ('last_error', models.TextField(blank=True, verbose_name='마지막 오류')),
+                ('provider_message_id', models.CharField(blank=True, default='', max_length=100, verbose_name='뿌리오 메시지 키')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='발송 일시')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='생성일시')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='수정일시')),
+                ('order', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='kiosk.serviceorder', verbose_name='주문')),
+            ],
+            options={
+                'verbose_name': '고객 알림',
+                'verbose_name_plural': '고객 알림',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='notification_due_idx')],
+            },
+        ),
+    ]
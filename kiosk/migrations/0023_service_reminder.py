@@ -0,0 +1,56 @@
+# Generated by Django 5.2.10 on 2026-10-17 21:41
+
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def backfill_reminder_fields(apps, schema_editor):
+    ServiceOrder = apps.get_model('kiosk', 'ServiceOrder')
+
+    # models.phone_key / models.reminder_due_date 와 같은 규칙 (하루 40km, 최대 180일)
+    orders = []
+    for order in ServiceOrder.objects.only(
+        'id', 'status', 'customer_phone', 'completed_date', 'mileage_current', 'mileage_next',
+    ).iterator(chunk_size=2000):
+        order.phone_key = ''.join(c for c in order.customer_phone or '' if c.isdigit())
+        if order.status == 'completed' and order.completed_date:
+            days = 180
+            if order.mileage_current is not None and order.mileage_next and order.mileage_next > order.mileage_current:
+                days = min(days, -(-(order.mileage_next - order.mileage_current) // 40))
+            order.reminder_due_date = order.completed_date + timedelta(days=days)
+        orders.append(order)
+        if len(orders) >= 2000:
+            ServiceOrder.objects.bulk_update(orders, ['phone_key', 'reminder_due_date'])
+            orders = []
+    ServiceOrder.objects.bulk_update(orders, ['phone_key', 'reminder_due_date'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kiosk', '0022_notification'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='serviceorder',
+            name='phone_key',
+            field=models.CharField(blank=True, default='', editable=False, max_length=20, verbose_name='전화번호 키'),
+        ),
+        migrations.AddField(
+            model_name='serviceorder',
+            name='reminded_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='교체 안내 발송일시'),
+        ),
+        migrations.AddField(
+            model_name='serviceorder',
+            name='reminder_due_date',
+            field=models.DateField(blank=True, db_index=True, editable=False, null=True, verbose_name='교체 안내 예정일'),
+        ),
+        migrations.AddIndex(
+            model_name='serviceorder',
+            index=models.Index(fields=['phone_key', 'created_at'], name='order_phone_latest_idx'),
+        ),
+        migrations.RunPython(backfill_reminder_fields, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.10 on 2026-10-17 21:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kiosk', '0023_service_reminder'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='reminded_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='전날 안내 발송일시'),
+        ),
+        migrations.AddField(
+            model_name='reservation',
+            name='reminder_ref',
+            field=models.CharField(blank=True, default='', max_length=100, verbose_name='전날 안내 refKey'),
+        ),
+        migrations.AddField(
+            model_name='reservation',
+            name='reminder_status',
+            field=models.CharField(blank=True, choices=[('', '미발송'), ('sending', '발송중'), ('sent', '발송완료'), ('failed', '발송실패')], default='', max_length=10, verbose_name='전날 안내'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['date', 'status'], name='reservation_date_status_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.10 on 2026-10-17 21:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kiosk', '0024_reservation_reminder'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OilPriceImport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(db_index=True, max_length=64, verbose_name='내용 해시')),
+                ('filename', models.CharField(blank=True, max_length=255, verbose_name='파일명')),
+                ('summary', models.JSONField(default=dict, verbose_name='변경 요약')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='적용일시')),
+            ],
+            options={
+                'verbose_name': '단가표 임포트',
+                'verbose_name_plural': '단가표 임포트',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.10 on 2026-10-17 22:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def record_initial_revisions(apps, schema_editor):
+    """현재 가격을 최초 이력으로 기록 (이후 시점 조회의 기준)"""
+    OilPrice = apps.get_model('kiosk', 'OilPrice')
+    OilPriceRevision = apps.get_model('kiosk', 'OilPriceRevision')
+    AdditionalService = apps.get_model('kiosk', 'AdditionalService')
+    ServicePriceRevision = apps.get_model('kiosk', 'ServicePriceRevision')
+
+    now = timezone.now()
+    revisions = []
+    for car_model_id, oil_product_id, fuel_type_id, price in OilPrice.objects.values_list(
+        'car_model_id', 'oil_product_id', 'fuel_type_id', 'price',
+    ).iterator(chunk_size=2000):
+        revisions.append(OilPriceRevision(
+            car_model_id=car_model_id, oil_product_id=oil_product_id, fuel_type_id=fuel_type_id,
+            price=price, effective_from=now, source='initial', applied_at=now,
+        ))
+        if len(revisions) >= 2000:
+            OilPriceRevision.objects.bulk_create(revisions)
+            revisions = []
+    OilPriceRevision.objects.bulk_create(revisions)
+    ServicePriceRevision.objects.bulk_create(
+        ServicePriceRevision(service_id=service_id, price=price, effective_from=now, source='initial', applied_at=now)
+        for service_id, price in AdditionalService.objects.values_list('id', 'price')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kiosk', '0025_oil_price_import'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OilPriceRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('price', models.PositiveIntegerField(blank=True, null=True, verbose_name='가격')),
+                ('effective_from', models.DateTimeField(verbose_name='적용 시작')),
+                ('source', models.CharField(choices=[('initial', '최초 기록'), ('staff', '직원 수정'), ('import', '단가표 임포트'), ('schedule', '예약 변경')], max_length=20, verbose_name='출처')),
+                ('applied_at', models.DateTimeField(blank=True, null=True, verbose_name='반영일시')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='등록일시')),
+                ('car_model', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_revisions', to='kiosk.carmodel', verbose_name='차종')),
+                ('fuel_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_revisions', to='kiosk.fueltype', verbose_name='연료타입')),
+                ('oil_product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_revisions', to='kiosk.oilproduct', verbose_name='오일 제품')),
+            ],
+            options={
+                'verbose_name': '오일 가격 이력',
+                'verbose_name_plural': '오일 가격 이력',
+                'indexes': [models.Index(fields=['car_model', 'oil_product', 'fuel_type', 'effective_from', 'id'], name='oil_revision_asof_idx'), models.Index(condition=models.Q(('applied_at__isnull', True)), fields=['effective_from'], name='oil_revision_pending_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ServicePriceRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('price', models.PositiveIntegerField(verbose_name='가격')),
+                ('effective_from', models.DateTimeField(verbose_name='적용 시작')),
+                ('source', models.CharField(choices=[('initial', '최초 기록'), ('staff', '직원 수정'), ('import', '단가표 임포트'), ('schedule', '예약 변경')], max_length=20, verbose_name='출처')),
+                ('applied_at', models.DateTimeField(blank=True, null=True, verbose_name='반영일시')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='등록일시')),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_revisions', to='kiosk.additionalservice', verbose_name='추가 서비스')),
+            ],
+            options={
+                'verbose_name': '추가 서비스 가격 이력',
+                'verbose_name_plural': '추가 서비스 가격 이력',
+                'indexes': [models.Index(fields=['service', 'effective_from', 'id'], name='service_revision_asof_idx'), models.Index(condition=models.Q(('applied_at__isnull', True)), fields=['effective_from'], name='service_revision_pending_idx')],
+            },
+        ),
+        migrations.RunPython(record_initial_revisions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.10 on 2026-10-17 22:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kiosk', '0026_price_revision'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheVersion',
+            fields=[
+                ('key', models.CharField(max_length=100, primary_key=True, serialize=False, verbose_name='키')),
+                ('version', models.PositiveBigIntegerField(default=1, verbose_name='버전')),
+            ],
+            options={
+                'verbose_name': '캐시 버전',
+                'verbose_name_plural': '캐시 버전',
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.10 on 2026-10-17 22:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_car_model_names(apps, schema_editor):
+    """기존 이력에 차종명 기록 (차종별 UPDATE 1회)"""
+    CarModel = apps.get_model('kiosk', 'CarModel')
+    OilPriceRevision = apps.get_model('kiosk', 'OilPriceRevision')
+
+    model_ids = OilPriceRevision.objects.values_list('car_model_id', flat=True).distinct()
+    for model_id, brand_name, parent_name, name in CarModel.objects.filter(id__in=model_ids).values_list(
+        'id', 'brand__name', 'parent__name', 'name',
+    ):
+        full_name = ' '.join(part for part in (brand_name, parent_name, name) if part)
+        OilPriceRevision.objects.filter(car_model_id=model_id).update(car_model_name=full_name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kiosk', '0027_cache_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='oilpricerevision',
+            name='car_model_name',
+            field=models.CharField(blank=True, max_length=200, verbose_name='차종명'),
+        ),
+        migrations.AlterField(
+            model_name='oilpricerevision',
+            name='car_model',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='price_revisions', to='kiosk.carmodel', verbose_name='차종'),
+        ),
+        migrations.RunPython(fill_car_model_names, migrations.RunPython.noop),
+    ]
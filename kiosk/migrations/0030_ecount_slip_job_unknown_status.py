@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-17 22:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kiosk', '0029_notification_unknown_status'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ecountslipjob',
+            name='status',
+            field=models.CharField(choices=[('pending', '대기'), ('done', '완료'), ('failed', '실패'), ('unknown', '확인 필요')], default='pending', max_length=20, verbose_name='상태'),
+        ),
+    ]
@@ -1,4 +1,31 @@
-from django.db import models
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+
+
+def business_date(value=None):
+    """영업일 (TIME_ZONE=Asia/Seoul 기준 날짜). value가 없으면 오늘"""
+    return timezone.localdate(value)
+
+
+def phone_key(phone):
+    """전화번호 비교용 키 (숫자만)"""
+    return ''.join(c for c in phone or '' if c.isdigit())
+
+
+# 오일 교체 안내 기준: 하루 평균 주행거리로 다음 교체 주행거리 도달일을 추정, 늦어도 완료 후 N일
+REMINDER_DAILY_KM = getattr(settings, 'REMINDER_DAILY_KM', 40)
+REMINDER_MAX_DAYS = getattr(settings, 'REMINDER_MAX_DAYS', 180)
+
+
+def reminder_due_date(completed_date, mileage_current=None, mileage_next=None):
+    """교체 안내 예정일 (완료 영업일 기준)"""
+    days = REMINDER_MAX_DAYS
+    if mileage_current is not None and mileage_next and mileage_next > mileage_current:
+        days = min(days, -(-(mileage_next - mileage_current) // REMINDER_DAILY_KM))
+    return completed_date + timedelta(days=days)
 
 
 class StoreSettings(models.Model):
@@ -142,6 +169,59 @@ class OilPrice(models.Model):
         return f"{self.car_model} / {self.oil_product.name} / {self.fuel_type.name} = {self.price:,}원"
 
 
+class OilPriceImport(models.Model):
+    """단가표 임포트 이력 (같은 내용의 단가표 재임포트 생략용)"""
+    content_hash = models.CharField(max_length=64, db_index=True, verbose_name='내용 해시')
+    filename = models.CharField(max_length=255, blank=True, verbose_name='파일명')
+    summary = models.JSONField(default=dict, verbose_name='변경 요약')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='적용일시')
+
+    class Meta:
+        verbose_name = '단가표 임포트'
+        verbose_name_plural = '단가표 임포트'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.created_at:%Y-%m-%d %H:%M} {self.filename}"
+
+
+REVISION_SOURCE_CHOICES = [
+    ('initial', '최초 기록'),
+    ('staff', '직원 수정'),
+    ('import', '단가표 임포트'),
+    ('schedule', '예약 변경'),
+]
+
+
+class OilPriceRevision(models.Model):
+    """
+    오일 가격 변경 이력 (추가 전용). price가 None이면 그 시점부터 가격 없음.
+    effective_from이 미래면 예약 변경 - 활성화(activate_price_revisions) 시 OilPrice에 반영하고 applied_at 기록.
+    차종을 삭제해도 이력은 남는다 (car_model은 NULL, 차종명은 car_model_name에 보존).
+    """
+    car_model = models.ForeignKey(CarModel, on_delete=models.SET_NULL, null=True, blank=True, related_name='price_revisions', verbose_name='차종')
+    car_model_name = models.CharField(max_length=200, blank=True, verbose_name='차종명')
+    oil_product = models.ForeignKey(OilProduct, on_delete=models.CASCADE, related_name='price_revisions', verbose_name='오일 제품')
+    fuel_type = models.ForeignKey(FuelType, on_delete=models.CASCADE, related_name='price_revisions', verbose_name='연료타입')
+    price = models.PositiveIntegerField(null=True, blank=True, verbose_name='가격')
+    effective_from = models.DateTimeField(verbose_name='적용 시작')
+    source = models.CharField(max_length=20, choices=REVISION_SOURCE_CHOICES, verbose_name='출처')
+    applied_at = models.DateTimeField(null=True, blank=True, verbose_name='반영일시')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='등록일시')
+
+    class Meta:
+        verbose_name = '오일 가격 이력'
+        verbose_name_plural = '오일 가격 이력'
+        indexes = [
+            # 셀별 "시점 T의 가격" = 인덱스 역순 탐색 1회
+            models.Index(fields=['car_model', 'oil_product', 'fuel_type', 'effective_from', 'id'], name='oil_revision_asof_idx'),
+            models.Index(fields=['effective_from'], condition=models.Q(applied_at__isnull=True), name='oil_revision_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.car_model_name}/{self.oil_product_id}/{self.fuel_type_id} {self.effective_from:%Y-%m-%d %H:%M} = {self.price}"
+
+
 class AdditionalService(models.Model):
     """추가 서비스 (에어컨 필터, 와이퍼 등)"""
     name = models.CharField(max_length=100, verbose_name='서비스명')
@@ -159,6 +239,27 @@ class AdditionalService(models.Model):
         return f"{self.name} ({self.price:,}원)"
 
 
+class ServicePriceRevision(models.Model):
+    """추가 서비스 가격 변경 이력 (추가 전용, 예약 변경은 OilPriceRevision과 같은 방식)"""
+    service = models.ForeignKey(AdditionalService, on_delete=models.CASCADE, related_name='price_revisions', verbose_name='추가 서비스')
+    price = models.PositiveIntegerField(verbose_name='가격')
+    effective_from = models.DateTimeField(verbose_name='적용 시작')
+    source = models.CharField(max_length=20, choices=REVISION_SOURCE_CHOICES, verbose_name='출처')
+    applied_at = models.DateTimeField(null=True, blank=True, verbose_name='반영일시')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='등록일시')
+
+    class Meta:
+        verbose_name = '추가 서비스 가격 이력'
+        verbose_name_plural = '추가 서비스 가격 이력'
+        indexes = [
+            models.Index(fields=['service', 'effective_from', 'id'], name='service_revision_asof_idx'),
+            models.Index(fields=['effective_from'], condition=models.Q(applied_at__isnull=True), name='service_revision_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.service_id} {self.effective_from:%Y-%m-%d %H:%M} = {self.price:,}원"
+
+
 class ServiceOrder(models.Model):
     """시공 주문"""
     STATUS_CHOICES = [
@@ -181,6 +282,10 @@ class ServiceOrder(models.Model):
     oil_product_name = models.CharField(max_length=100, verbose_name='제품명')
     oil_price = models.PositiveIntegerField(verbose_name='오일 가격')
 
+    # 합계 (비정규화 - ServiceOrderItem 변경 시 갱신)
+    services_total = models.PositiveIntegerField(default=0, verbose_name='추가 서비스 합계')
+    total_price = models.PositiveIntegerField(default=0, verbose_name='총 금액')
+
     # 주행거리
     mileage_current = models.PositiveIntegerField(null=True, blank=True, verbose_name='현재 주행거리')
     mileage_next = models.PositiveIntegerField(null=True, blank=True, verbose_name='다음 교체 주행거리')
@@ -192,32 +297,121 @@ class ServiceOrder(models.Model):
     # 멤버십 할인
     membership_discount = models.BooleanField(default=False, verbose_name='운산 멤버십 할인')
 
+    # 중복 제출 방지 (키오스크에서 발급한 멱등 키)
+    idempotency_key = models.CharField(max_length=64, null=True, blank=True, unique=True, verbose_name='멱등 키')
+
     # 이카운트 ERP 연동
     ecount_slip_no = models.CharField(max_length=30, blank=True, default='', verbose_name='이카운트 매출전표번호')
     ecount_purchase_slip_no = models.CharField(max_length=30, blank=True, default='', verbose_name='이카운트 매입전표번호')
 
     # 시간
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='생성일시', db_index=True)
-    updated_at = models.DateTimeField(auto_now=True, verbose_name='수정일시')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='수정일시', db_index=True)
     completed_at = models.DateTimeField(null=True, blank=True, verbose_name='완료일시')
 
+    # 영업일 (저장 시 생성/완료 일시에서 계산 - "오늘" 조회는 인덱스 동등 비교)
+    business_date = models.DateField(editable=False, db_index=True, verbose_name='영업일')
+    completed_date = models.DateField(null=True, blank=True, editable=False, db_index=True, verbose_name='완료 영업일')
+    # 완료 영업일 내 완료 순번 (완료 전환 시 1회 발급 - 이카운트 적요 "N." 접두어)
+    completion_seq = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name='완료 순번')
+    # 교체 안내: 같은 고객(숫자만 남긴 전화번호)의 최신 완료 주문 기준으로 1회 발송
+    phone_key = models.CharField(max_length=20, blank=True, default='', editable=False, verbose_name='전화번호 키')
+    reminder_due_date = models.DateField(null=True, blank=True, editable=False, db_index=True, verbose_name='교체 안내 예정일')
+    reminded_at = models.DateTimeField(null=True, blank=True, verbose_name='교체 안내 발송일시')
+
     class Meta:
         verbose_name = '시공 주문'
         verbose_name_plural = '시공 주문'
         ordering = ['-created_at']
+        indexes = [
+            # 교체 안내 대상의 "같은 고객의 더 최근 주문" 확인용
+            models.Index(fields=['phone_key', 'created_at'], name='order_phone_latest_idx'),
+        ]
 
     def __str__(self):
         car_info = f"{self.brand.name} {self.car_model.name}" if self.brand and self.car_model else "차량정보없음"
         return f"[{self.get_status_display()}] {self.car_number or '번호없음'} - {car_info}"
 
-    @property
-    def total_price(self):
-        services_total = sum(item.price for item in self.services.all())
-        return self.oil_price + services_total
+    def save(self, *args, **kwargs):
+        # 총 금액은 항상 오일 가격 + 추가 서비스 합계
+        self.total_price = (self.oil_price or 0) + (self.services_total or 0)
+        self.business_date = business_date(self.created_at)
+        self.completed_date = business_date(self.completed_at) if self.completed_at else None
+        self.phone_key = phone_key(self.customer_phone)
+        if self.status == 'completed' and self.completed_date:
+            self.reminder_due_date = reminder_due_date(self.completed_date, self.mileage_current, self.mileage_next)
+        else:
+            self.reminder_due_date = None
+        # 완료 전환 시 순번 발급, 완료 해제 시 반납
+        if self.status == 'completed':
+            seq_changed = self.completion_seq is None
+        else:
+            seq_changed = self.completion_seq is not None
+            self.completion_seq = None
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if {'oil_price', 'services_total'} & update_fields:
+                update_fields.add('total_price')
+            if 'created_at' in update_fields:
+                update_fields.add('business_date')
+            if 'completed_at' in update_fields:
+                update_fields.add('completed_date')
+            if 'customer_phone' in update_fields:
+                update_fields.add('phone_key')
+            if {'status', 'completed_at', 'mileage_current', 'mileage_next'} & update_fields:
+                update_fields.add('reminder_due_date')
+            if seq_changed:
+                update_fields.add('completion_seq')
+            kwargs['update_fields'] = update_fields
+
+        if self.status == 'completed' and seq_changed:
+            # 순번 증가와 주문 저장을 한 트랜잭션으로 (저장 실패 시 순번도 롤백)
+            with transaction.atomic():
+                self.completion_seq = CompletionSequence.next(self.completed_date or business_date())
+                super().save(*args, **kwargs)
+        else:
+            super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # 일별 집계 증분 갱신용 - 로드 시점 상태/금액 기억
+        instance._stats_state = instance._current_stats_state()
+        return instance
+
+    def _current_stats_state(self):
+        """(완료 여부, 총 금액) - 필드가 지연 로딩이면 None"""
+        if 'status' not in self.__dict__ or 'total_price' not in self.__dict__:
+            return None
+        return (self.status == 'completed', self.total_price)
+
+    def refresh_totals(self):
+        """추가 서비스 항목 합계를 다시 계산해 저장"""
+        self.services_total = refresh_order_totals(self.pk)
+        self.total_price = self.oil_price + self.services_total
 
-    @property
-    def services_total(self):
-        return sum(item.price for item in self.services.all())
+
+class CompletionSequence(models.Model):
+    """완료 영업일별 마지막 완료 순번"""
+    date = models.DateField(unique=True, verbose_name='완료 영업일')
+    last_value = models.PositiveIntegerField(default=0, verbose_name='마지막 순번')
+
+    class Meta:
+        verbose_name = '완료 순번'
+        verbose_name_plural = '완료 순번'
+
+    def __str__(self):
+        return f"{self.date} #{self.last_value}"
+
+    @classmethod
+    def next(cls, date):
+        """해당 일자의 다음 순번 발급 (행 UPDATE로 동시 발급 직렬화)"""
+        cls.objects.get_or_create(date=date)
+        with transaction.atomic():
+            cls.objects.filter(date=date).update(last_value=models.F('last_value') + 1)
+            return cls.objects.filter(date=date).values_list('last_value', flat=True).get()
 
 
 class ServiceOrderItem(models.Model):
@@ -236,6 +430,234 @@ class ServiceOrderItem(models.Model):
         return f"{self.name} ({self.price:,}원)"
 
 
+def refresh_order_totals(order_id):
+    """주문의 추가 서비스 합계/총 금액 재계산 (UPDATE 1회). 새 서비스 합계 반환"""
+    services_total = ServiceOrderItem.objects.filter(order_id=order_id).aggregate(
+        total=models.Sum('price'),
+    )['total'] or 0
+    order = ServiceOrder.objects.filter(pk=order_id).only('status', 'services_total', 'business_date').first()
+    if order is None:
+        return services_total
+    ServiceOrder.objects.filter(pk=order_id).update(
+        services_total=services_total,
+        total_price=models.F('oil_price') + services_total,
+    )
+    # 완료된 주문의 금액이 바뀌면 일별 매출도 보정
+    if order.status == 'completed' and services_total != order.services_total:
+        DailyOrderStats.add(_stats_date(order), revenue=services_total - order.services_total)
+    return services_total
+
+
+class DailyOrderStats(models.Model):
+    """일별 주문 집계 (주문 생성일 기준, 주문 저장/삭제 시 증분 갱신)"""
+    date = models.DateField(unique=True, verbose_name='일자')
+    orders = models.IntegerField(default=0, verbose_name='주문 수')
+    completed = models.IntegerField(default=0, verbose_name='완료 수')
+    revenue = models.BigIntegerField(default=0, verbose_name='완료 매출')
+
+    class Meta:
+        verbose_name = '일별 주문 집계'
+        verbose_name_plural = '일별 주문 집계'
+        ordering = ['-date']
+
+    def __str__(self):
+        return f"{self.date} 주문 {self.orders} / 완료 {self.completed}"
+
+    @classmethod
+    def add(cls, date, orders=0, completed=0, revenue=0):
+        """해당 일자 카운터에 증감 반영 (UPDATE, 행이 없으면 생성)"""
+        updated = cls.objects.filter(date=date).update(
+            orders=models.F('orders') + orders,
+            completed=models.F('completed') + completed,
+            revenue=models.F('revenue') + revenue,
+        )
+        if not updated:
+            _, created = cls.objects.get_or_create(
+                date=date, defaults={'orders': orders, 'completed': completed, 'revenue': revenue},
+            )
+            if not created:
+                # 동시 생성 경합 - 다른 요청이 먼저 만든 행에 반영
+                cls.add(date, orders, completed, revenue)
+
+    @classmethod
+    def totals(cls):
+        """전체 기간 합계 {'orders', 'completed', 'revenue'} (일 수만큼만 집계)"""
+        result = cls.objects.aggregate(
+            orders=models.Sum('orders'),
+            completed=models.Sum('completed'),
+            revenue=models.Sum('revenue'),
+        )
+        return {key: value or 0 for key, value in result.items()}
+
+
+def _stats_date(order):
+    return order.business_date
+
+
+def order_saved(sender, instance, created, **kwargs):
+    """시그널 핸들러: 주문 생성/상태 전환 → 일별 집계 증감"""
+    new_state = instance._current_stats_state()
+    if new_state is None:
+        return
+    old_state = (False, 0) if created else getattr(instance, '_stats_state', None)
+    instance._stats_state = new_state
+    if old_state is None or old_state == new_state:
+        return
+
+    was_completed, old_total = old_state
+    is_completed, new_total = new_state
+    DailyOrderStats.add(
+        _stats_date(instance),
+        orders=1 if created else 0,
+        completed=int(is_completed) - int(was_completed),
+        revenue=(new_total if is_completed else 0) - (old_total if was_completed else 0),
+    )
+
+
+def order_deleted(sender, instance, **kwargs):
+    """시그널 핸들러: 주문 삭제 → 일별 집계에서 제외"""
+    is_completed = instance.status == 'completed'
+    DailyOrderStats.add(
+        _stats_date(instance),
+        orders=-1,
+        completed=-int(is_completed),
+        revenue=-instance.total_price if is_completed else 0,
+    )
+
+
+def service_item_changed(sender, instance, **kwargs):
+    """시그널 핸들러: 주문 서비스 항목 저장/삭제 → 주문 합계 갱신"""
+    origin = kwargs.get('origin')
+    if isinstance(origin, ServiceOrder) or getattr(origin, 'model', None) is ServiceOrder:
+        return  # 주문 삭제에 따른 연쇄 삭제
+    refresh_order_totals(instance.order_id)
+
+
+class EcountSlipJob(models.Model):
+    """이카운트 전표 생성 아웃박스 (주문 상태 변경과 같은 트랜잭션에서 기록, 워커가 처리)"""
+    KIND_CHOICES = [
+        ('sales', '매출전표'),
+        ('purchase', '매입전표(멤버십)'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', '대기'),
+        ('done', '완료'),
+        ('failed', '실패'),
+        ('unknown', '확인 필요'),
+    ]
+
+    order = models.ForeignKey(ServiceOrder, on_delete=models.CASCADE, related_name='ecount_jobs', verbose_name='주문')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, verbose_name='전표 종류')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', verbose_name='상태')
+    attempts = models.PositiveIntegerField(default=0, verbose_name='시도 횟수')
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name='다음 시도 일시')
+    last_error = models.TextField(blank=True, verbose_name='마지막 오류')
+    slip_no = models.CharField(max_length=30, blank=True, default='', verbose_name='전표번호')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='생성일시')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='수정일시')
+
+    class Meta:
+        verbose_name = '이카운트 전표 작업'
+        verbose_name_plural = '이카운트 전표 작업'
+        ordering = ['next_attempt_at']
+        constraints = [
+            models.UniqueConstraint(fields=['order', 'kind'], name='unique_ecount_job_per_order_kind'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='ecount_job_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"[{self.get_status_display()}] 주문#{self.order_id} {self.get_kind_display()}"
+
+
+class CacheVersion(models.Model):
+    """캐시 무효화 버전 카운터 (키별 1행 - 웹 워커/커맨드 프로세스가 공유)"""
+    key = models.CharField(max_length=100, primary_key=True, verbose_name='키')
+    version = models.PositiveBigIntegerField(default=1, verbose_name='버전')
+
+    class Meta:
+        verbose_name = '캐시 버전'
+        verbose_name_plural = '캐시 버전'
+
+    def __str__(self):
+        return f"{self.key} = {self.version}"
+
+
+class EcountSession(models.Model):
+    """이카운트 API 세션 (싱글톤 pk=1 - 모든 워커가 공유)"""
+    session_id = models.CharField(max_length=200, blank=True, default='', verbose_name='세션 ID')
+    host_url = models.CharField(max_length=200, blank=True, default='', verbose_name='API 호스트')
+    logged_in_at = models.DateTimeField(null=True, blank=True, verbose_name='로그인 일시')
+    # 로그인 진행 중 표시 - 이 시각까지 다른 워커는 새 세션을 기다림
+    refreshing_until = models.DateTimeField(null=True, blank=True, verbose_name='로그인 진행 만료')
+
+    class Meta:
+        verbose_name = '이카운트 세션'
+        verbose_name_plural = '이카운트 세션'
+
+    def __str__(self):
+        return f"이카운트 세션 ({self.logged_in_at or '없음'})"
+
+
+class PpurioToken(models.Model):
+    """뿌리오 인증 토큰 (싱글톤 pk=1 - 모든 워커가 공유)"""
+    token = models.TextField(blank=True, default='', verbose_name='토큰')
+    expires_at = models.DateTimeField(null=True, blank=True, verbose_name='만료 일시')
+    # 발급 진행 중 표시 - 이 시각까지 다른 워커는 새 토큰을 기다림
+    refreshing_until = models.DateTimeField(null=True, blank=True, verbose_name='발급 진행 만료')
+
+    class Meta:
+        verbose_name = '뿌리오 토큰'
+        verbose_name_plural = '뿌리오 토큰'
+
+    def __str__(self):
+        return f"뿌리오 토큰 (만료 {self.expires_at or '-'})"
+
+
+class Notification(models.Model):
+    """고객 알림 발송 큐 (알림톡 → 실패 시 SMS 대체, 워커가 발송)"""
+    CHANNEL_CHOICES = [
+        ('alimtalk', '알림톡'),
+        ('sms', 'SMS'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', '대기'),
+        ('sent', '발송'),
+        ('failed', '실패'),
+        ('unknown', '확인 필요'),  # 발송 요청 타임아웃 등 - 뿌리오 수신 여부를 알 수 없어 재발송하지 않음
+    ]
+
+    order = models.ForeignKey(ServiceOrder, on_delete=models.CASCADE, null=True, blank=True, related_name='notifications', verbose_name='주문')
+    kind = models.CharField(max_length=30, verbose_name='알림 종류')
+    # 중복 발송 방지 키 (주문/알림 종류별 1건) - 뿌리오 refKey로도 전달
+    ref_key = models.CharField(max_length=100, unique=True, verbose_name='참조 키')
+    phone = models.CharField(max_length=20, verbose_name='수신 번호')
+    message = models.TextField(verbose_name='메시지')
+    fallback_message = models.TextField(blank=True, verbose_name='SMS 대체 메시지')
+
+    channel = models.CharField(max_length=20, choices=CHANNEL_CHOICES, default='alimtalk', verbose_name='발송 채널')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', verbose_name='상태')
+    attempts = models.PositiveIntegerField(default=0, verbose_name='시도 횟수')
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name='다음 시도 일시')
+    last_error = models.TextField(blank=True, verbose_name='마지막 오류')
+    provider_message_id = models.CharField(max_length=100, blank=True, default='', verbose_name='뿌리오 메시지 키')
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name='발송 일시')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='생성일시')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='수정일시')
+
+    class Meta:
+        verbose_name = '고객 알림'
+        verbose_name_plural = '고객 알림'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='notification_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"[{self.get_status_display()}] {self.kind} {self.phone}"
+
+
 class ServiceOrderPhoto(models.Model):
     """시공 완료 사진"""
     order = models.ForeignKey(ServiceOrder, on_delete=models.CASCADE, related_name='photos', verbose_name='주문')
@@ -292,6 +714,13 @@ class Reservation(models.Model):
         ('other', '기타'),
     ]
 
+    REMINDER_STATUS_CHOICES = [
+        ('', '미발송'),
+        ('sending', '발송중'),
+        ('sent', '발송완료'),
+        ('failed', '발송실패'),
+    ]
+
     # 예약 정보
     date = models.DateField(verbose_name='예약일', db_index=True)
     time = models.TimeField(verbose_name='예약시간')
@@ -320,14 +749,22 @@ class Reservation(models.Model):
     # 메모
     memo = models.TextField(blank=True, verbose_name='메모')
 
+    # 전날 안내 발송 상태 (발송중 = 요청 결과를 모름 → 재실행 시 다시 보내지 않음)
+    reminder_status = models.CharField(max_length=10, choices=REMINDER_STATUS_CHOICES, blank=True, default='', verbose_name='전날 안내')
+    reminder_ref = models.CharField(max_length=100, blank=True, default='', verbose_name='전날 안내 refKey')
+    reminded_at = models.DateTimeField(null=True, blank=True, verbose_name='전날 안내 발송일시')
+
     # 시간
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='등록일시')
-    updated_at = models.DateTimeField(auto_now=True, verbose_name='수정일시')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='수정일시', db_index=True)
 
     class Meta:
         verbose_name = '예약'
         verbose_name_plural = '예약'
         ordering = ['date', 'time']
+        indexes = [
+            models.Index(fields=['date', 'status'], name='reservation_date_status_idx'),
+        ]
 
     def __str__(self):
         return f"{self.date} {self.time.strftime('%H:%M')} - {self.customer_name or self.customer_phone}"
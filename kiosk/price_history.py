@@ -0,0 +1,143 @@
+"""
+가격 변경 이력 (추가 전용)
+오일 가격(차종×제품×연료)과 추가 서비스 가격의 변경을 적용 시작 시각(effective_from)과 함께 쌓고,
+(대상, effective_from) 인덱스 역순 탐색 1회로 "시점 T의 가격"을 조회한다.
+effective_from이 미래인 이력은 예약 변경 - activate_due()(activate_price_revisions --loop 워커, 매분)가
+현재 가격 테이블(OilPrice, AdditionalService.price)에 반영한다. 키오스크는 계속 현재 가격 테이블만 읽는다.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from . import pricing
+from .models import AdditionalService, OilPriceRevision, ServicePriceRevision
+
+# 활성화 시 한 번에 처리하는 이력 수
+ACTIVATE_CHUNK_SIZE = 500
+
+
+# ============================================
+# 시점 조회
+# ============================================
+
+def oil_price_as_of(car_model_id, oil_product_id, fuel_type_id, at=None):
+    """시점 at(기본: 지금)의 셀 가격 (가격 없거나 이력 없으면 None)"""
+    return OilPriceRevision.objects.filter(
+        car_model_id=car_model_id, oil_product_id=oil_product_id, fuel_type_id=fuel_type_id,
+        effective_from__lte=at or timezone.now(),
+    ).order_by('-effective_from', '-id').values_list('price', flat=True).first()
+
+
+def service_price_as_of(service_id, at=None):
+    """시점 at(기본: 지금)의 추가 서비스 가격 (이력 없으면 None)"""
+    return ServicePriceRevision.objects.filter(
+        service_id=service_id, effective_from__lte=at or timezone.now(),
+    ).order_by('-effective_from', '-id').values_list('price', flat=True).first()
+
+
+# ============================================
+# 예약 변경
+# ============================================
+
+def schedule_oil(cells, effective_from):
+    """
+    오일 가격 예약 변경 등록 (현재 가격은 그대로, 활성화 때 반영)
+    cells: {(car_model_id, oil_product_id, fuel_type_id): 가격 또는 None(셀 비움)}
+    """
+    names = pricing.car_model_names(key[0] for key in cells)
+    OilPriceRevision.objects.bulk_create((
+        OilPriceRevision(
+            car_model_id=car_model_id, car_model_name=names.get(car_model_id, ''),
+            oil_product_id=product_id, fuel_type_id=fuel_id,
+            price=price or None, effective_from=effective_from, source='schedule',
+        )
+        for (car_model_id, product_id, fuel_id), price in cells.items()
+    ), batch_size=ACTIVATE_CHUNK_SIZE)
+    return len(cells)
+
+
+def schedule_service(service_id, price, effective_from):
+    """추가 서비스 가격 예약 변경 등록"""
+    return ServicePriceRevision.objects.create(
+        service_id=service_id, price=price, effective_from=effective_from, source='schedule',
+    )
+
+
+def on_service_saved(sender, instance, created, **kwargs):
+    """시그널 핸들러: 추가 서비스 저장 시 마지막으로 반영된 가격과 다르면 이력 추가"""
+    last = ServicePriceRevision.objects.filter(
+        service_id=instance.pk, applied_at__isnull=False,
+    ).order_by('-effective_from', '-id').values_list('price', flat=True).first()
+    if created or last != instance.price:
+        now = timezone.now()
+        ServicePriceRevision.objects.create(
+            service_id=instance.pk, price=instance.price, effective_from=now,
+            source='initial' if created else 'staff', applied_at=now,
+        )
+
+
+# ============================================
+# 활성화
+# ============================================
+
+def _latest_due(model, key_fields, pending, now):
+    """
+    대기 이력이 있는 대상별 현재 시점 최신 이력 {대상 키: (applied_at, price)}
+    가장 이른 대기 이력 이후의 이력만 읽는다 (그보다 오래된 이력은 대기 이력을 덮지 못함).
+    """
+    keys = {row[1:] for row in pending}
+    since = min(row[0] for row in pending)
+    latest = {}
+    revisions = model.objects.filter(
+        **{f'{key_fields[0]}__in': {key[0] for key in keys}},
+        effective_from__gte=since, effective_from__lte=now,
+    ).order_by('effective_from', 'id').values_list(*key_fields, 'applied_at', 'price')
+    for row in revisions.iterator(chunk_size=2000):
+        key = row[:len(key_fields)]
+        if key in keys:
+            latest[key] = row[len(key_fields):]
+    return latest
+
+
+def activate_due(now=None):
+    """
+    적용 시각이 지난 예약 변경을 현재 가격 테이블에 반영 (한 트랜잭션, 반복 실행 안전).
+    같은 대상에 더 새로운 이력이 이미 반영돼 있으면 예약 변경은 반영 없이 처리 완료로 기록한다.
+
+    Returns:
+        dict: {'oil_revisions', 'oil_cells', 'service_revisions', 'services'}
+    """
+    now = now or timezone.now()
+    stats = {'oil_revisions': 0, 'oil_cells': 0, 'service_revisions': 0, 'services': 0}
+    oil_keys = ('car_model_id', 'oil_product_id', 'fuel_type_id')
+
+    with transaction.atomic():
+        pending = list(OilPriceRevision.objects.filter(
+            applied_at__isnull=True, effective_from__lte=now,
+        ).values_list('id', 'effective_from', *oil_keys))
+        if pending:
+            latest = _latest_due(OilPriceRevision, oil_keys, [row[1:] for row in pending], now)
+            # 그 사이 삭제된 차종(car_model NULL)의 예약 변경은 반영 없이 처리 완료
+            cells = {
+                key: price for key, (applied_at, price) in latest.items()
+                if applied_at is None and key[0] is not None
+            }
+            pricing.bulk_apply(cells, revisions=False)
+            ids = [row[0] for row in pending]
+            for start in range(0, len(ids), ACTIVATE_CHUNK_SIZE):
+                OilPriceRevision.objects.filter(pk__in=ids[start:start + ACTIVATE_CHUNK_SIZE]).update(applied_at=now)
+            stats.update(oil_revisions=len(ids), oil_cells=len(cells))
+
+        pending = list(ServicePriceRevision.objects.filter(
+            applied_at__isnull=True, effective_from__lte=now,
+        ).values_list('id', 'effective_from', 'service_id'))
+        if pending:
+            latest = _latest_due(ServicePriceRevision, ('service_id',), [row[1:] for row in pending], now)
+            for (service_id,), (applied_at, price) in latest.items():
+                if applied_at is None:
+                    # update()는 시그널을 보내지 않으므로 이력이 중복되지 않음 → 서비스 캐시 버전만 직접 증가
+                    stats['services'] += AdditionalService.objects.filter(pk=service_id).update(price=price)
+            ServicePriceRevision.objects.filter(pk__in=[row[0] for row in pending]).update(applied_at=now)
+            stats['service_revisions'] = len(pending)
+            if stats['services']:
+                transaction.on_commit(pricing.bump_service_version)
+    return stats
@@ -0,0 +1,177 @@
+"""
+오일 가격 관리 피벗 (전체 브랜드 × 전체 연료)
+차종(세대)별 가격을 LEFT JOIN 쿼리 한 번으로 읽어 브랜드 구간 → 행(차종, 연료×제품 가격 배열)의
+압축 피벗으로 만들고, 스크롤 지연 로딩용 페이지 JSON을 미리 인코딩해 둔다.
+카탈로그·가격 버전이 바뀔 때만 다시 빌드한다.
+"""
+import json
+import threading
+
+from django.db.models import F
+from django.db.models.functions import Coalesce
+
+from . import catalog, pricing
+from .catalog import get_version
+from .models import CarModel, OilProduct
+
+# 페이지당 최대 행 수 (브랜드 구간은 가능한 한 통째로 담고, 넘치면 나눈다)
+PAGE_ROWS = 100
+
+# 피벗 캐시 (프로세스 레벨)
+_pivot_cache = {
+    'versions': None,
+    'pivot': None,
+}
+_lock = threading.Lock()
+
+
+class PricePivot:
+    """
+    브랜드 구간별 차종 행 (읽기 전용)
+    sections: [{'brand_id', 'brand', 'rows': [[차종 id, 부모 차종명 또는 None, 차종명, [가격 또는 None, ...]], ...]}]
+    가격 배열은 연료(fuels) 순서 × 제품(products) 순서
+    """
+
+    def __init__(self, versions, fuels, products, sections, page_rows=PAGE_ROWS):
+        self.catalog_version, self.version = versions
+        self.fuels = fuels
+        self.products = products
+        self.fuel_pos = {f['id']: i for i, f in enumerate(fuels)}
+        self.sections = sections
+        self.section_map = {s['brand_id']: s for s in sections}
+
+        header = {
+            'fuels': fuels,
+            'products': [{'id': p.id, 'tier': p.tier, 'name': p.get_tier_display(), 'product_name': p.name}
+                         for p in products],
+            'brands': [{'id': s['brand_id'], 'name': s['brand'], 'rows': len(s['rows'])} for s in sections],
+        }
+        pages = self._paginate(page_rows)
+        self.pages = []
+        for number, page_sections in enumerate(pages, 1):
+            payload = {
+                'catalog_version': self.catalog_version,
+                'version': self.version,
+                'page': number,
+                'pages': len(pages),
+                'next': number + 1 if number < len(pages) else None,
+                'sections': page_sections,
+            }
+            if number == 1:
+                payload.update(header)
+            self.pages.append(json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+    def _paginate(self, page_rows):
+        """브랜드 구간을 page_rows 단위로 묶음 (큰 구간은 나누고 이어지는 조각에 continued 표시)"""
+        pages = [[]]
+        filled = 0
+        for section in self.sections:
+            rows = section['rows']
+            start = 0
+            while start < len(rows):
+                if filled >= page_rows:
+                    pages.append([])
+                    filled = 0
+                chunk = rows[start:start + page_rows - filled]
+                pages[-1].append({
+                    'brand_id': section['brand_id'], 'brand': section['brand'],
+                    'continued': start > 0, 'rows': chunk,
+                })
+                filled += len(chunk)
+                start += len(chunk)
+        return pages
+
+    def page(self, number):
+        """페이지 JSON bytes (1부터, 범위 밖이면 None)"""
+        if 1 <= number <= len(self.pages):
+            return self.pages[number - 1]
+        return None
+
+    def brand_rows(self, brand_id, fuel_id):
+        """브랜드×연료 관리 표 행 (oil_prices.html 형식)"""
+        section = self.section_map.get(brand_id)
+        fuel_pos = self.fuel_pos.get(fuel_id)
+        if section is None or fuel_pos is None:
+            return []
+        n_products = len(self.products)
+        offset = fuel_pos * n_products
+        rows = section['rows']
+        result = []
+        for i, (model_id, parent_name, name, prices) in enumerate(rows):
+            parent_id = section['parents'].get(model_id)
+            is_first = parent_id is None or i == 0 or section['parents'].get(rows[i - 1][0]) != parent_id
+            result.append({
+                'model_id': model_id,
+                'parent_id': parent_id,
+                'parent_name': parent_name,
+                'name': name,
+                'is_first_in_group': is_first,
+                'group_size': section['group_sizes'].get(parent_id, 1),
+                'prices': [
+                    {'product_id': p.id, 'price': prices[offset + pos]}
+                    for pos, p in enumerate(self.products)
+                ],
+            })
+        return result
+
+
+def _build(versions):
+    """피벗 빌드 (제품 1회 + 차종×가격 1회 쿼리, 연료는 카탈로그 스냅샷)"""
+    fuels = catalog.get_snapshot().fuels
+    products = list(OilProduct.objects.filter(is_active=True).order_by('order'))
+    fuel_pos = {f['id']: i for i, f in enumerate(fuels)}
+    product_pos = {p.id: i for i, p in enumerate(products)}
+    n_products = len(products)
+    width = len(fuels) * n_products
+
+    # 가격 없는 차종도 행이 나오도록 차종 기준 LEFT JOIN, 세대는 부모 자리에 모아서 (부모 자신의 행이 먼저)
+    cells = CarModel.objects.order_by(
+        'brand__order', 'brand__name', 'brand_id',
+        Coalesce('parent__order', 'order'), Coalesce('parent__name', 'name'), Coalesce('parent_id', 'id'),
+        F('parent_id').asc(nulls_first=True), 'order', 'name', 'id',
+    ).values_list(
+        'brand_id', 'brand__name', 'id', 'parent_id', 'parent__name', 'name',
+        'oil_prices__fuel_type_id', 'oil_prices__oil_product_id', 'oil_prices__price',
+    )
+
+    sections = []
+    section = None
+    row = None
+    for brand_id, brand_name, model_id, parent_id, parent_name, name, fuel_id, product_id, price in cells.iterator(
+            chunk_size=2000):
+        if section is None or section['brand_id'] != brand_id:
+            section = {'brand_id': brand_id, 'brand': brand_name, 'rows': [], 'parents': {}, 'group_sizes': {}}
+            sections.append(section)
+        if row is None or row[0] != model_id:
+            rows = section['rows']
+            if parent_id is not None:
+                # 세대가 있는 부모 차종은 관리 표에 행을 두지 않음 (바로 앞 행)
+                if parent_id not in section['group_sizes'] and rows and rows[-1][0] == parent_id:
+                    rows.pop()
+                section['parents'][model_id] = parent_id
+                section['group_sizes'][parent_id] = section['group_sizes'].get(parent_id, 0) + 1
+            row = [model_id, parent_name, name, [None] * width]
+            rows.append(row)
+        if fuel_id is not None and fuel_id in fuel_pos and product_id in product_pos:
+            row[3][fuel_pos[fuel_id] * n_products + product_pos[product_id]] = price
+
+    return PricePivot(versions, fuels, products, sections)
+
+
+def get_pivot():
+    """
+    현재 카탈로그·가격 버전의 피벗 (버전이 같으면 DB 조회 없음)
+    버전은 DB 공유(CacheVersion)라 다른 워커/커맨드의 변경도 확인 주기 안에 재빌드된다.
+    """
+    versions = (get_version(catalog.VERSION_KEY), get_version(pricing.VERSION_KEY))
+    pivot = _pivot_cache['pivot']
+    if pivot is not None and _pivot_cache['versions'] == versions:
+        return pivot
+
+    with _lock:
+        pivot = _pivot_cache['pivot']
+        if pivot is None or _pivot_cache['versions'] != versions:
+            pivot = _build(versions)
+            _pivot_cache['pivot'] = pivot
+            _pivot_cache['versions'] = versions
+    return pivot
@@ -0,0 +1,607 @@
+"""
+단가표(Excel) 임포트/익스포트
+임포트: 단가표를 (브랜드, 차종, 오일 티어, 연료) → 가격 셀로 파싱하고, 현재 가격 매트릭스를 메모리에 한 번 올려
+추가/변경/삭제 diff(계획)를 만든 뒤, 적용 시 바뀐 셀만 한 트랜잭션에서 묶음으로 반영한다.
+같은 내용(파싱 결과 해시)의 단가표가 마지막으로 적용된 것과 같으면 다시 적용하지 않는다.
+익스포트: 현재 가격 전체를 임포트와 같은 시트/열 배치(write-only, 커서에서 바로 기록)나 CSV로 내보낸다.
+"""
+import csv
+import hashlib
+import json
+import os
+import re
+import tempfile
+from itertools import chain, zip_longest
+
+from django.db import transaction
+from django.db.models import F, Max, Q
+from django.db.models.functions import Coalesce
+from openpyxl import Workbook, load_workbook
+
+from . import pricing
+from .models import CarBrand, CarModel, FuelType, OilProduct, OilPrice, OilPriceImport
+
+# 시트명(부분매칭) → OilProduct tier
+SHEET_TIER_MAP = [
+    ('킥스 GX5', 'economy'),
+    ('킥스 GX7', 'standard'),
+    ('킥스 Pao', 'premium'),
+    ('벤졸', 'premium_hybrid'),
+    ('슈퍼노멀', 'hyperformance'),
+    ('메탈로센', 'racing'),
+]
+
+# 시트 내 브랜드 그룹별 열 배치 (0-indexed column)
+# (brand_name, car_col, gasoline_col, diesel_col_or_none)
+BRAND_COLUMNS = [
+    ('현대', 1, 2, 3),
+    ('기아', 5, 6, 7),
+    ('제네시스', 9, 10, None),
+    ('르노코리아', 12, 13, 14),
+]
+
+# 엑셀에서 "쏘나타 DN8" 형식으로 세대 분리되는 차종
+GENERATION_PARENTS = {'쏘나타', '그랜져', '아반떼'}
+
+# 세대명 없이 부모명만 등장할 때 기본 세대명 매핑
+DEFAULT_GENERATION = {
+    '아반떼': 'CN7',
+}
+
+# 헤더/브랜드 키워드 (무시할 셀값)
+SKIP_VALUES = frozenset({
+    '차종', '현대', '기아', '제네시스', '르노', '르노코리아',
+    '휘발유', '경유', '휘발유/LPG', '휘발유/LPG/하이',
+    '하이브리드',
+})
+
+# 서브 브랜드 감지 키워드
+SUB_BRAND_DETECT = {
+    'KGM': 'KG모빌리티',
+    'KG모빌리티': 'KG모빌리티',
+    '쉐보레': '쉐보레',
+}
+
+
+def match_sheet_tier(sheet_name):
+    for keyword, tier in SHEET_TIER_MAP:
+        if keyword in sheet_name:
+            return tier
+    return None
+
+
+def parse_car_name(raw_name):
+    """차종명 파싱 → (모델명, 세대명 or None)"""
+    if not raw_name:
+        return None, None
+    raw_name = str(raw_name).strip()
+    if not raw_name:
+        return None, None
+
+    # 공백으로 분리: "쏘나타 DN8" → ("쏘나타", "DN8")
+    parts = raw_name.split(None, 1)
+    if len(parts) == 2 and parts[0] in GENERATION_PARENTS:
+        return parts[0], parts[1]
+
+    # "아반떼" → ("아반떼", "CN7") via DEFAULT_GENERATION
+    if raw_name in DEFAULT_GENERATION:
+        return raw_name, DEFAULT_GENERATION[raw_name]
+
+    return raw_name, None
+
+
+def parse_price(value):
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        v = int(value)
+        return v if v > 0 else None
+    if isinstance(value, str):
+        value = value.strip()
+        if value in ('-', '', '—', '–'):
+            return None
+        cleaned = re.sub(r'[^\d]', '', value)
+        return int(cleaned) if cleaned else None
+    return None
+
+
+def cell_value(row, col):
+    """행 튜플의 열 값 (read_only 모드는 빈 꼬리 열이 잘려 있을 수 있음)"""
+    return row[col] if col < len(row) else None
+
+
+def is_sub_brand_header(cell_value):
+    """서브 브랜드 헤더인지 확인. 매칭되면 brand_name 반환."""
+    if not cell_value:
+        return None
+    val = str(cell_value).strip()
+    # "KGM(쌍 용)" → starts with KGM
+    for keyword, brand_name in SUB_BRAND_DETECT.items():
+        if val == keyword or val.startswith(keyword + '('):
+            return brand_name
+    return None
+
+# 하이브리드는 휘발유 가격을 그대로 사용
+GASOLINE = '휘발유'
+DIESEL = '경유'
+HYBRID = '하이브리드'
+
+# 아반떼 CN7 세대 보정 - 부모 차종에 직접 걸린 가격은 CN7 세대로 이동
+AVANTE_PARENT = ('현대', None, '아반떼')
+AVANTE_CN7 = ('현대', '아반떼', 'CN7')
+
+
+def model_label(ref):
+    """차종 참조 (브랜드, 부모 차종명 또는 None, 차종명) → 표시명"""
+    brand_name, parent_name, name = ref
+    return ' '.join(part for part in (brand_name, parent_name, name) if part)
+
+
+class ParsedWorkbook:
+    """
+    파싱된 단가표 (DB 조회 없음)
+    cells: {(차종 참조, 티어, 연료명): 가격 또는 None(셀 비움)}
+    sheets: [(시트명, 티어, {브랜드명: 가격 셀 수}), ...]
+    """
+
+    def __init__(self, filename=''):
+        self.filename = filename
+        self.cells = {}
+        self.sheets = []
+
+    def set_price(self, ref, tier, fuel_name, price):
+        """셀 수집 - 가격이 없으면 셀 비움으로 기록 (같은 셀에 이미 가격이 있으면 유지)"""
+        key = (ref, tier, fuel_name)
+        if price:
+            self.cells[key] = price
+        else:
+            self.cells.setdefault(key, None)
+
+    def content_hash(self):
+        """파싱 결과 해시 (파일 메타데이터/서식과 무관하게 셀 내용이 같으면 같은 값)"""
+        rows = sorted(
+            [brand_name, parent_name or '', name, tier, fuel_name, price or 0]
+            for ((brand_name, parent_name, name), tier, fuel_name), price in self.cells.items()
+        )
+        content = json.dumps(rows, ensure_ascii=False, separators=(',', ':'))
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def parse_workbook(path):
+    """단가표 파일 → ParsedWorkbook (read_only 모드, 시트당 행 순회 1회)"""
+    parsed = ParsedWorkbook(filename=os.path.basename(path))
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for sheet_name in wb.sheetnames:
+            tier = match_sheet_tier(sheet_name)
+            if tier is None:
+                continue
+            rows = list(wb[sheet_name].iter_rows(values_only=True))
+            counts = {}
+            for brand_name, car_col, gas_col, diesel_col in BRAND_COLUMNS:
+                _parse_block(parsed, rows, tier, brand_name, car_col, gas_col, diesel_col, counts)
+            parsed.sheets.append((sheet_name, tier, counts))
+    finally:
+        wb.close()
+    return parsed
+
+
+def _parse_block(parsed, rows, tier, brand_name, car_col, gas_col, diesel_col, counts, start=4):
+    """브랜드 블록 하나 파싱 (rows: 시트 전체 행 튜플, start: 0-indexed 시작 행 = 5행)"""
+    sub_brand_found = False
+
+    for index in range(start, len(rows)):
+        row = rows[index]
+        raw = cell_value(row, car_col)
+        if not raw:
+            continue
+        raw = str(raw).strip()
+        if not raw or raw == '-':
+            continue
+
+        # 헤더 키워드 스킵
+        if raw in SKIP_VALUES:
+            continue
+
+        # 서브 브랜드 헤더 감지
+        sub_brand = is_sub_brand_header(raw)
+        if sub_brand and not sub_brand_found:
+            sub_brand_found = True
+            # 서브 브랜드의 데이터를 이 행 이후로 처리
+            _parse_block(parsed, rows, tier, sub_brand, car_col, gas_col, diesel_col, counts, start=index + 1)
+            break  # 현재 블록은 여기서 종료
+
+        # 가격이 없는 메모 행 감지 (ex: "판촉서비스", "정기물 교체" 등)
+        gas_val = cell_value(row, gas_col)
+        diesel_val = cell_value(row, diesel_col) if diesel_col is not None else None
+        if gas_val is None and diesel_val is None:
+            continue
+
+        model_name, gen_name = parse_car_name(raw)
+        if not model_name:
+            continue
+        ref = (brand_name, model_name, gen_name) if gen_name else (brand_name, None, model_name)
+
+        # 휘발유 가격 (하이브리드 동일)
+        gas_price = parse_price(gas_val)
+        parsed.set_price(ref, tier, GASOLINE, gas_price)
+        parsed.set_price(ref, tier, HYBRID, gas_price)
+        count = 1 if gas_price else 0
+
+        # 경유 가격
+        if diesel_col is not None:
+            diesel_price = parse_price(diesel_val)
+            parsed.set_price(ref, tier, DIESEL, diesel_price)
+            if diesel_price:
+                count += 1
+
+        if count:
+            counts[brand_name] = counts.get(brand_name, 0) + count
+
+
+class ImportPlan:
+    """단가표 ↔ 현재 가격 diff (적용할 변경만 보관)"""
+
+    def __init__(self, parsed, clear=False):
+        self.filename = parsed.filename
+        self.content_hash = parsed.content_hash()
+        self.clear = clear
+        self.added = []  # (참조, 티어, 연료, 새 가격)
+        self.changed = []  # (참조, 티어, 연료, 기존 가격, 새 가격)
+        self.removed = []  # (참조, 티어, 연료, 기존 가격)
+        self.unchanged = 0
+        self.skipped = 0  # 오일 제품/연료가 DB에 없는 셀
+        self.new_models = []  # 생성할 차종 참조 (부모가 세대보다 먼저)
+
+    @property
+    def has_changes(self):
+        return bool(self.added or self.changed or self.removed or self.new_models)
+
+    def _add_model(self, ref, known):
+        if ref in known:
+            return
+        brand_name, parent_name, _ = ref
+        if parent_name:
+            self._add_model((brand_name, None, parent_name), known)
+        known.add(ref)
+        self.new_models.append(ref)
+
+    def summary(self):
+        """전체/티어별/브랜드별 건수"""
+        by_tier = {}
+        by_brand = {}
+        for kind, rows in (('added', self.added), ('changed', self.changed), ('removed', self.removed)):
+            for ref, tier, _, *_ in rows:
+                for group, key in ((by_tier, tier), (by_brand, ref[0])):
+                    counts = group.setdefault(key, {'added': 0, 'changed': 0, 'removed': 0})
+                    counts[kind] += 1
+        return {
+            'added': len(self.added),
+            'changed': len(self.changed),
+            'removed': len(self.removed),
+            'unchanged': self.unchanged,
+            'skipped': self.skipped,
+            'new_models': len(self.new_models),
+            'by_tier': by_tier,
+            'by_brand': by_brand,
+        }
+
+    def as_dict(self):
+        """구조화된 diff (JSON 출력용)"""
+        return {
+            'filename': self.filename,
+            'content_hash': self.content_hash,
+            'summary': self.summary(),
+            'new_models': [model_label(ref) for ref in self.new_models],
+            'added': [
+                {'model': model_label(ref), 'tier': tier, 'fuel': fuel, 'price': price}
+                for ref, tier, fuel, price in self.added
+            ],
+            'changed': [
+                {'model': model_label(ref), 'tier': tier, 'fuel': fuel, 'old': old, 'new': new}
+                for ref, tier, fuel, old, new in self.changed
+            ],
+            'removed': [
+                {'model': model_label(ref), 'tier': tier, 'fuel': fuel, 'old': old}
+                for ref, tier, fuel, old in self.removed
+            ],
+        }
+
+
+def _current_prices():
+    """현재 가격 매트릭스를 참조 키로 → ({차종 참조: id}, {(참조, 티어, 연료명): 가격}) (쿼리 2회)"""
+    models = {
+        (brand_name, parent_name, name): model_id
+        for model_id, brand_name, parent_name, name in CarModel.objects.values_list(
+            'id', 'brand__name', 'parent__name', 'name',
+        )
+    }
+    refs = {model_id: ref for ref, model_id in models.items()}
+    prices = {
+        (refs[car_model_id], tier, fuel_name): price
+        for car_model_id, tier, fuel_name, price in OilPrice.objects.values_list(
+            'car_model_id', 'oil_product__tier', 'fuel_type__name', 'price',
+        )
+    }
+    return models, prices
+
+
+def build_plan(parsed, clear=False):
+    """
+    파싱 결과와 현재 가격을 비교해 계획 생성 (DB 쓰기 없음, 조회 4회).
+
+    Args:
+        clear: True면 단가표에 없는 기존 가격도 삭제 대상
+    """
+    plan = ImportPlan(parsed, clear=clear)
+    models, current = _current_prices()
+    tiers = set(OilProduct.objects.values_list('tier', flat=True))
+    fuels = set(FuelType.objects.values_list('name', flat=True))
+
+    # "차종 세대"로 적힌 행 → 기존 세대 (GENERATION_PARENTS 밖의 세대도 익스포트 파일이 그대로 돌아오도록)
+    aliases = {
+        (brand_name, None, f'{parent_name} {name}'): (brand_name, parent_name, name)
+        for brand_name, parent_name, name in models
+        if parent_name and (brand_name, None, f'{parent_name} {name}') not in models
+    }
+    cells = {}
+    for (ref, tier, fuel_name), price in parsed.cells.items():
+        key = (aliases.get(ref, ref), tier, fuel_name)
+        if price:
+            cells[key] = price
+        else:
+            cells.setdefault(key, None)
+
+    # 아반떼 부모 가격 → CN7 (단가표 셀이 있으면 단가표 우선)
+    for (ref, tier, fuel_name), price in current.items():
+        if ref == AVANTE_PARENT:
+            cells.setdefault((AVANTE_CN7, tier, fuel_name), price)
+            cells[(ref, tier, fuel_name)] = None
+    if clear:
+        for key in current:
+            cells.setdefault(key, None)
+
+    known = set(models)
+    for (ref, tier, fuel_name), price in cells.items():
+        if tier not in tiers or fuel_name not in fuels:
+            if price:
+                plan.skipped += 1
+            continue
+        old = current.get((ref, tier, fuel_name))
+        if not price:
+            if old is not None:
+                plan.removed.append((ref, tier, fuel_name, old))
+        elif old is None:
+            plan._add_model(ref, known)
+            plan.added.append((ref, tier, fuel_name, price))
+        elif old != price:
+            plan.changed.append((ref, tier, fuel_name, old, price))
+        else:
+            plan.unchanged += 1
+    return plan
+
+
+def last_import():
+    """마지막으로 적용된 임포트 (없으면 None)"""
+    return OilPriceImport.objects.order_by('-created_at', '-id').first()
+
+
+def apply_plan(plan):
+    """
+    계획 적용 - 새 브랜드/차종 생성 후 바뀐 셀만 묶음 반영, 임포트 이력 기록 (한 트랜잭션).
+    Returns: pricing.bulk_apply 결과 + {'models_created'}
+    """
+    with transaction.atomic():
+        brands = dict(CarBrand.objects.values_list('name', 'id'))
+        models = {
+            (brand_name, parent_name, name): model_id
+            for model_id, brand_name, parent_name, name in CarModel.objects.values_list(
+                'id', 'brand__name', 'parent__name', 'name',
+            )
+        }
+        created = 0
+        for ref in plan.new_models:
+            if ref in models:
+                continue
+            brand_name, parent_name, name = ref
+            if brand_name not in brands:
+                brands[brand_name] = CarBrand.objects.create(name=brand_name, order=len(brands) + 1).id
+            parent_id = models[(brand_name, None, parent_name)] if parent_name else None
+            models[ref] = CarModel.objects.create(
+                brand_id=brands[brand_name], name=name, parent_id=parent_id, order=0,
+            ).id
+            created += 1
+
+        products = dict(OilProduct.objects.values_list('tier', 'id'))
+        fuels = dict(FuelType.objects.values_list('name', 'id'))
+        cells = {}
+        for ref, tier, fuel_name, price in plan.added:
+            cells[(models[ref], products[tier], fuels[fuel_name])] = price
+        for ref, tier, fuel_name, _, price in plan.changed:
+            cells[(models[ref], products[tier], fuels[fuel_name])] = price
+        for ref, tier, fuel_name, _ in plan.removed:
+            cells[(models[ref], products[tier], fuels[fuel_name])] = None
+
+        result = pricing.bulk_apply(cells, source='import')
+        result['models_created'] = created
+        OilPriceImport.objects.create(
+            content_hash=plan.content_hash,
+            filename=plan.filename,
+            summary={key: value for key, value in plan.summary().items() if not key.startswith('by_')},
+        )
+    return result
+
+
+# ============================================
+# 익스포트
+# ============================================
+
+# 시트 배치에 없는 브랜드 중 서브 브랜드 헤더로 넣을 수 있는 브랜드 (마지막 경유 열 있는 블록 아래)
+SUB_BRAND_HEADERS = {'KG모빌리티': 'KG모빌리티', '쉐보레': '쉐보레'}
+
+CSV_HEADER = ['브랜드', '차종', '세대', '연료', '티어', '가격']
+
+
+def export_rows():
+    """전체 가격 (단일 정렬 쿼리, 서버 측 커서) → (브랜드, 부모 차종명, 차종명, 티어, 연료명, 가격) 순회"""
+    # 세대는 부모 차종 자리에 모아서 (부모 자신의 행이 먼저)
+    return OilPrice.objects.order_by(
+        'car_model__brand__order', 'car_model__brand__name',
+        Coalesce('car_model__parent__order', 'car_model__order'), Coalesce('car_model__parent__name', 'car_model__name'),
+        F('car_model__parent_id').asc(nulls_first=True),
+        'car_model__order', 'car_model__name', 'oil_product__order', 'fuel_type__order',
+    ).values_list(
+        'car_model__brand__name', 'car_model__parent__name', 'car_model__name',
+        'oil_product__tier', 'fuel_type__name', 'price',
+    ).iterator(chunk_size=2000)
+
+
+def csv_lines():
+    """CSV 한 줄씩 생성 (StreamingHttpResponse용, 첫 줄에 BOM - 엑셀 한글 호환)"""
+    buffer = _LineBuffer()
+    writer = csv.writer(buffer)
+    yield '\ufeff' + writer.writerow(CSV_HEADER)
+    for brand_name, parent_name, name, tier, fuel_name, price in export_rows():
+        if parent_name:
+            yield writer.writerow([brand_name, parent_name, name, fuel_name, tier, price])
+        else:
+            yield writer.writerow([brand_name, name, '', fuel_name, tier, price])
+
+
+class _LineBuffer:
+    """csv.writer가 쓴 줄을 그대로 반환"""
+
+    def write(self, value):
+        return value
+
+
+def _sheet_name(tier):
+    for keyword, sheet_tier in SHEET_TIER_MAP:
+        if sheet_tier == tier:
+            return keyword
+    return None
+
+
+def _model_rows(brand_name):
+    """
+    브랜드의 가격 있는 차종 행 (단일 집계 쿼리, 서버 측 커서, 세대는 부모 차종 자리에)
+    → (차종 행 이름, {티어: (휘발유, 경유, 하이브리드)}) 순회
+    """
+    tiers = [tier for _, tier in SHEET_TIER_MAP]
+    fuels = (GASOLINE, DIESEL, HYBRID)
+    columns = {
+        f'price_{t}_{f}': Max('oil_prices__price', filter=Q(
+            oil_prices__oil_product__tier=tier, oil_prices__fuel_type__name=fuel,
+        ))
+        for t, tier in enumerate(tiers) for f, fuel in enumerate(fuels)
+    }
+    rows = CarModel.objects.filter(brand__name=brand_name, oil_prices__isnull=False).annotate(**columns).order_by(
+        Coalesce('parent__order', 'order'), Coalesce('parent__name', 'name'),
+        F('parent_id').asc(nulls_first=True), 'order', 'name',
+    ).values_list('parent__name', 'name', *columns)
+    for parent_name, name, *prices in rows.iterator(chunk_size=2000):
+        label = f'{parent_name} {name}' if parent_name else name
+        yield label, {tier: prices[t * len(fuels):(t + 1) * len(fuels)] for t, tier in enumerate(tiers)}
+
+
+def _sub_brand_rows(brand_name):
+    """서브 브랜드 헤더 행 + 차종 행 (가격 있는 차종이 없으면 헤더도 없음)"""
+    rows = _model_rows(brand_name)
+    first = next(rows, None)
+    if first is None:
+        return
+    yield SUB_BRAND_HEADERS[brand_name], None
+    yield first
+    yield from rows
+
+
+def build_workbook():
+    """
+    현재 가격 전체를 임포트 형식 단가표로 작성 (openpyxl write-only, 행은 디스크 임시 파일로 바로 기록).
+    시트 = 티어, 5행부터 BRAND_COLUMNS 블록별 차종 행, 서브 브랜드는 마지막 블록 아래 헤더 행 뒤에 둔다.
+    블록마다 차종 커서 하나를 나란히 읽어 한 행씩 모든 시트에 쓰므로 가격 전체를 메모리에 모으지 않는다.
+    하이브리드 가격은 휘발유 열로만 표현된다 (임포트 시 휘발유 = 하이브리드).
+
+    Returns:
+        (Workbook, dict): {'models': 차종 행 수, 'cells': 가격 셀 수, 'skipped_brands': [시트 배치에 없는 브랜드]}
+    """
+    block_brands = [brand_name for brand_name, *_ in BRAND_COLUMNS]
+    sub_brands = [name for name in SUB_BRAND_HEADERS if name not in block_brands]
+    width = max(max(car_col, gas_col, diesel_col or 0) for _, car_col, gas_col, diesel_col in BRAND_COLUMNS) + 1
+
+    wb = Workbook(write_only=True)
+    sheets = []
+    for _, tier in SHEET_TIER_MAP:
+        ws = wb.create_sheet(_sheet_name(tier))
+        ws.append([f'QuickOil 차종별 오일 단가표 - {_sheet_name(tier)}'])
+        ws.append([])
+        header = [None] * width
+        columns = [None] * width
+        for brand_name, car_col, gas_col, diesel_col in BRAND_COLUMNS:
+            header[car_col] = brand_name
+            columns[car_col], columns[gas_col] = '차종', GASOLINE
+            if diesel_col is not None:
+                columns[diesel_col] = DIESEL
+        ws.append(header)
+        ws.append(columns)
+        sheets.append((tier, ws))
+
+    blocks = [_model_rows(brand_name) for brand_name in block_brands]
+    blocks[-1] = chain(blocks[-1], *(_sub_brand_rows(name) for name in sub_brands))
+    models = 0
+    for entries in zip_longest(*blocks):
+        rows = {tier: [None] * width for tier, _ in sheets}
+        for entry, (_, car_col, gas_col, diesel_col) in zip(entries, BRAND_COLUMNS):
+            if entry is None:
+                continue
+            label, tiers = entry
+            if tiers is None:
+                for row in rows.values():
+                    row[car_col] = label  # 서브 브랜드 헤더
+                continue
+            models += 1
+            for tier, row in rows.items():
+                gasoline, diesel, hybrid = tiers[tier]
+                gasoline = gasoline or hybrid
+                if diesel_col is None:
+                    diesel = None
+                if gasoline is None and diesel is None:
+                    continue  # 이 티어 가격이 없는 차종은 비워 둠 (임포트 시 무시)
+                row[car_col] = label
+                row[gas_col] = gasoline if gasoline is not None else '-'
+                if diesel_col is not None:
+                    row[diesel_col] = diesel if diesel is not None else '-'
+        for tier, ws in sheets:
+            ws.append(rows[tier])
+
+    stats = {
+        'models': models,
+        'cells': OilPrice.objects.filter(fuel_type__name__in=(GASOLINE, DIESEL, HYBRID)).count(),
+        'skipped_brands': list(
+            CarBrand.objects.filter(models__oil_prices__isnull=False)
+            .exclude(name__in=block_brands + sub_brands)
+            .order_by('order', 'name').values_list('name', flat=True).distinct()
+        ),
+    }
+    return wb, stats
+
+
+def write_workbook(fileobj):
+    """현재 가격 전체를 임포트 형식 단가표로 저장 → build_workbook()의 통계"""
+    wb, stats = build_workbook()
+    wb.save(fileobj)
+    return stats
+
+
+# xlsx 다운로드: 이 크기까지는 메모리, 넘으면 디스크 임시 파일에 저장한 뒤 청크 단위로 읽어 보냄
+XLSX_SPOOL_SIZE = 4 * 1024 * 1024
+XLSX_CHUNK_SIZE = 64 * 1024
+
+
+def xlsx_chunks():
+    """단가표 xlsx를 청크 단위로 생성 (StreamingHttpResponse용, 행은 커서에서 바로 시트에 기록)"""
+    with tempfile.SpooledTemporaryFile(max_size=XLSX_SPOOL_SIZE) as fileobj:
+        write_workbook(fileobj)
+        fileobj.seek(0)
+        while chunk := fileobj.read(XLSX_CHUNK_SIZE):
+            yield chunk
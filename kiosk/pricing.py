@@ -0,0 +1,396 @@
+"""
+가격 매트릭스 + 견적 엔진
+OilPrice 전체를 (차종, 연료, 오일제품) 밀집 인덱스 배열로 컴파일해 두고
+키오스크 오일 선택 단계에서 메모리 조회만으로 티어별 가격을 반환한다.
+하이브리드 → premium_hybrid 가격 치환과 고객 노출 필터는 빌드 시점에 미리 적용한다.
+견적(quote)은 매트릭스와 캐시된 추가 서비스 목록으로 서버에서 계산한다.
+"""
+import threading
+from array import array
+
+from django.db import transaction
+from django.utils import timezone
+
+from .catalog import get_version, bump_version
+from .models import CarModel, OilProduct, OilPrice, OilPriceRevision, AdditionalService
+
+VERSION_KEY = 'kiosk:price_matrix_version'
+SERVICE_VERSION_KEY = 'kiosk:service_version'
+
+HYBRID_FUEL_NAME = '하이브리드'
+
+# 폴백 가격 (DB에 가격 데이터가 없는 수입차 등)
+FALLBACK_PRICES = {
+    'economy': 50000,
+    'standard': 70000,
+    'premium': 90000,
+    'hyperformance': 120000,
+    'racing': 150000,
+}
+
+# 매트릭스 캐시 (프로세스 레벨)
+_matrix_cache = {
+    'version': None,
+    'matrix': None,
+}
+# 활성 추가 서비스 캐시 (프로세스 레벨)
+_services_cache = {
+    'version': None,
+    'services': None,
+}
+_lock = threading.Lock()
+
+
+class PriceMatrix:
+    """차종 × 연료 × 오일제품 가격 매트릭스 (0 = 가격 없음)"""
+
+    def __init__(self, version, products, prices):
+        self.version = version
+
+        # 오일 제품 (스태프용 전체 활성 제품) + 키오스크 노출 티어
+        self.product_index = {p.id: i for i, p in enumerate(products)}
+        self.tier_index = {p.tier: i for i, p in enumerate(products)}
+        self.tiers = [{
+            'id': p.tier,
+            'product_id': p.id,
+            'name': p.get_tier_display(),
+            'oil_type': p.oil_type,
+            'tagline': p.tagline,
+            'product_name': p.name,
+            'badge': p.badge or None,
+            'badge_type': p.badge_type or None,
+        } for p in products]
+        self.visible = [i for i, p in enumerate(products) if p.is_visible]
+        self.premium_pos = self.tier_index.get('premium')
+        self.premium_hybrid_pos = self.tier_index.get('premium_hybrid')
+
+        self.model_index = {}
+        self.fuel_index = {}
+        self.hybrid_fuel_pos = None
+        for car_model_id, fuel_id, fuel_name, _, _ in prices:
+            self.model_index.setdefault(car_model_id, len(self.model_index))
+            if fuel_id not in self.fuel_index:
+                self.fuel_index[fuel_id] = len(self.fuel_index)
+                if fuel_name == HYBRID_FUEL_NAME:
+                    self.hybrid_fuel_pos = self.fuel_index[fuel_id]
+
+        self.n_fuels = len(self.fuel_index)
+        self.n_products = len(products)
+        self.cells = array('L', [0]) * (len(self.model_index) * self.n_fuels * self.n_products)
+        for car_model_id, fuel_id, _, product_id, price in prices:
+            pos = self.product_index.get(product_id)
+            if pos is not None:
+                self.cells[self._offset(self.model_index[car_model_id], self.fuel_index[fuel_id]) + pos] = price
+
+        # (차종, 연료) 행별로 티어 치환/노출 필터를 적용한 결과를 미리 계산
+        self.rows = [self._resolve(row) for row in range(len(self.model_index) * self.n_fuels)]
+
+    def _offset(self, model_pos, fuel_pos):
+        return (model_pos * self.n_fuels + fuel_pos) * self.n_products
+
+    def _resolve(self, row):
+        base = row * self.n_products
+        prices = self.cells[base:base + self.n_products]
+        if (row % self.n_fuels == self.hybrid_fuel_pos
+                and self.premium_pos is not None
+                and self.premium_hybrid_pos is not None
+                and prices[self.premium_hybrid_pos]):
+            prices[self.premium_pos] = prices[self.premium_hybrid_pos]
+        return tuple((self.tiers[i], prices[i]) for i in self.visible if prices[i])
+
+    def lookup(self, car_model_id, fuel_id):
+        """차종×연료의 노출 티어 목록 [(티어 정보 dict, 가격), ...] (가격 없으면 빈 튜플)"""
+        model_pos = self.model_index.get(car_model_id)
+        fuel_pos = self.fuel_index.get(fuel_id)
+        if model_pos is None or fuel_pos is None:
+            return ()
+        return self.rows[model_pos * self.n_fuels + fuel_pos]
+
+    def get_price(self, car_model_id, fuel_id, product_id):
+        """원본 셀 가격 (치환 없음, 없으면 None)"""
+        model_pos = self.model_index.get(car_model_id)
+        fuel_pos = self.fuel_index.get(fuel_id)
+        pos = self.product_index.get(product_id)
+        if model_pos is None or fuel_pos is None or pos is None:
+            return None
+        return self.cells[self._offset(model_pos, fuel_pos) + pos] or None
+
+    def set_cell(self, car_model_id, fuel_id, product_id, price):
+        """셀 하나 갱신 후 해당 행만 재계산. 인덱스에 없는 좌표면 False (전체 재빌드 필요)"""
+        model_pos = self.model_index.get(car_model_id)
+        fuel_pos = self.fuel_index.get(fuel_id)
+        pos = self.product_index.get(product_id)
+        if model_pos is None or fuel_pos is None or pos is None:
+            return False
+        self.cells[self._offset(model_pos, fuel_pos) + pos] = price or 0
+        row = model_pos * self.n_fuels + fuel_pos
+        self.rows[row] = self._resolve(row)
+        return True
+
+    def visible_tiers(self):
+        """키오스크 노출 티어 정보 목록 (정렬순)"""
+        return [self.tiers[i] for i in self.visible]
+
+
+def _build(version):
+    """매트릭스 빌드 (제품 1회 + 가격 1회 쿼리)"""
+    products = list(OilProduct.objects.filter(is_active=True).order_by('order'))
+    prices = OilPrice.objects.order_by('car_model_id', 'fuel_type_id').values_list(
+        'car_model_id', 'fuel_type_id', 'fuel_type__name', 'oil_product_id', 'price',
+    )
+    return PriceMatrix(version, products, list(prices))
+
+
+def get_matrix():
+    """현재 버전의 가격 매트릭스 반환 (버전이 같으면 DB 조회 없음)"""
+    version = get_version(VERSION_KEY)
+    matrix = _matrix_cache['matrix']
+    if matrix is not None and _matrix_cache['version'] == version:
+        return matrix
+
+    with _lock:
+        matrix = _matrix_cache['matrix']
+        if matrix is None or _matrix_cache['version'] != version:
+            matrix = _build(version)
+            _matrix_cache['matrix'] = matrix
+            _matrix_cache['version'] = version
+    return matrix
+
+
+def _apply_cells(cells):
+    """
+    버전을 한 번 올리고, 이 프로세스의 매트릭스가 직전 버전이면 셀만 증분 갱신.
+    cells: [(car_model_id, fuel_id, product_id, price), ...] (인덱스에 없는 좌표가 있으면 다음 조회 때 전체 재빌드)
+    """
+    new_version = bump_version(VERSION_KEY)
+    with _lock:
+        matrix = _matrix_cache['matrix']
+        if (matrix is not None
+                and _matrix_cache['version'] == new_version - 1
+                and all(matrix.set_cell(*cell) for cell in cells)):
+            matrix.version = new_version
+            _matrix_cache['version'] = new_version
+    return new_version
+
+
+def _apply_cell(car_model_id, fuel_id, product_id, price):
+    """셀 하나 증분 갱신 (시그널용)"""
+    _apply_cells([(car_model_id, fuel_id, product_id, price)])
+
+
+def on_price_saved(sender, instance, **kwargs):
+    """시그널 핸들러: OilPrice 저장 → (커밋 후) 셀 증분 갱신"""
+    if getattr(_bulk_state, 'active', False):
+        return
+    cell = (instance.car_model_id, instance.fuel_type_id, instance.oil_product_id, instance.price)
+    transaction.on_commit(lambda: _apply_cell(*cell))
+
+
+def on_price_deleted(sender, instance, **kwargs):
+    """시그널 핸들러: OilPrice 삭제 → (커밋 후) 셀 비우기"""
+    if getattr(_bulk_state, 'active', False):
+        return
+    cell = (instance.car_model_id, instance.fuel_type_id, instance.oil_product_id, 0)
+    transaction.on_commit(lambda: _apply_cell(*cell))
+
+
+def invalidate(**kwargs):
+    """시그널 핸들러: 오일 제품/연료 변경 → (커밋 후) 전체 재빌드"""
+    transaction.on_commit(lambda: bump_version(VERSION_KEY))
+
+
+# ============================================
+# 일괄 반영
+# ============================================
+
+# 일괄 반영 중에는 셀 단위 시그널 처리를 건너뛰고 끝에 버전을 한 번만 올림 (스레드별)
+_bulk_state = threading.local()
+
+BULK_CHUNK_SIZE = 500
+
+
+def car_model_names(model_ids):
+    """가격 이력에 남길 차종명 {차종 id: '브랜드 [부모 차종] 차종'} (쿼리 1회)"""
+    return {
+        model_id: ' '.join(part for part in (brand_name, parent_name, name) if part)
+        for model_id, brand_name, parent_name, name in CarModel.objects.filter(id__in=set(model_ids)).values_list(
+            'id', 'brand__name', 'parent__name', 'name',
+        )
+    }
+
+
+def bulk_apply(cells, clear_missing=False, chunk_size=BULK_CHUNK_SIZE, source='staff', revisions=True):
+    """
+    가격 셀 일괄 반영 - 기존 가격 1회 조회 후 묶음 INSERT/UPDATE/DELETE, 바뀐 셀은 가격 이력에 추가,
+    커밋 후 매트릭스 버전 1회 증가(+ 셀 증분 갱신). 트랜잭션 안에서 호출해야 한다.
+
+    Args:
+        cells: {(car_model_id, oil_product_id, fuel_type_id): 가격 또는 None(셀 비움)}
+        clear_missing: True면 cells에 없는 기존 가격도 삭제 (전체 교체)
+        source: 이력 출처 (OilPriceRevision.source)
+        revisions: False면 이력을 남기지 않음 (이미 이력이 있는 예약 변경 활성화용)
+
+    Returns:
+        dict: {'created', 'updated', 'unchanged', 'deleted',
+               'outcomes': {셀 키: 'created' | 'updated' | 'unchanged' | 'deleted' | 'absent'}}
+    """
+    existing = OilPrice.objects.all()
+    if not clear_missing:
+        existing = existing.filter(car_model_id__in={key[0] for key in cells})
+    existing = {
+        (car_model_id, product_id, fuel_id): (pk, price)
+        for pk, car_model_id, product_id, fuel_id, price in existing.values_list(
+            'pk', 'car_model_id', 'oil_product_id', 'fuel_type_id', 'price',
+        )
+    }
+
+    to_create = []
+    to_update = []
+    to_delete = []
+    outcomes = {}
+    for key, price in cells.items():
+        current = existing.get(key)
+        if not price:
+            if current is not None:
+                to_delete.append(current[0])
+            outcomes[key] = 'deleted' if current is not None else 'absent'
+        elif current is None:
+            to_create.append(OilPrice(car_model_id=key[0], oil_product_id=key[1], fuel_type_id=key[2], price=price))
+            outcomes[key] = 'created'
+        elif current[1] != price:
+            to_update.append(OilPrice(pk=current[0], price=price))
+            outcomes[key] = 'updated'
+        else:
+            outcomes[key] = 'unchanged'
+    if clear_missing:
+        for key, (pk, _) in existing.items():
+            if key not in cells:
+                to_delete.append(pk)
+                outcomes[key] = 'deleted'
+
+    _bulk_state.active = True
+    try:
+        OilPrice.objects.bulk_create(to_create, batch_size=chunk_size)
+        OilPrice.objects.bulk_update(to_update, ['price'], batch_size=chunk_size)
+        for start in range(0, len(to_delete), chunk_size):
+            OilPrice.objects.filter(pk__in=to_delete[start:start + chunk_size]).delete()
+    finally:
+        _bulk_state.active = False
+
+    changed = [
+        (car_model_id, fuel_id, product_id, cells.get((car_model_id, product_id, fuel_id)) or 0)
+        for (car_model_id, product_id, fuel_id), outcome in outcomes.items()
+        if outcome in ('created', 'updated', 'deleted')
+    ]
+    if revisions and changed:
+        now = timezone.now()
+        names = car_model_names(row[0] for row in changed)
+        OilPriceRevision.objects.bulk_create((
+            OilPriceRevision(
+                car_model_id=car_model_id, car_model_name=names.get(car_model_id, ''),
+                oil_product_id=product_id, fuel_type_id=fuel_id,
+                price=price or None, effective_from=now, source=source, applied_at=now,
+            )
+            for car_model_id, fuel_id, product_id, price in changed
+        ), batch_size=chunk_size)
+    if changed:
+        transaction.on_commit(lambda: _apply_cells(changed))
+
+    return {
+        'created': len(to_create),
+        'updated': len(to_update),
+        'unchanged': sum(1 for outcome in outcomes.values() if outcome == 'unchanged'),
+        'deleted': len(to_delete),
+        'outcomes': outcomes,
+    }
+
+
+# ============================================
+# 추가 서비스
+# ============================================
+
+def get_services():
+    """활성 추가 서비스 목록 (정렬순, 버전이 같으면 DB 조회 없음)"""
+    version = get_version(SERVICE_VERSION_KEY)
+    if _services_cache['services'] is not None and _services_cache['version'] == version:
+        return _services_cache['services']
+
+    services = list(AdditionalService.objects.filter(is_active=True).values('id', 'name', 'description', 'price'))
+    _services_cache['services'] = services
+    _services_cache['version'] = version
+    return services
+
+
+def bump_service_version():
+    """서비스 버전 증가 (update() 등 시그널 없는 변경용)"""
+    bump_version(SERVICE_VERSION_KEY)
+
+
+def invalidate_services(**kwargs):
+    """시그널 핸들러: 추가 서비스 변경 → (커밋 후) 서비스 버전 증가"""
+    transaction.on_commit(bump_service_version)
+
+
+# ============================================
+# 견적
+# ============================================
+
+def _quote(matrix, services, car_model_id, fuel_id, tier, service_ids):
+    priced = matrix.lookup(car_model_id, fuel_id) if car_model_id and fuel_id else ()
+    oil = None
+    if priced:
+        for info, price in priced:
+            if info['id'] == tier:
+                oil = dict(info, price=price)
+                break
+    else:
+        # DB 가격이 없는 차종 (수입차 등) → 폴백 가격
+        for info in matrix.visible_tiers():
+            if info['id'] == tier:
+                oil = dict(info, price=FALLBACK_PRICES.get(tier, 0))
+                break
+    if oil is None:
+        return None  # 해당 차종에 미제공 티어
+
+    wanted = set(service_ids)
+    selected = [s for s in services if s['id'] in wanted]
+    services_total = sum(s['price'] for s in selected)
+
+    return {
+        'car_model_id': car_model_id,
+        'fuel_id': fuel_id,
+        'oil': oil,
+        'services': selected,
+        'services_total': services_total,
+        'total_price': oil['price'] + services_total,
+        'is_fallback': not priced,
+    }
+
+
+def quote_many(requests):
+    """
+    견적 일괄 계산 (리포트/재산정용).
+
+    Args:
+        requests: [(car_model_id, fuel_id, tier, service_ids), ...]
+
+    Returns:
+        list: 요청 순서대로 견적 dict (미제공 티어면 None)
+    """
+    matrix = get_matrix()
+    services = get_services()
+    return [
+        _quote(matrix, services, car_model_id, fuel_id, tier, service_ids or ())
+        for car_model_id, fuel_id, tier, service_ids in requests
+    ]
+
+
+def quote(car_model_id, fuel_id, tier, service_ids=()):
+    """
+    견적 계산 (오일 + 추가 서비스 항목별).
+
+    Returns:
+        dict: {'oil': {...,'price'}, 'services': [...], 'services_total', 'total_price', ...}
+              또는 None (해당 차종에 미제공 티어)
+    """
+    return quote_many([(car_model_id, fuel_id, tier, service_ids)])[0]
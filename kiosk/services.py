@@ -3,13 +3,49 @@
 https://www.ppurio.com/
 """
 import base64
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta
+
 from django.conf import settings
+from django.db.models import Exists, F, OuterRef, Q
+from django.utils import timezone
+
+from .integrations import IntegrationError, get_client
+from .models import Notification, PpurioToken, Reservation, ServiceOrder, StoreSettings, business_date, phone_key
+
+logger = logging.getLogger(__name__)
+
+# 토큰은 PpurioToken 행(pk=1)에 두고 워커끼리 공유, 프로세스에는 사본만 보관
+TOKEN_REFRESH_MARGIN = timedelta(minutes=5)  # 만료 5분 전부터 새로 발급
+TOKEN_DEFAULT_TTL = timedelta(hours=1)  # 응답에 만료 시각이 없을 때
+TOKEN_LEASE = 15  # 발급 진행 표시 유지 시간(초)
+TOKEN_POLL = 0.1
+
+# 토큰 사본 (프로세스 레벨)
+_token_cache = {
+    'token': None,
+    'expires_at': None,
+}
+
+
+def _parse_expiry(value):
+    """토큰 응답의 expired (yyyyMMddHHmmss, KST) → aware datetime"""
+    try:
+        return timezone.make_aware(datetime.strptime(str(value), '%Y%m%d%H%M%S'))
+    except (TypeError, ValueError):
+        return timezone.now() + TOKEN_DEFAULT_TTL
+
+
+def _is_usable(expires_at, now):
+    return expires_at is not None and now < expires_at - TOKEN_REFRESH_MARGIN
 
-try:
-    import requests
-    HAS_REQUESTS = True
-except ImportError:
-    HAS_REQUESTS = False
+
+def _remember_token(token, expires_at):
+    _token_cache['token'] = token
+    _token_cache['expires_at'] = expires_at
+    return token
 
 
 class PpurioService:
@@ -22,29 +58,124 @@ class PpurioService:
         self.api_key = getattr(settings, 'PPURIO_API_KEY', '')
         self.sender = getattr(settings, 'PPURIO_SENDER', '')
         self.template_code = getattr(settings, 'PPURIO_TEMPLATE_CODE', '')
+        # 토큰/메시지 요청이 같은 keep-alive 커넥션을 재사용
+        self.client = get_client('ppurio', self.BASE_URL, connect_timeout=3, read_timeout=10)
 
-    def _get_auth_token(self):
-        """인증 토큰 발급"""
-        if not HAS_REQUESTS:
-            return None
-
+    def _request_token(self):
+        """/v1/token 호출 → (토큰, 만료 일시) 또는 (None, None)"""
         auth_string = f"{self.account}:{self.api_key}"
         auth_bytes = base64.b64encode(auth_string.encode()).decode()
 
-        response = requests.post(
-            f"{self.BASE_URL}/v1/token",
+        # 토큰 발급은 재시도해도 안전
+        response = self.client.post(
+            "/v1/token",
             headers={
                 "Authorization": f"Basic {auth_bytes}",
                 "Content-Type": "application/json",
             },
-            json={"account": self.account}
+            json={"account": self.account},
+            endpoint="token",
+            idempotent=True,
         )
 
         if response.status_code == 200:
-            return response.json().get("token")
-        return None
+            data = response.json()
+            return data.get("token"), _parse_expiry(data.get("expired"))
+        return None, None
 
-    def send_alimtalk(self, phone: str, message: str, variables: dict = None) -> dict:
+    def _get_auth_token(self):
+        """
+        인증 토큰 (캐시) - 프로세스 사본 → 공유 행 순으로 확인하고,
+        만료가 가까우면 발급 표시를 먼저 잡은 워커 하나만 새로 발급한다.
+        """
+        now = timezone.now()
+        if _token_cache['token'] and _is_usable(_token_cache['expires_at'], now):
+            return _token_cache['token']
+
+        PpurioToken.objects.get_or_create(pk=1)
+        deadline = time.monotonic() + TOKEN_LEASE
+        while True:
+            now = timezone.now()
+            row = PpurioToken.objects.get(pk=1)
+            if row.token and _is_usable(row.expires_at, now):
+                return _remember_token(row.token, row.expires_at)
+
+            acquired = PpurioToken.objects.filter(pk=1).filter(
+                Q(refreshing_until__isnull=True) | Q(refreshing_until__lt=now),
+            ).update(refreshing_until=now + timedelta(seconds=TOKEN_LEASE))
+            if acquired:
+                break
+            if time.monotonic() > deadline:
+                raise IntegrationError('뿌리오 토큰 발급 대기 시간 초과')
+            time.sleep(TOKEN_POLL)
+
+        try:
+            token, expires_at = self._request_token()
+        except Exception:
+            PpurioToken.objects.filter(pk=1).update(refreshing_until=None)
+            raise
+        if not token:
+            PpurioToken.objects.filter(pk=1).update(refreshing_until=None)
+            return None
+
+        PpurioToken.objects.filter(pk=1).update(token=token, expires_at=expires_at, refreshing_until=None)
+        logger.info("뿌리오 토큰 발급")
+        return _remember_token(token, expires_at)
+
+    def _expire_token(self, token):
+        """401 응답 - 같은 토큰일 때만 공유 행을 비움 (다른 워커가 이미 갱신했으면 유지)"""
+        _token_cache['token'] = None
+        PpurioToken.objects.filter(pk=1, token=token).update(token='')
+
+    def _request_message(self, token, payload):
+        return self.client.post(
+            "/v1/message",
+            headers={
+                "Authorization": f"Bearer {token}",
+                "Content-Type": "application/json",
+            },
+            json=payload,
+            endpoint="message",
+        )
+
+    def _send_message(self, token, payload):
+        """메시지 엔드포인트 1회 호출 → (response, None) 또는 (None, 실패 결과)"""
+        try:
+            return self._request_message(token, payload), None
+        except IntegrationError as e:
+            result = {"success": False, "error": f"발송 실패: {e}"}
+            if e.maybe_sent:
+                # 읽기 타임아웃/5xx - 뿌리오가 요청을 받았는지 알 수 없음
+                result["uncertain"] = True
+            return None, result
+
+    def _post_message(self, token, payload):
+        """메시지 발송 요청 (비멱등 - 연결 실패 외에는 재시도하지 않음, 401이면 토큰 재발급 후 1회 재시도)"""
+        response, failure = self._send_message(token, payload)
+        if failure:
+            return failure
+        if response.status_code == 401:
+            self._expire_token(token)
+            try:
+                token = self._get_auth_token()
+            except IntegrationError as e:
+                return {"success": False, "error": f"인증 토큰 발급 실패: {e}"}
+            if not token:
+                return {"success": False, "error": "인증 토큰 발급 실패"}
+            response, failure = self._send_message(token, payload)
+            if failure:
+                return failure
+
+        if response.status_code in [200, 201]:
+            return {"success": True, "data": response.json()}
+        else:
+            return {
+                "success": False,
+                "error": f"발송 실패: {response.status_code}",
+                "detail": response.text
+            }
+
+    def send_alimtalk(self, phone: str, message: str, variables: dict = None, ref_key: str = None) -> dict:
         """
         알림톡 발송
 
@@ -52,6 +183,7 @@ class PpurioService:
             phone: 수신자 전화번호 (010-0000-0000 또는 01000000000)
             message: 발송할 메시지 (템플릿에 맞게)
             variables: 템플릿 변수 (선택)
+            ref_key: 뿌리오 refKey (기본: quickoil_{전화번호})
 
         Returns:
             dict: 발송 결과
@@ -62,13 +194,13 @@ class PpurioService:
         if not phone or not phone.startswith("010"):
             return {"success": False, "error": "유효하지 않은 전화번호입니다."}
 
-        if not HAS_REQUESTS:
-            return {"success": False, "error": "requests 모듈이 설치되지 않았습니다. pip install requests"}
-
         if not self.account or not self.api_key:
             return {"success": False, "error": "뿌리오 API 설정이 필요합니다."}
 
-        token = self._get_auth_token()
+        try:
+            token = self._get_auth_token()
+        except IntegrationError as e:
+            return {"success": False, "error": f"인증 토큰 발급 실패: {e}"}
         if not token:
             return {"success": False, "error": "인증 토큰 발급 실패"}
 
@@ -81,38 +213,23 @@ class PpurioService:
             "targets": [
                 {"to": phone}
             ],
-            "refKey": f"quickoil_{phone}",
+            "refKey": ref_key or f"quickoil_{phone}",
             "templateCode": self.template_code,
         }
 
         if variables:
             payload["targets"][0]["name"] = variables.get("name", "")
 
-        response = requests.post(
-            f"{self.BASE_URL}/v1/message",
-            headers={
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/json",
-            },
-            json=payload
-        )
-
-        if response.status_code in [200, 201]:
-            return {"success": True, "data": response.json()}
-        else:
-            return {
-                "success": False,
-                "error": f"발송 실패: {response.status_code}",
-                "detail": response.text
-            }
+        return self._post_message(token, payload)
 
-    def send_sms(self, phone: str, message: str) -> dict:
+    def send_sms(self, phone: str, message: str, ref_key: str = None) -> dict:
         """
         SMS 발송 (알림톡 실패 시 대체)
 
         Args:
             phone: 수신자 전화번호
             message: 발송할 메시지
+            ref_key: 뿌리오 refKey (기본: quickoil_sms_{전화번호})
 
         Returns:
             dict: 발송 결과
@@ -122,13 +239,13 @@ class PpurioService:
         if not phone or not phone.startswith("010"):
             return {"success": False, "error": "유효하지 않은 전화번호입니다."}
 
-        if not HAS_REQUESTS:
-            return {"success": False, "error": "requests 모듈이 설치되지 않았습니다. pip install requests"}
-
         if not self.account or not self.api_key:
             return {"success": False, "error": "뿌리오 API 설정이 필요합니다."}
 
-        token = self._get_auth_token()
+        try:
+            token = self._get_auth_token()
+        except IntegrationError as e:
+            return {"success": False, "error": f"인증 토큰 발급 실패: {e}"}
         if not token:
             return {"success": False, "error": "인증 토큰 발급 실패"}
 
@@ -141,46 +258,65 @@ class PpurioService:
             "targets": [
                 {"to": phone}
             ],
-            "refKey": f"quickoil_sms_{phone}",
+            "refKey": ref_key or f"quickoil_sms_{phone}",
         }
 
-        response = requests.post(
-            f"{self.BASE_URL}/v1/message",
-            headers={
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/json",
-            },
-            json=payload
-        )
+        return self._post_message(token, payload)
 
-        if response.status_code in [200, 201]:
-            return {"success": True, "data": response.json()}
-        else:
-            return {
-                "success": False,
-                "error": f"발송 실패: {response.status_code}",
-                "detail": response.text
-            }
+    def send_sms_batch(self, message: str, targets: list, ref_key: str, message_type: str = "SMS", subject: str = "") -> dict:
+        """
+        SMS 일괄 발송 (요청 1회에 수신자 여러 명)
+
+        Args:
+            message: 발송할 메시지 ([*1*]~[*7*]은 수신자별 changeWord var1~var7로 치환)
+            targets: [{"to": 전화번호(숫자만), "changeWord": {"var1": ...}}, ...]
+            ref_key: 뿌리오 refKey
+            message_type: "SMS" (90바이트 이하) 또는 "LMS"
+            subject: LMS 제목
+
+        Returns:
+            dict: 발송 결과
+        """
+        if not self.account or not self.api_key:
+            return {"success": False, "error": "뿌리오 API 설정이 필요합니다."}
+
+        try:
+            token = self._get_auth_token()
+        except IntegrationError as e:
+            return {"success": False, "error": f"인증 토큰 발급 실패: {e}"}
+        if not token:
+            return {"success": False, "error": "인증 토큰 발급 실패"}
+
+        payload = {
+            "account": self.account,
+            "messageType": message_type,
+            "from": self.sender,
+            "content": message,
+            "targetCount": len(targets),
+            "targets": targets,
+            "refKey": ref_key,
+        }
+        if message_type == "LMS" and subject:
+            payload["subject"] = subject
+
+        return self._post_message(token, payload)
 
 
-def send_service_complete_message(order) -> dict:
+def service_complete_messages(order):
     """
-    시공 완료 메시지 발송
+    시공 완료 메시지 생성
 
     Args:
-        order: ServiceOrder 인스턴스
+        order: ServiceOrder 인스턴스 (services prefetch 권장)
 
     Returns:
-        dict: 발송 결과
+        tuple: (알림톡 메시지, SMS 대체용 짧은 메시지)
     """
-    if not order.customer_phone:
-        return {"success": False, "error": "고객 전화번호가 없습니다."}
-
-    # 메시지 생성
+    car_info = f"{order.brand.name} {order.car_model.name}" if order.brand and order.car_model else '-'
     message = f"""[ QuickOil 정비 명세서 ]
 
 차량번호: {order.car_number or '-'}
-차종: {order.brand.name} {order.car_model.name}
+차종: {car_info}
 시공일: {order.completed_at.strftime('%Y.%m.%d') if order.completed_at else '-'}
 
 ────────────
@@ -205,14 +341,281 @@ def send_service_complete_message(order) -> dict:
 
     message += "\n\n감사합니다 - QuickOil"
 
-    # 발송
+    # SMS는 90바이트 제한이 있으므로 짧은 메시지로
+    short_message = f"[QuickOil] 시공완료. {order.car_number or ''}. 총액:{order.total_price:,}원. 감사합니다."
+    return message, short_message
+
+
+# ============================================
+# 알림 발송 큐
+# ============================================
+
+# 재시도: 1분부터 2배씩, 최대 30분 간격, 5회 실패 시 중단
+NOTIFY_MAX_ATTEMPTS = 5
+NOTIFY_BACKOFF_BASE = 60
+NOTIFY_BACKOFF_MAX = 1800
+NOTIFY_CLAIM_LEASE = timedelta(minutes=2)
+
+# 뿌리오 초당 발송 요청 수 상한
+RATE_LIMIT = getattr(settings, 'PPURIO_RATE_LIMIT', 10)
+
+# 마지막 발송 요청 시각 (속도 제한용, 프로세스 레벨)
+_rate_cache = {
+    'last_send': None,
+}
+
+
+def enqueue_service_complete(order):
+    """
+    시공 완료 알림을 발송 큐에 등록 → Notification.
+    주문당 1건(ref_key)이라 대기 중에 다시 요청하면 내용만 갱신되고, 실패한 건은 다시 대기 상태로 돌린다.
+    이미 발송했거나 발송 여부를 모르는(unknown) 건은 중복 발송이 되지 않도록 그대로 둔다.
+    """
+    message, short_message = service_complete_messages(order)
+    fields = {
+        'order': order,
+        'kind': 'service_complete',
+        'phone': order.customer_phone,
+        'message': message,
+        'fallback_message': short_message,
+    }
+    notification, created = Notification.objects.get_or_create(
+        ref_key=f'quickoil_order_{order.id}', defaults=fields,
+    )
+    if not created and notification.status in ('pending', 'failed'):
+        for name, value in fields.items():
+            setattr(notification, name, value)
+        if notification.status == 'failed':
+            notification.status = 'pending'
+            notification.channel = 'alimtalk'
+            notification.attempts = 0
+            notification.last_error = ''
+        notification.next_attempt_at = timezone.now()
+        notification.save()
+    return notification
+
+
+def _throttle(rate):
+    """초당 rate건을 넘지 않도록 대기"""
+    if not rate:
+        return
+    last_send = _rate_cache['last_send']
+    if last_send is not None:
+        time.sleep(max(0, last_send + 1 / rate - time.monotonic()))
+    _rate_cache['last_send'] = time.monotonic()
+
+
+def deliver(notification, service=None, rate=None):
+    """
+    알림 1건 발송 (알림톡 → 실패 시 SMS) 후 결과 기록 → 'sent' | 'retry' | 'failed'
+    발송 여부를 모르는 실패(uncertain)는 SMS 대체/재시도 없이 '확인 필요'로 남기고 'failed'로 센다.
+    """
+    service = service or PpurioService()
+    rate = RATE_LIMIT if rate is None else rate
+
+    _throttle(rate)
+    channel = 'alimtalk'
+    result = service.send_alimtalk(notification.phone, notification.message, ref_key=notification.ref_key)
+    if not result.get('success') and not result.get('uncertain') and notification.fallback_message:
+        _throttle(rate)
+        channel = 'sms'
+        result = service.send_sms(notification.phone, notification.fallback_message, ref_key=f'{notification.ref_key}_sms')
+
+    now = timezone.now()
+    if result.get('success'):
+        data = result.get('data') or {}
+        Notification.objects.filter(pk=notification.pk).update(
+            status='sent', channel=channel, attempts=F('attempts') + 1, last_error='',
+            provider_message_id=str(data.get('messageKey', ''))[:100], sent_at=now, updated_at=now,
+        )
+        return 'sent'
+
+    if result.get('uncertain'):
+        # 뿌리오가 받았을 수 있음 → 다시 보내면 중복 발송 (예약 전날 안내의 '발송중'과 같은 처리, 스태프 확인)
+        Notification.objects.filter(pk=notification.pk).update(
+            status='unknown', channel=channel, attempts=F('attempts') + 1,
+            last_error=result.get('error', '알 수 없는 오류'), updated_at=now,
+        )
+        logger.error(f"알림 발송 여부 확인 필요 ({notification.ref_key}): {result.get('error')}")
+        return 'failed'
+
+    attempts = notification.attempts + 1
+    outcome = 'failed' if attempts >= NOTIFY_MAX_ATTEMPTS else 'retry'
+    backoff = min(NOTIFY_BACKOFF_BASE * 2 ** (attempts - 1), NOTIFY_BACKOFF_MAX)
+    Notification.objects.filter(pk=notification.pk).update(
+        status='failed' if outcome == 'failed' else 'pending',
+        channel=channel,
+        attempts=attempts,
+        last_error=result.get('error', '알 수 없는 오류'),
+        next_attempt_at=now + timedelta(seconds=backoff),
+        updated_at=now,
+    )
+    if outcome == 'failed':
+        logger.error(f"알림 {attempts}회 실패 - 재시도 중단 ({notification.ref_key}): {result.get('error')}")
+    return outcome
+
+
+def process_notifications(limit=50, rate=None):
+    """
+    처리 시각이 된 알림을 선점해 발송.
+    Returns: {'sent': n, 'retry': n, 'failed': n}
+    """
+    now = timezone.now()
+    due = Notification.objects.filter(status='pending', next_attempt_at__lte=now).order_by('next_attempt_at')[:limit]
+    service = PpurioService()
+    stats = {'sent': 0, 'retry': 0, 'failed': 0}
+    for notification in due:
+        claimed = Notification.objects.filter(
+            pk=notification.pk, status='pending', next_attempt_at=notification.next_attempt_at,
+        ).update(next_attempt_at=now + NOTIFY_CLAIM_LEASE)
+        if claimed:
+            stats[deliver(notification, service, rate)] += 1
+    return stats
+
+
+# ============================================
+# 오일 교체 안내
+# ============================================
+
+# 요청 1회당 수신자 수 (뿌리오 다건 발송 상한 1,000명)
+REMINDER_BATCH_SIZE = getattr(settings, 'PPURIO_BATCH_SIZE', 1000)
+# 예정일이 이보다 오래 지난 주문은 안내하지 않음 (오래된 이력 일괄 발송 방지)
+REMINDER_MAX_OVERDUE = 30
+
+# SMS 90바이트 이내, [*1*] = 차량번호
+REMINDER_MESSAGE = "[QuickOil] [*1*] 차량 엔진오일 교체 시기가 되었습니다. 방문을 기다리겠습니다."
+
+
+def due_reminders(today=None, max_overdue=REMINDER_MAX_OVERDUE):
+    """
+    교체 안내 대상 (쿼리 1회) → [(주문 id, 전화번호 키, 차량번호), ...]
+    안내 예정일이 지났고 아직 안내하지 않았으며, 같은 전화번호로 더 최근 주문이 없는
+    (= 고객의 최신 주문인) 완료 주문만 고르고 전화번호당 1건으로 줄인다.
+    """
+    today = today or business_date()
+    later_orders = ServiceOrder.objects.filter(phone_key=OuterRef('phone_key'), created_at__gt=OuterRef('created_at'))
+    rows = ServiceOrder.objects.filter(
+        reminder_due_date__range=(today - timedelta(days=max_overdue), today),
+        reminded_at__isnull=True,
+        phone_key__startswith='010',
+    ).filter(~Exists(later_orders)).order_by('phone_key', '-created_at').values_list('id', 'phone_key', 'car_number')
+
+    reminders = []
+    seen = set()
+    for order_id, key, car_number in rows:
+        if key not in seen:
+            seen.add(key)
+            reminders.append((order_id, key, car_number))
+    return reminders
+
+
+def send_service_reminders(reminders, batch_size=None, rate=None):
+    """
+    교체 안내를 batch_size명씩 묶어 발송하고, 성공한 묶음의 주문에 발송 일시 기록.
+    발송 여부를 알 수 없는 묶음도 발송 일시를 기록해 다음 실행에서 다시 보내지 않는다.
+    Returns: {'sent': n, 'unknown': n, 'failed': n, 'requests': n}
+    """
+    batch_size = batch_size or REMINDER_BATCH_SIZE
+    rate = RATE_LIMIT if rate is None else rate
     service = PpurioService()
-    result = service.send_alimtalk(order.customer_phone, message)
+    stats = {'sent': 0, 'unknown': 0, 'failed': 0, 'requests': 0}
+    for start in range(0, len(reminders), batch_size):
+        chunk = reminders[start:start + batch_size]
+        targets = [{'to': key, 'changeWord': {'var1': car_number or '고객님'}} for _, key, car_number in chunk]
+
+        _throttle(rate)
+        result = service.send_sms_batch(
+            REMINDER_MESSAGE, targets, ref_key=f'quickoil_reminder_{business_date():%Y%m%d}_{chunk[0][0]}',
+        )
+        stats['requests'] += 1
+        if result.get('success') or result.get('uncertain'):
+            ServiceOrder.objects.filter(pk__in=[order_id for order_id, _, _ in chunk]).update(reminded_at=timezone.now())
+        if result.get('success'):
+            stats['sent'] += len(chunk)
+        elif result.get('uncertain'):
+            stats['unknown'] += len(chunk)
+            logger.error(f"교체 안내 {len(chunk)}건 발송 여부 확인 필요: {result.get('error')}")
+        else:
+            stats['failed'] += len(chunk)
+            logger.error(f"교체 안내 {len(chunk)}건 발송 실패: {result.get('error')}")
+    return stats
+
+
+# ============================================
+# 예약 전날 안내
+# ============================================
+
+# [*1*] = 예약 시간, 나머지는 지점 설정으로 채움
+RESERVATION_REMINDER_MESSAGE = "[{store_name}] 내일 [*1*] 예약 안내드립니다.\n{address}\n문의 {phone}"
+SMS_MAX_BYTES = 90
+
+
+def reservation_reminder_message(store=None):
+    """지점 설정으로 전날 안내 본문 생성 → (본문, 'SMS' | 'LMS')"""
+    store = store or StoreSettings.get_settings()
+    message = RESERVATION_REMINDER_MESSAGE.format(
+        store_name=store.store_name, address=store.address, phone=store.phone or '-',
+    )
+    # [*1*](5바이트) → 'HH:MM'(5바이트)
+    size = len(message.encode('euc-kr', errors='replace'))
+    return message, 'SMS' if size <= SMS_MAX_BYTES else 'LMS'
+
 
-    # 알림톡 실패 시 SMS로 대체 발송
-    if not result.get("success"):
-        # SMS는 90바이트 제한이 있으므로 짧은 메시지로
-        short_message = f"[QuickOil] 시공완료. {order.car_number or ''}. 총액:{order.total_price:,}원. 감사합니다."
-        result = service.send_sms(order.customer_phone, short_message)
+def reservation_reminders(day):
+    """
+    전날 안내 대상 (쿼리 1회, date+status 인덱스) → [(예약 id, 전화번호 키, 예약 시간), ...]
+    아직 안내하지 않았거나 발송 실패한 'reserved' 예약만.
+    """
+    rows = Reservation.objects.filter(
+        date=day, status='reserved', reminder_status__in=['', 'failed'],
+    ).order_by('time', 'id').values_list('id', 'customer_phone', 'time')
+    return [
+        (reservation_id, phone_key(phone), at)
+        for reservation_id, phone, at in rows
+        if phone_key(phone).startswith('010')
+    ]
 
-    return result
+
+def send_reservation_reminders(reminders, day, batch_size=None):
+    """
+    전날 안내 발송 - 대상 예약을 먼저 '발송중'으로 선점(동시 실행 시 한쪽만 발송)한 뒤
+    batch_size명씩 한 요청으로 보내고 예약별 결과를 기록.
+    Returns: {'sent': n, 'failed': n, 'requests': n}
+    """
+    stats = {'sent': 0, 'failed': 0, 'requests': 0}
+    if not reminders:
+        return stats
+
+    ref = f'quickoil_resv_{day:%Y%m%d}_{uuid.uuid4().hex[:8]}'
+    ids = [reservation_id for reservation_id, _, _ in reminders]
+    claimed = Reservation.objects.filter(pk__in=ids, reminder_status__in=['', 'failed']).update(
+        reminder_status='sending', reminder_ref=ref,
+    )
+    if claimed < len(ids):
+        mine = set(Reservation.objects.filter(reminder_ref=ref).values_list('id', flat=True))
+        reminders = [r for r in reminders if r[0] in mine]
+
+    store = StoreSettings.get_settings()
+    message, message_type = reservation_reminder_message(store)
+    batch_size = batch_size or REMINDER_BATCH_SIZE
+    service = PpurioService()
+    for number, start in enumerate(range(0, len(reminders), batch_size)):
+        chunk = reminders[start:start + batch_size]
+        targets = [{'to': key, 'changeWord': {'var1': at.strftime('%H:%M')}} for _, key, at in chunk]
+        result = service.send_sms_batch(
+            message, targets, ref_key=f'{ref}_{number}', message_type=message_type, subject=store.store_name,
+        )
+        stats['requests'] += 1
+
+        chunk_ids = [reservation_id for reservation_id, _, _ in chunk]
+        if result.get('success'):
+            Reservation.objects.filter(pk__in=chunk_ids).update(reminder_status='sent', reminded_at=timezone.now())
+            stats['sent'] += len(chunk)
+        elif result.get('uncertain'):
+            # 발송 여부를 모르면 '발송중'으로 남겨 재실행 시 중복 발송하지 않음 (스태프 확인)
+            stats['failed'] += len(chunk)
+        else:
+            Reservation.objects.filter(pk__in=chunk_ids).update(reminder_status='failed')
+            stats['failed'] += len(chunk)
+            logger.error(f"예약 전날 안내 {len(chunk)}건 발송 실패: {result.get('error')}")
+    return stats
@@ -1,3 +1,1521 @@
-from django.test import TestCase
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.test import Client, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+import requests
+from openpyxl import Workbook, load_workbook
+
+from . import catalog, ecount, events, integrations, price_history, pricing, services
+from .models import CacheVersion, CarBrand, CarModel, FuelType, OilProduct, OilPrice, AdditionalService, ServiceOrder, ServiceOrderItem
+from .models import DailyOrderStats, EcountSession, EcountSlipJob, Notification, OilPriceRevision, PpurioToken, Reservation
+from .models import ServicePriceRevision, business_date
+
+# 벤치마크 수치는 디버그 로그로만 남김
+logger = logging.getLogger(__name__)
+
+TIERS = ['economy', 'standard', 'premium', 'premium_hybrid', 'hyperformance', 'racing']
+
+
+class PriceMatrixBenchmarkTest(SimpleTestCase):
+    """가격 매트릭스 조회 벤치마크 (DB 없이 합성 데이터)"""
+
+    def test_full_matrix_lookup_is_sub_millisecond(self):
+        products = [
+            OilProduct(id=i + 1, tier=tier, name=tier, oil_type='', mileage_interval=10000,
+                       is_visible=(tier != 'premium_hybrid'), order=i)
+            for i, tier in enumerate(TIERS)
+        ]
+        fuels = [(1, '휘발유'), (2, '경유'), (3, '하이브리드')]
+        prices = [
+            (model_id, fuel_id, fuel_name, product.id, 50000 + model_id * 10 + product.id)
+            for model_id in range(1, 401)
+            for fuel_id, fuel_name in fuels
+            for product in products
+        ]
+        matrix = pricing.PriceMatrix(1, products, prices)
+        self.assertEqual(len(matrix.cells), 400 * 3 * 6)
+
+        keys = [(model_id, fuel_id) for model_id in range(1, 401) for fuel_id, _ in fuels]
+        start = time.perf_counter()
+        for model_id, fuel_id in keys:
+            matrix.lookup(model_id, fuel_id)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        logger.debug(f'[bench] price matrix: {len(matrix.cells)} cells, {len(keys)} lookups in {elapsed_ms:.3f}ms')
+        self.assertLess(elapsed_ms, 1.0)
+
+        # 하이브리드 → premium_hybrid 치환
+        hybrid = dict((tier['id'], price) for tier, price in matrix.lookup(1, 3))
+        self.assertEqual(hybrid['premium'], 50000 + 10 + 4)
+        self.assertNotIn('premium_hybrid', hybrid)
+
+
+class PriceMatrixIncrementalTest(TestCase):
+    """OilPrice 변경 시 매트릭스 셀 증분 갱신"""
+
+    def test_saved_price_patches_cell_without_rebuild(self):
+        brand = CarBrand.objects.create(name='현대')
+        car_model = CarModel.objects.create(brand=brand, name='쏘나타')
+        fuel = FuelType.objects.get_or_create(name='휘발유')[0]
+        product = OilProduct.objects.get(tier='premium')
+        with self.captureOnCommitCallbacks(execute=True):
+            OilPrice.objects.create(car_model=car_model, oil_product=product, fuel_type=fuel, price=90000)
+
+        matrix = pricing.get_matrix()
+        with self.captureOnCommitCallbacks(execute=True):
+            OilPrice.objects.update_or_create(
+                car_model=car_model, oil_product=product, fuel_type=fuel, defaults={'price': 95000},
+            )
+
+        with self.assertNumQueries(0):
+            patched = pricing.get_matrix()
+        self.assertIs(patched, matrix)
+        self.assertEqual(patched.get_price(car_model.id, fuel.id, product.id), 95000)
+
+
+class QuoteEngineTest(TestCase):
+    """서버 견적 엔진 - 클라이언트 가격 무시"""
+
+    def setUp(self):
+        brand = CarBrand.objects.create(name='현대')
+        self.car_model = CarModel.objects.create(brand=brand, name='쏘나타')
+        self.fuel = FuelType.objects.get_or_create(name='휘발유')[0]
+        product = OilProduct.objects.get(tier='premium')
+        OilPrice.objects.create(car_model=self.car_model, oil_product=product, fuel_type=self.fuel, price=90000)
+        self.service = AdditionalService.objects.create(name='에어컨 필터', price=15000)
+        # TestCase 트랜잭션 안에서는 on_commit 무효화가 실행되지 않으므로 직접 버전 증가
+        catalog.bump_version()
+        catalog.bump_version(pricing.VERSION_KEY)
+        pricing.bump_service_version()
+
+    def test_quote_many(self):
+        quotes = pricing.quote_many([
+            (self.car_model.id, self.fuel.id, 'premium', [self.service.id]),
+            (self.car_model.id, self.fuel.id, 'racing', []),
+        ])
+        self.assertEqual(quotes[0]['total_price'], 105000)
+        self.assertEqual([s['name'] for s in quotes[0]['services']], ['에어컨 필터'])
+        self.assertIsNone(quotes[1])  # 가격 없는 티어
+
+    def test_create_order_ignores_client_price(self):
+        response = self.client.post('/api/order/create/', {
+            'brand_id': self.car_model.brand_id,
+            'model_id': self.car_model.id,
+            'fuel_id': self.fuel.id,
+            'oil_id': 'premium',
+            'oil_price': 1,
+            'service_ids': str(self.service.id),
+        }, content_type='application/json')
+        order = ServiceOrder.objects.get(id=response.json()['order_id'])
+        self.assertEqual(order.oil_price, 90000)
+        self.assertEqual(order.total_price, 105000)
+
+
+class CreateOrderIdempotencyTest(TransactionTestCase):
+    """주문 생성 - 멱등 키로 동시 중복 제출 시 주문 1건"""
+
+    def setUp(self):
+        brand = CarBrand.objects.create(name='현대')
+        self.car_model = CarModel.objects.create(brand=brand, name='쏘나타')
+        self.fuel = FuelType.objects.get_or_create(name='휘발유')[0]
+        product = OilProduct.objects.get_or_create(
+            tier='premium', defaults={'name': '킥스 PAO', 'oil_type': 'PAO', 'mileage_interval': 10000},
+        )[0]
+        OilPrice.objects.create(car_model=self.car_model, oil_product=product, fuel_type=self.fuel, price=90000)
+        self.services = [AdditionalService.objects.create(name=f'서비스{i}', price=1000 * i) for i in range(1, 4)]
+
+    def _payload(self, key):
+        return json.dumps({
+            'brand_id': self.car_model.brand_id,
+            'model_id': self.car_model.id,
+            'fuel_id': self.fuel.id,
+            'oil_id': 'premium',
+            'service_ids': ','.join(str(s.id) for s in self.services),
+            'idempotency_key': key,
+        })
+
+    def test_parallel_duplicate_submissions_create_one_order(self):
+        payload = self._payload('dup-key')
+        barrier = threading.Barrier(8)
+
+        def submit():
+            try:
+                barrier.wait()
+                return Client().post('/api/order/create/', payload, content_type='application/json').json()
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: submit(), range(8)))
+
+        order_ids = {r['order_id'] for r in results}
+        self.assertEqual(len(order_ids), 1)
+        self.assertEqual(ServiceOrder.objects.count(), 1)
+        self.assertEqual(ServiceOrderItem.objects.count(), 3)
+
+    def test_query_count_is_bounded(self):
+        # 캐시 워밍 후: 멱등 키 조회 + BEGIN + 주문 INSERT + 일별 집계 UPDATE + 항목 bulk INSERT + COMMIT
+        self.client.post('/api/order/create/', self._payload('warm-up'), content_type='application/json')
+        with self.assertNumQueries(6):
+            self.client.post('/api/order/create/', self._payload('new-key'), content_type='application/json')
+        with self.assertNumQueries(1):
+            self.client.post('/api/order/create/', self._payload('new-key'), content_type='application/json')
+
+
+class BusinessDateTest(TestCase):
+    """영업일 컬럼 - Asia/Seoul 기준 날짜로 저장"""
+
+    def test_dates_follow_local_day(self):
+        order = ServiceOrder.objects.create(oil_tier='premium', oil_name='프리미엄', oil_product_name='킥스 PAO', oil_price=90000)
+        self.assertEqual(order.business_date, timezone.localdate())
+        self.assertIsNone(order.completed_date)
+
+        # UTC 15:30 = 서울 다음날 00:30
+        order.created_at = datetime(2026, 3, 1, 15, 30, tzinfo=dt_timezone.utc)
+        order.completed_at = datetime(2026, 3, 1, 14, 50, tzinfo=dt_timezone.utc)
+        order.save(update_fields=['created_at', 'completed_at'])
+        order.refresh_from_db()
+        self.assertEqual(order.business_date, date(2026, 3, 2))
+        self.assertEqual(order.completed_date, date(2026, 3, 1))
+
+
+class FakeEcount:
+    """SaveInvoiceAuto 대역 - 차량번호에 'X'가 있는 줄이 섞이면 배치 전체 거부"""
+
+    def __init__(self):
+        self.calls = []
+        self.fail_all = None
+
+    def __call__(self, rows):
+        self.calls.append(len(rows))
+        if self.fail_all:
+            raise OSError(self.fail_all)
+        if any('X' in row['REMARKS'] for row in rows):
+            return {'SuccessCnt': 0, 'FailCnt': len(rows), 'ResultDetails': [
+                {'IsSuccess': False, 'TotalError': '차량번호 오류'} for _ in rows
+            ]}
+        start = sum(self.calls[:-1])
+        return {'SuccessCnt': len(rows), 'FailCnt': 0, 'SlipNos': [f'S-{start + i}' for i in range(len(rows))]}
+
+
+@override_settings(ECOUNT_API_KEY='test-key')
+class EcountOutboxTest(TestCase):
+    """이카운트 전표 아웃박스 - 완료 처리는 기록만, 워커가 묶음 제출/재시도/전표번호 기록"""
+
+    def setUp(self):
+        session = self.client.session
+        session['staff_auth_time'] = timezone.now().isoformat()
+        session.save()
+        self.fake = FakeEcount()
+        patcher = mock.patch('kiosk.ecount._save_invoices', self.fake)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _order(self, car_number='12가3456', **kwargs):
+        return ServiceOrder.objects.create(
+            car_number=car_number, oil_tier='premium', oil_name='프리미엄', oil_product_name='킥스 PAO',
+            oil_price=90000, **kwargs,
+        )
+
+    def test_complete_enqueues_and_worker_records_slip_once(self):
+        order = self._order()
+        self.client.post(f'/staff/order/{order.id}/', {'action': 'complete'})
+        self.assertEqual(self.fake.calls, [])
+        job = EcountSlipJob.objects.get(order=order)
+        self.assertEqual((job.kind, job.status), ('sales', 'pending'))
+
+        # 1차 실패 → 백오프 후 재시도 대기
+        self.fake.fail_all = 'timeout'
+        self.assertEqual(ecount.process_outbox(), {'done': 0, 'retry': 1, 'failed': 0})
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.last_error), ('pending', 1, 'timeout'))
+        self.assertGreater(job.next_attempt_at, timezone.now())
+        self.assertEqual(ecount.process_outbox(), {'done': 0, 'retry': 0, 'failed': 0})
+
+        # 처리 시각 도래 → 성공, 전표번호 기록
+        EcountSlipJob.objects.update(next_attempt_at=timezone.now())
+        self.fake.fail_all = None
+        self.assertEqual(ecount.process_outbox(), {'done': 1, 'retry': 0, 'failed': 0})
+        order.refresh_from_db()
+        self.assertEqual(order.ecount_slip_no, 'S-1')
+
+        # 다시 저장해도 작업이 늘지 않음
+        self.client.post(f'/staff/order/{order.id}/', {'action': 'save'})
+        self.assertEqual(EcountSlipJob.objects.count(), 1)
+        self.assertEqual(ecount.process_outbox(), {'done': 0, 'retry': 0, 'failed': 0})
+        self.assertEqual(len(self.fake.calls), 2)
+
+    def test_batch_splits_around_rejected_row(self):
+        now = timezone.now()
+        orders = [self._order(f'12가{i:04d}', status='completed', completed_at=now) for i in range(7)]
+        orders.append(self._order('12X0000', status='completed', completed_at=now))
+        EcountSlipJob.objects.bulk_create([EcountSlipJob(order=o, kind='sales') for o in orders])
+
+        self.assertEqual(ecount.process_outbox(batch_size=8), {'done': 7, 'retry': 1, 'failed': 0})
+        # 8 → 4+4 → 2+2 → 1+1 로 분할, 정상 줄은 한 번씩만 제출
+        self.assertEqual(self.fake.calls, [8, 4, 4, 2, 2, 1, 1])
+        slip_nos = dict(ServiceOrder.objects.values_list('car_number', 'ecount_slip_no'))
+        self.assertEqual(slip_nos['12X0000'], '')
+        self.assertEqual(len({v for k, v in slip_nos.items() if k != '12X0000'}), 7)
+
+    def test_read_timeout_is_not_resent(self):
+        order = self._order(status='completed', completed_at=timezone.now())
+        job = EcountSlipJob.objects.create(order=order, kind='sales')
+
+        # 연결 실패는 요청 전이므로 재시도 대기
+        with mock.patch('kiosk.ecount._save_invoices', side_effect=requests.ConnectTimeout('connect timed out')):
+            self.assertEqual(ecount.process_outbox(), {'done': 0, 'retry': 1, 'failed': 0})
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'pending')
+
+        # 읽기 타임아웃은 저장됐을 수 있음 → 확인 필요, 다시 선점하지 않음
+        EcountSlipJob.objects.update(next_attempt_at=timezone.now())
+        save = mock.Mock(side_effect=requests.ReadTimeout('read timed out'))
+        with mock.patch('kiosk.ecount._save_invoices', save):
+            self.assertEqual(ecount.process_outbox(), {'done': 0, 'retry': 0, 'failed': 1})
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.attempts), ('unknown', 2))
+
+            EcountSlipJob.objects.update(next_attempt_at=timezone.now() - timedelta(hours=1))
+            self.assertEqual(ecount.process_outbox(), {'done': 0, 'retry': 0, 'failed': 0})
+            self.client.post(f'/staff/order/{order.id}/', {'action': 'save'})
+            self.assertEqual(ecount.process_outbox(), {'done': 0, 'retry': 0, 'failed': 0})
+        self.assertEqual(save.call_count, 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'unknown')
+
+    def test_backfill_command_uses_few_calls(self):
+        completed_at = datetime(2026, 1, 15, 3, 0, tzinfo=dt_timezone.utc)
+        for i in range(120):
+            self._order(f'12가{i:04d}', status='completed', completed_at=completed_at, membership_discount=(i < 10))
+
+        # API 호출 시점에 선점돼 있는(처리 전) 작업 수 = 이번 묶음뿐
+        claimed = []
+
+        def save(rows):
+            claimed.append(EcountSlipJob.objects.filter(status='pending', next_attempt_at__gt=timezone.now()).count())
+            return self.fake(rows)
+
+        with mock.patch('kiosk.ecount._save_invoices', save):
+            call_command('backfill_ecount_slips', '--from', '2026-01-01', '--to', '2026-01-31',
+                         '--batch-size', '50', '--rate', '0', stdout=StringIO())
+        self.assertEqual(self.fake.calls, [50, 50, 30])
+        self.assertEqual(claimed, [50, 50, 30])
+        self.assertFalse(ServiceOrder.objects.filter(ecount_slip_no='').exists())
+        self.assertFalse(ServiceOrder.objects.filter(membership_discount=True, ecount_purchase_slip_no='').exists())
+
+
+    def test_backfill_requires_api_key(self):
+        self._order(status='completed', completed_at=timezone.now())
+        out = StringIO()
+        with override_settings(ECOUNT_API_KEY=''):
+            call_command('backfill_ecount_slips', '--from', '2026-01-01', '--rate', '0', stdout=out)
+        self.assertIn('ECOUNT_API_KEY 미설정', out.getvalue())
+        self.assertFalse(EcountSlipJob.objects.exists())
+        self.assertEqual(self.fake.calls, [])
+
+class EcountSessionRaceTest(TransactionTestCase):
+    """이카운트 세션 - 만료 시 여러 워커가 동시에 요청해도 로그인은 1회"""
+
+    WORKERS = 8
+
+    def test_single_flight_login(self):
+        EcountSession.objects.create(
+            pk=1, session_id='old', host_url='oapi.example.com',
+            logged_in_at=timezone.now() - timedelta(minutes=30),
+        )
+        ecount._session_cache.update(session_id=None, host_url=None, logged_in_at=None)
+        self.addCleanup(ecount._session_cache.update, session_id=None, host_url=None, logged_in_at=None)
+        logins = []
+
+        def fake_login():
+            logins.append(threading.get_ident())
+            time.sleep(0.3)
+            return f'session-{len(logins)}', 'oapiAC.ecount.com'
+
+        barrier = threading.Barrier(self.WORKERS)
+
+        def worker():
+            try:
+                barrier.wait()
+                return ecount._get_session()
+            finally:
+                connection.close()
+
+        with mock.patch('kiosk.ecount._request_login', fake_login):
+            with ThreadPoolExecutor(max_workers=self.WORKERS) as pool:
+                sessions = list(pool.map(lambda _: worker(), range(self.WORKERS)))
+
+        self.assertEqual(len(logins), 1)
+        self.assertEqual(set(sessions), {'session-1'})
+        session = EcountSession.objects.get(pk=1)
+        self.assertEqual((session.session_id, session.refreshing_until), ('session-1', None))
+        self.assertEqual(ecount._api_host(), 'oapiAC.ecount.com')
+
+
+class CompletionSequenceTest(TestCase):
+    """완료 순번 - 완료 전환 시 영업일별로 발급, 적요 생성은 쿼리 없음"""
+
+    def test_sequence_and_query_free_remarks(self):
+        brand = CarBrand.objects.create(name='현대')
+        parent = CarModel.objects.create(brand=brand, name='싼타페')
+        car_model = CarModel.objects.create(brand=brand, name='DM', parent=parent)
+        orders = [
+            ServiceOrder.objects.create(
+                car_number=f'13나{i:04d}', car_model=car_model, oil_tier='premium', oil_name='프리미엄',
+                oil_product_name='메0w30es', oil_price=90000,
+            )
+            for i in range(3)
+        ]
+        for order in orders:
+            order.status = 'completed'
+            order.completed_at = timezone.now()
+            order.save(update_fields=['status', 'completed_at'])
+        self.assertEqual([o.completion_seq for o in orders], [1, 2, 3])
+
+        # 완료 해제 → 반납, 재완료 → 새 순번
+        orders[0].status = 'in_progress'
+        orders[0].save(update_fields=['status'])
+        self.assertIsNone(ServiceOrder.objects.get(pk=orders[0].pk).completion_seq)
+        orders[0].status = 'completed'
+        orders[0].save(update_fields=['status'])
+        self.assertEqual(ServiceOrder.objects.get(pk=orders[0].pk).completion_seq, 4)
+
+        order = ServiceOrder.objects.select_related('car_model__parent').prefetch_related('services').get(pk=orders[1].pk)
+        with self.assertNumQueries(0):
+            remarks = ecount._build_remarks(order)
+        self.assertTrue(remarks.startswith('2. '))
+        self.assertIn('싼타페 DM 13나0001', remarks)
+
+
+class _ProviderHandler(BaseHTTPRequestHandler):
+    """테스트용 외부 API - status_codes 순서대로 응답, 연결(포트)별 요청 수 기록"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        server = self.server
+        server.connections.add(self.client_address[1])
+        status = server.status_codes.pop(0) if server.status_codes else 200
+        body = b'{"ok": true}'
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class IntegrationClientTest(SimpleTestCase):
+    """외부 연동 클라이언트 - 커넥션 재사용, 재시도, 서킷 브레이커, 지연 기록"""
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _ProviderHandler)
+        self.server.connections = set()
+        self.server.status_codes = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.client = integrations.IntegrationClient(
+            'test', f'http://127.0.0.1:{self.server.server_port}', backoff=0.001,
+            failure_threshold=3, reset_timeout=60,
+        )
+
+    def test_keep_alive_and_retries(self):
+        for _ in range(5):
+            self.assertEqual(self.client.post('/v1/token', endpoint='token', idempotent=True).status_code, 200)
+        self.assertEqual(len(self.server.connections), 1)
+
+        # 멱등 요청은 5xx 재시도, 비멱등 요청은 재시도 없이 실패
+        self.server.status_codes = [503, 503]
+        self.assertEqual(self.client.post('/v1/token', endpoint='token', idempotent=True).status_code, 200)
+        self.server.status_codes = [500]
+        with self.assertRaises(integrations.IntegrationError):
+            self.client.post('/v1/message', endpoint='message')
+        self.assertEqual(self.server.status_codes, [])
+
+        stats = self.client.histograms['token'].snapshot()
+        self.assertEqual((stats['count'], stats['errors']), (8, 2))
+
+    def test_circuit_opens_and_fails_fast(self):
+        self.server.status_codes = [500] * 3
+        for _ in range(3):
+            with self.assertRaises(integrations.IntegrationError):
+                self.client.post('/v1/message', endpoint='message')
+        self.assertEqual(self.client.breaker.state, 'open')
+        with self.assertRaises(integrations.CircuitOpenError):
+            self.client.post('/v1/message', endpoint='message')
+        self.assertEqual(self.client.histograms['message'].count, 3)
+
+
+class _PpurioHandler(BaseHTTPRequestHandler):
+    """테스트용 뿌리오 - 토큰 발급/메시지 발송, 현재 유효 토큰이 아니면 401"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        server = self.server
+        server.calls.append(self.path)
+        server.targets.extend(t['to'] for t in payload.get('targets', ()))
+        if self.path == '/v1/token':
+            server.issued += 1
+            server.valid_token = f'tok-{server.issued}'
+            status, body = 200, {'token': server.valid_token, 'type': 'Bearer', 'expired': '20991231235959'}
+        elif self.headers.get('Authorization') != f'Bearer {server.valid_token}':
+            status, body = 401, {'code': '3003'}
+        elif payload.get('messageType') in getattr(server, 'rejected_types', ()):
+            status, body = 400, {'code': '4003', 'description': '발송 불가'}
+        else:
+            status, body = 200, {'code': '1000', 'messageKey': f"key-{payload.get('refKey')}"}
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class PpurioServerMixin:
+    """테스트용 뿌리오 서버 기동 + 토큰 캐시 초기화"""
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _PpurioHandler)
+        self.server.calls = []
+        self.server.targets = []
+        self.server.issued = 0
+        self.server.valid_token = None
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        patcher = mock.patch.object(services.PpurioService, 'BASE_URL', f'http://127.0.0.1:{self.server.server_port}')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        services._token_cache.update(token=None, expires_at=None)
+        self.addCleanup(services._token_cache.update, token=None, expires_at=None)
+
+
+@override_settings(PPURIO_ACCOUNT='quickoil', PPURIO_API_KEY='key', PPURIO_SENDER='0200000000')
+class PpurioTokenCacheTest(PpurioServerMixin, TestCase):
+    """뿌리오 토큰 캐시 - 발송마다 토큰을 받지 않고, 401이면 재발급 후 1회 재시도"""
+
+    def test_token_reused_and_refreshed_on_401(self):
+        service = services.PpurioService()
+        self.assertTrue(service.send_alimtalk('010-1234-5678', '시공 완료')['success'])
+        self.assertTrue(service.send_sms('010-1234-5678', '시공 완료')['success'])
+        self.assertEqual(self.server.calls, ['/v1/token', '/v1/message', '/v1/message'])
+
+        # 다른 워커: 프로세스 사본이 없어도 공유 행의 토큰 사용
+        services._token_cache.update(token=None, expires_at=None)
+        self.assertTrue(services.PpurioService().send_sms('01012345678', '시공 완료')['success'])
+        self.assertEqual(self.server.calls.count('/v1/token'), 1)
+
+        # 서버 측 토큰 폐기 → 401 → 재발급 후 재시도
+        self.server.valid_token = 'revoked'
+        self.server.calls.clear()
+        self.assertTrue(service.send_sms('01012345678', '시공 완료')['success'])
+        self.assertEqual(self.server.calls, ['/v1/message', '/v1/token', '/v1/message'])
+        self.assertEqual(PpurioToken.objects.get(pk=1).token, 'tok-2')
+
+
+class StaffEventsBenchmarkTest(SimpleTestCase):
+    """SSE 브로드캐스터 - 한 프로세스에서 유지 가능한 구독자 수"""
+
+    SUBSCRIBERS = 5000
+
+    def test_fan_out_to_many_idle_subscribers(self):
+        broadcaster = events.Broadcaster()
+
+        async def run():
+            tracemalloc.start()
+            before = tracemalloc.get_traced_memory()[0]
+            subscriptions = [broadcaster.subscribe() for _ in range(self.SUBSCRIBERS)]
+            per_subscriber = (tracemalloc.get_traced_memory()[0] - before) / self.SUBSCRIBERS
+            tracemalloc.stop()
+
+            # 동기 뷰처럼 다른 스레드에서 발행
+            start = time.perf_counter()
+            publisher = threading.Thread(target=broadcaster.publish, args=('order_created', {'order_id': 1}))
+            publisher.start()
+            messages = await asyncio.gather(*(s.queue.get() for s in subscriptions))
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            publisher.join()
+
+            for s in subscriptions:
+                broadcaster.unsubscribe(s)
+            return messages, per_subscriber, elapsed_ms
+
+        messages, per_subscriber, elapsed_ms = asyncio.run(run())
+
+        logger.debug(f'[bench] SSE: {self.SUBSCRIBERS} subscribers, ~{per_subscriber:.0f} B each, '
+                     f'fan-out in {elapsed_ms:.1f}ms')
+        # 구독자당 큐 하나 수준의 메모리, 스레드 없이 1초 안에 전체 전달
+        self.assertLess(per_subscriber, 8 * 1024)
+        self.assertLess(elapsed_ms, 1000)
+        self.assertEqual(len(messages), self.SUBSCRIBERS)
+        self.assertTrue(all(m.startswith('event: order_created\n') for m in messages))
+        self.assertEqual(broadcaster.subscriber_count(), 0)
+
+
+class StaffEventsTest(TestCase):
+    """SSE 엔드포인트 - ASGI에서는 구독해 이벤트 전달, WSGI에서는 워커를 잡지 않도록 204"""
+
+    def setUp(self):
+        session = self.client.session
+        session['staff_auth_time'] = timezone.now().isoformat()
+        session.save()
+        self.async_client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+
+    async def test_stream_delivers_published_events_under_asgi(self):
+        response = await self.async_client.get('/staff/events/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await asyncio.wait_for(anext(stream), 5), b'retry: 3000\n\n')
+        self.assertEqual(events.broadcaster.subscriber_count(), 1)
+
+        # 동기 뷰처럼 다른 스레드에서 발행
+        await asyncio.to_thread(events.broadcaster.publish, 'order_created', {'order_id': 7})
+        message = await asyncio.wait_for(anext(stream), 5)
+        self.assertEqual(message, b'event: order_created\ndata: {"order_id": 7}\n\n')
+
+        # 연결 종료 = ASGI 핸들러가 응답 태스크를 취소 → 구독 해제
+        waiting = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiting
+        self.assertEqual(events.broadcaster.subscriber_count(), 0)
+
+    async def test_requires_staff_session(self):
+        self.async_client.cookies.clear()
+        response = await self.async_client.get('/staff/events/')
+        self.assertEqual(response.status_code, 403)
+
+    def test_wsgi_request_is_not_subscribed(self):
+        response = self.client.get('/staff/events/')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(events.broadcaster.subscriber_count(), 0)
+
+
+class TodayChangesTest(TestCase):
+    """오늘의 현황 델타 피드 - 커서 이후 변경분만, 다른 날로 옮긴 예약은 removed, 삭제 후에는 리셋"""
+
+    def setUp(self):
+        today = business_date()
+        self.reservation = Reservation.objects.create(date=today, time='10:00', customer_phone='010-1111-2222')
+        self.order = ServiceOrder.objects.create(
+            car_number='12가3456', oil_tier='premium', oil_name='프리미엄', oil_product_name='킥스 PAO', oil_price=90000,
+        )
+        # 커서 겹침 구간보다 오래전에 변경된 행으로
+        earlier = timezone.now() - timedelta(minutes=1)
+        Reservation.objects.update(updated_at=earlier)
+        ServiceOrder.objects.update(updated_at=earlier)
+
+    def _changes(self, cursor=None):
+        url = '/api/today/changes/' + (f'?since={cursor}' if cursor else '')
+        return self.client.get(url).json()
+
+    def test_cursor_returns_only_changes(self):
+        data = self._changes()
+        self.assertTrue(data['reset'])
+        self.assertEqual({i['key'] for i in data['items']}, {f'reservation-{self.reservation.id}', f'order-{self.order.id}'})
+        self.assertTrue(self._changes('garbage')['reset'])
+
+        # 변경 없는 항목은 다시 오지 않음
+        cursor = data['cursor']
+        data = self._changes(cursor)
+        self.assertEqual((data['reset'], data['items'], data['removed']), (False, [], []))
+
+        self.reservation.status = 'arrived'
+        self.reservation.save()
+        data = self._changes(cursor)
+        self.assertFalse(data['reset'])
+        self.assertEqual([(i['key'], i['status']) for i in data['items']], [(f'reservation-{self.reservation.id}', 'arrived')])
+
+        # 다른 날로 옮긴 예약 → removed
+        self.reservation.date = business_date() + timedelta(days=1)
+        self.reservation.save()
+        data = self._changes(cursor)
+        self.assertEqual((data['items'], data['removed']), ([], [f'reservation-{self.reservation.id}']))
+
+    def test_delete_forces_reset(self):
+        cursor = self._changes()['cursor']
+        self.assertFalse(self._changes(cursor)['reset'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.reservation.delete()
+        data = self._changes(cursor)
+        self.assertTrue(data['reset'])
+        self.assertEqual([i['key'] for i in data['items']], [f'order-{self.order.id}'])
+
+        cursor = data['cursor']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.order.delete()
+        data = self._changes(cursor)
+        self.assertTrue(data['reset'])
+        self.assertEqual(data['items'], [])
+        self.assertFalse(self._changes(data['cursor'])['reset'])
+
+
+# 템플릿 렌더링 테스트용 (collectstatic 없이 {% static %} 사용)
+PLAIN_STATIC_STORAGES = {
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+}
+
+
+@override_settings(STORAGES=PLAIN_STATIC_STORAGES)
+class DashboardQueryCountTest(TestCase):
+    """대시보드 - 주문 수와 무관하게 쿼리 수 일정 (합계 비정규화)"""
+
+    def setUp(self):
+        session = self.client.session
+        session['staff_auth_time'] = timezone.now().isoformat()
+        session.save()
+        brand = CarBrand.objects.create(name='현대')
+        self.car_model = CarModel.objects.create(brand=brand, name='쏘나타')
+
+    def _create_orders(self, count):
+        for i in range(count):
+            order = ServiceOrder.objects.create(
+                car_number=f'12가{i:04d}', oil_tier='premium', oil_name='프리미엄',
+                oil_product_name='킥스 PAO', oil_price=90000,
+                brand=self.car_model.brand, car_model=self.car_model,
+            )
+            ServiceOrderItem.objects.create(order=order, name='에어컨 필터', price=15000)
+            ServiceOrderItem.objects.create(order=order, name='와이퍼', price=10000)
+
+    def _dashboard_queries(self, query=''):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/staff/' + query)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx)
+
+    def test_constant_queries(self):
+        self._create_orders(2)
+        small = self._dashboard_queries()
+        small_all = self._dashboard_queries('?time=all')
+        self._create_orders(18)
+        self.assertEqual(self._dashboard_queries(), small)
+        self.assertEqual(self._dashboard_queries('?time=all'), small_all)
+        self.assertEqual(ServiceOrder.objects.first().total_price, 115000)
+
+    def test_stats_follow_status_transitions(self):
+        self._create_orders(3)
+        order = ServiceOrder.objects.first()
+        order.status = 'completed'
+        order.save(update_fields=['status'])
+
+        day = DailyOrderStats.objects.get()
+        self.assertEqual((day.orders, day.completed, day.revenue), (3, 1, 115000))
+        response = self.client.get('/staff/?time=all')
+        self.assertEqual(response.context['stats'], {'pending': 2, 'completed': 1})
+        self.assertEqual(self.client.get('/staff/').context['stats'], {'pending': 2, 'completed': 1})
+
+        # 완료 취소 → 완료/매출 되돌림, 삭제 → 주문 수 감소
+        order.status = 'in_progress'
+        order.save(update_fields=['status'])
+        ServiceOrder.objects.last().delete()
+        day.refresh_from_db()
+        self.assertEqual((day.orders, day.completed, day.revenue), (2, 0, 0))
+
+
+@override_settings(PPURIO_ACCOUNT='quickoil', PPURIO_API_KEY='key', PPURIO_SENDER='0200000000',
+                   STORAGES=PLAIN_STATIC_STORAGES)
+class NotificationQueueTest(PpurioServerMixin, TestCase):
+    """알림 발송 큐 - 요청은 등록만 하고, 워커가 발송/대체 발송/재시도를 기록"""
+
+    def test_enqueue_dedupes_and_worker_falls_back_to_sms(self):
+        session = self.client.session
+        session['staff_auth_time'] = timezone.now().isoformat()
+        session.save()
+        brand = CarBrand.objects.create(name='현대')
+        order = ServiceOrder.objects.create(
+            car_number='12가3456', brand=brand, car_model=CarModel.objects.create(brand=brand, name='쏘나타'),
+            oil_tier='premium', oil_name='프리미엄', oil_product_name='킥스 PAO', oil_price=90000,
+        )
+        url = f'/api/order/{order.id}/send-alimtalk/'
+        for _ in range(2):
+            response = self.client.post(url, json.dumps({'phone': '010-1234-5678'}), content_type='application/json')
+            self.assertEqual(response.json()['status'], 'pending')
+        self.assertEqual(self.server.calls, [])  # 요청 중에는 외부 호출 없음
+        self.assertEqual(Notification.objects.count(), 1)
+        notification = order.notifications.get()
+
+        # 알림톡 거부 → SMS 대체 발송, 메시지 키 기록
+        self.server.rejected_types = {'AT'}
+        self.assertEqual(services.process_notifications(rate=0), {'sent': 1, 'retry': 0, 'failed': 0})
+        notification.refresh_from_db()
+        self.assertEqual((notification.status, notification.channel, notification.attempts), ('sent', 'sms', 1))
+        self.assertEqual(notification.provider_message_id, f'key-quickoil_order_{order.id}_sms')
+        self.assertEqual(services.process_notifications(rate=0), {'sent': 0, 'retry': 0, 'failed': 0})
+
+        # 발송된 건은 다시 요청해도 대기로 돌리지 않음 (중복 발송 방지)
+        response = self.client.post(url, '{}', content_type='application/json')
+        self.assertEqual(response.json()['status'], 'sent')
+        notification.refresh_from_db()
+        self.assertEqual((notification.status, notification.attempts), ('sent', 1))
+
+        # 둘 다 실패 → 백오프 후 재시도 대기
+        other = ServiceOrder.objects.create(
+            car_number='34나5678', customer_phone='010-9876-5432',
+            oil_tier='premium', oil_name='프리미엄', oil_product_name='킥스 PAO', oil_price=90000,
+        )
+        notification = services.enqueue_service_complete(other)
+        self.server.rejected_types = {'AT', 'SMS'}
+        self.assertEqual(services.process_notifications(rate=0)['retry'], 1)
+        notification.refresh_from_db()
+        self.assertEqual((notification.status, notification.attempts), ('pending', 1))
+        self.assertGreater(notification.next_attempt_at, timezone.now())
+
+    def test_uncertain_alimtalk_is_not_retried_or_sent_by_sms(self):
+        order = ServiceOrder.objects.create(
+            car_number='12가3456', customer_phone='010-1234-5678',
+            oil_tier='premium', oil_name='프리미엄', oil_product_name='킥스 PAO', oil_price=90000,
+        )
+        notification = services.enqueue_service_complete(order)
+        # 발송 요청 타임아웃 - 뿌리오가 받았는지 알 수 없음
+        with mock.patch.object(services.PpurioService, '_request_message',
+                               side_effect=integrations.IntegrationError('timeout')) as request:
+            self.assertEqual(services.process_notifications(rate=0), {'sent': 0, 'retry': 0, 'failed': 1})
+        self.assertEqual(request.call_count, 1)  # SMS 대체 발송 없음
+        notification.refresh_from_db()
+        self.assertEqual((notification.status, notification.channel, notification.attempts), ('unknown', 'alimtalk', 1))
+
+        # 재처리/재요청해도 다시 보내지 않음
+        self.server.calls.clear()
+        self.assertEqual(services.process_notifications(rate=0), {'sent': 0, 'retry': 0, 'failed': 0})
+        self.assertEqual(services.enqueue_service_complete(order).status, 'unknown')
+        self.assertEqual(self.server.calls, [])
+
+
+    def test_connect_and_token_refresh_failures_are_retried(self):
+        order = ServiceOrder.objects.create(
+            car_number='12가3456', customer_phone='010-1234-5678',
+            oil_tier='premium', oil_name='프리미엄', oil_product_name='킥스 PAO', oil_price=90000,
+        )
+        notification = services.enqueue_service_complete(order)
+        # 연결 실패 - 요청이 나가지 않았으므로 일반 실패 (SMS 대체 후 재시도 대기)
+        with mock.patch.object(services.PpurioService, '_request_message',
+                               side_effect=integrations.IntegrationError('refused', maybe_sent=False)):
+            self.assertEqual(services.process_notifications(rate=0), {'sent': 0, 'retry': 1, 'failed': 0})
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, 'pending')
+
+        # 401 후 토큰 재발급 실패 - 확인 필요가 아니라 재시도 대기
+        Notification.objects.update(next_attempt_at=timezone.now())
+        self.server.valid_token = 'revoked'
+        with mock.patch.object(services.PpurioService, '_request_token',
+                               side_effect=integrations.IntegrationError('token timeout')):
+            services._token_cache.update(token='stale', expires_at=timezone.now() + timedelta(hours=1))
+            self.assertEqual(services.process_notifications(rate=0), {'sent': 0, 'retry': 1, 'failed': 0})
+        notification.refresh_from_db()
+        self.assertEqual((notification.status, notification.attempts), ('pending', 2))
+
+
+@override_settings(PPURIO_ACCOUNT='quickoil', PPURIO_API_KEY='key', PPURIO_SENDER='0200000000')
+class ServiceReminderTest(PpurioServerMixin, TestCase):
+    """교체 안내 - 고객(전화번호)당 최신 주문 1건, 뿌리오 다건 발송으로 묶음 전송"""
+
+    def _order(self, phone, **kwargs):
+        return ServiceOrder.objects.create(
+            car_number='12가3456', customer_phone=phone, oil_tier='premium', oil_name='프리미엄',
+            oil_product_name='킥스 PAO', oil_price=90000, **kwargs,
+        )
+
+    def test_due_date_and_latest_order_per_phone(self):
+        order = self._order('010-1111-2222', mileage_current=50000, mileage_next=55000)
+        self.assertIsNone(order.reminder_due_date)
+        order.status = 'completed'
+        order.completed_at = timezone.now()
+        order.save(update_fields=['status', 'completed_at'])
+        order.refresh_from_db()
+        # 5,000km ÷ 하루 40km = 125일
+        self.assertEqual(order.phone_key, '01011112222')
+        self.assertEqual(order.reminder_due_date, order.completed_date + timedelta(days=125))
+
+        due_day = order.reminder_due_date
+        self.assertEqual(services.due_reminders(due_day - timedelta(days=1)), [])
+        self.assertEqual(services.due_reminders(due_day), [(order.id, '01011112222', '12가3456')])
+
+        # 표기가 다른 같은 번호로 재방문 → 이전 주문은 안내 대상에서 빠짐
+        self._order('01011112222')
+        self.assertEqual(services.due_reminders(due_day), [])
+
+    def test_uncertain_chunk_is_not_resent(self):
+        today = business_date()
+        old = timezone.now() - timedelta(days=200)
+        for phone in ('010-1111-0001', '010-1111-0002', '010-1111-0003'):
+            order = self._order(phone, status='completed', completed_at=old)
+            ServiceOrder.objects.filter(pk=order.pk).update(reminder_due_date=today - timedelta(days=1))
+        reminders = services.due_reminders(today)
+
+        # 첫 묶음은 읽기 타임아웃(발송 여부 불명), 둘째 묶음은 연결 실패
+        results = [
+            {'success': False, 'error': 'read timeout', 'uncertain': True},
+            {'success': False, 'error': 'refused'},
+        ]
+        with mock.patch.object(services.PpurioService, 'send_sms_batch', side_effect=results):
+            stats = services.send_service_reminders(reminders, batch_size=2, rate=0)
+        self.assertEqual(stats, {'sent': 0, 'unknown': 2, 'failed': 1, 'requests': 2})
+        self.assertEqual(services.due_reminders(today), reminders[2:])
+
+    def test_bulk_campaign_benchmark(self):
+        today = business_date()
+        old = timezone.now() - timedelta(days=400)
+        # ORM 인스턴스 10만 개 생성은 느리므로 템플릿 주문 1건의 컬럼 값을 복제해 executemany
+        template = self._order('01000000000', status='completed', completed_at=old)
+        fields = [f for f in ServiceOrder._meta.concrete_fields if not f.primary_key]
+        base = [f.get_db_prep_save(getattr(template, f.attname), connection) for f in fields]
+        positions = [[f.attname for f in fields].index(name) for name in (
+            'customer_phone', 'phone_key', 'car_number', 'created_at', 'reminder_due_date',
+        )]
+        prep = {f.attname: f for f in fields}
+        created_at = [prep['created_at'].get_db_prep_save(value, connection) for value in (old, old + timedelta(days=200))]
+        due_dates = {days: prep['reminder_due_date'].get_db_prep_save(today - timedelta(days=days), connection)
+                     for days in (10, 5, -30)}
+        rows = []
+        for i in range(50000):
+            phone = f'010{i:08d}'
+            # 이전 방문 (예정일이 지났지만 재방문으로 대체됨) + 최신 방문 (절반만 예정일 도래)
+            for created, due in ((created_at[0], due_dates[10]), (created_at[1], due_dates[5 if i % 2 else -30])):
+                row = list(base)
+                for pos, value in zip(positions, (phone, phone, f'{i % 100:02d}가{i % 10000:04d}', created, due)):
+                    row[pos] = value
+                rows.append(row)
+        template.delete()
+        sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            ServiceOrder._meta.db_table,
+            ', '.join(connection.ops.quote_name(f.column) for f in fields),
+            ', '.join(['%s'] * len(fields)),
+        )
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, rows)
+
+        start = time.perf_counter()
+        with CaptureQueriesContext(connection) as ctx:
+            reminders = services.due_reminders(today)
+        select_ms = (time.perf_counter() - start) * 1000
+        self.assertEqual(len(ctx), 1)
+        self.assertEqual(len(reminders), 25000)
+
+        out = StringIO()
+        call_command('send_service_reminders', '--dry-run', stdout=out)
+        self.assertIn('25000명', out.getvalue())
+        self.assertEqual(self.server.calls, [])
+
+        start = time.perf_counter()
+        with CaptureQueriesContext(connection) as ctx:
+            stats = services.send_service_reminders(reminders, rate=0)
+        send_ms = (time.perf_counter() - start) * 1000
+        logger.debug(f'[bench] reminders: 100000 orders, {len(reminders)} due in {select_ms:.0f}ms, '
+                     f'{stats["requests"]} requests in {send_ms:.0f}ms')
+        # 묶음당 발송 일시 UPDATE 1회 + 토큰 발급
+        self.assertEqual(sum(q['sql'].startswith('UPDATE "kiosk_serviceorder"') for q in ctx.captured_queries), 25)
+        self.assertLess(len(ctx), 25 + 10)
+        self.assertEqual(stats, {'sent': 25000, 'unknown': 0, 'failed': 0, 'requests': 25})
+        self.assertEqual(self.server.calls.count('/v1/message'), 25)
+        self.assertEqual(len(set(self.server.targets)), 25000)
+        self.assertEqual(services.due_reminders(today), [])
+
+
+@override_settings(PPURIO_ACCOUNT='quickoil', PPURIO_API_KEY='key', PPURIO_SENDER='0200000000')
+class ReservationReminderTest(PpurioServerMixin, TestCase):
+    """예약 전날 안내 - 조회 1회, 발송 요청 1회, 재실행해도 중복 발송 없음"""
+
+    def test_batched_send_is_recorded_per_reservation(self):
+        tomorrow = business_date() + timedelta(days=1)
+        Reservation.objects.bulk_create([
+            Reservation(date=tomorrow, time=f'{9 + i % 9:02d}:{i % 60:02d}', customer_phone=f'010-2000-{i:04d}')
+            for i in range(300)
+        ] + [
+            Reservation(date=tomorrow, time='10:00', customer_phone='010-3000-0000', status='cancelled'),
+            Reservation(date=tomorrow + timedelta(days=1), time='10:00', customer_phone='010-3000-0001'),
+        ])
+
+        with CaptureQueriesContext(connection) as ctx:
+            reminders = services.reservation_reminders(tomorrow)
+        self.assertEqual((len(ctx), len(reminders)), (1, 300))
+
+        # 1차 실행: 300건을 요청 1회로 발송 → 거부되면 예약별 실패 기록
+        self.server.rejected_types = {'SMS', 'LMS'}
+        call_command('send_reservation_reminders', stdout=StringIO())
+        self.assertEqual(Reservation.objects.filter(reminder_status='failed').count(), 300)
+
+        # 재실행: 실패 건만 다시 발송, 이후 재실행은 요청 없음
+        self.server.rejected_types = set()
+        self.server.calls.clear()
+        self.server.targets.clear()
+        call_command('send_reservation_reminders', stdout=StringIO())
+        call_command('send_reservation_reminders', stdout=StringIO())
+        self.assertEqual(self.server.calls, ['/v1/message'])
+        self.assertEqual(len(set(self.server.targets)), 300)
+        self.assertEqual(Reservation.objects.filter(reminder_status='sent', reminded_at__isnull=False).count(), 300)
+
+
+PRICE_SHEETS = ['킥스 GX5', '킥스 GX7', '킥스 Pao', '벤졸', '슈퍼노멀', '메탈로센']
+
+
+def _write_price_workbook(path, models_per_brand, price=lambda sheet, row: 50000 + sheet * 1000 + row):
+    """합성 단가표 - 시트 6개 × 브랜드 블록 4개(현대/기아/제네시스/르노코리아), 5행부터 차종"""
+    wb = Workbook()
+    wb.remove(wb.active)
+    for sheet_index, sheet_name in enumerate(PRICE_SHEETS):
+        ws = wb.create_sheet(sheet_name)
+        ws.append(['단가표'])
+        ws.append([])
+        ws.append([None, '현대', None, None, None, '기아', None, None, None, '제네시스', None, None, '르노코리아'])
+        ws.append([None, '차종', '휘발유', '경유', None, '차종', '휘발유', '경유', None, '차종', '휘발유', None, '차종', '휘발유', '경유'])
+        for row in range(models_per_brand):
+            value = price(sheet_index, row)
+            diesel = value + 5000 if isinstance(value, int) else value
+            ws.append([
+                None, f'현대{row}', value, diesel,
+                None, f'기아{row}', value, '-',
+                None, f'제네시스{row}', value, None,
+                f'르노{row}', value, diesel,
+            ])
+    wb.save(path)
+
+
+class ImportOilPricesTest(TestCase):
+    """단가표 임포트 - 셀 수집 후 묶음 반영, 재임포트 쿼리 수는 단가표 크기와 무관"""
+
+    def setUp(self):
+        for name in ('휘발유', '경유'):
+            FuelType.objects.get_or_create(name=name)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, '단가표.xlsx')
+
+    def _import(self, *args):
+        out = StringIO()
+        start = time.perf_counter()
+        call_command('import_oil_prices', self.path, *args, stdout=out)
+        return out.getvalue(), (time.perf_counter() - start) * 1000
+
+    def _queries(self, output):
+        return int(output.rsplit('쿼리 ', 1)[1].split('회')[0])
+
+    def test_bulk_import_and_reimport(self):
+        _write_price_workbook(self.path, 200)
+        with CaptureQueriesContext(connection) as ctx:
+            output, _ = self._import('--plan')
+        self.assertFalse([q for q in ctx.captured_queries if not q['sql'].startswith('SELECT')])
+        self.assertIn('added: 12000', output)
+        self.assertIn('new_models: 800', output)
+        self.assertEqual(OilPrice.objects.count(), 0)
+
+        output, first_ms = self._import()
+        first_queries = self._queries(output)
+        # 행당 현대/르노 3셀(휘발유·하이브리드·경유) + 기아/제네시스 2셀, 시트 6개
+        self.assertEqual(OilPrice.objects.count(), 12000)
+        self.assertEqual(CarModel.objects.count(), 800)
+
+        # 같은 내용의 단가표(다시 저장해 파일은 달라도)는 건너뜀
+        _write_price_workbook(self.path, 200)
+        output, _ = self._import()
+        self.assertIn('건너뜁니다', output)
+
+        # 한 행은 가격 변경, 한 행은 '-'로 비움 (브랜드 블록 4개 모두)
+        _write_price_workbook(self.path, 200, price=lambda sheet, row: (
+            '-' if (sheet, row) == (0, 1) else 50000 + sheet * 1000 + row + (100 if (sheet, row) == (0, 0) else 0)
+        ))
+        output, _ = self._import('--plan', '--json')
+        plan = json.loads(output)
+        self.assertEqual((plan['summary']['changed'], plan['summary']['removed'], plan['summary']['added']), (10, 10, 0))
+        self.assertEqual(plan['summary']['by_tier'], {'economy': {'added': 0, 'changed': 10, 'removed': 10}})
+        self.assertEqual(plan['summary']['by_brand']['현대'], {'added': 0, 'changed': 3, 'removed': 3})
+        self.assertIn({'model': '현대 현대0', 'tier': 'economy', 'fuel': '경유', 'old': 55000, 'new': 55100}, plan['changed'])
+
+        output, second_ms = self._import()
+        second_queries = self._queries(output)
+        self.assertIn('prices_updated: 10\n', output)
+        self.assertIn('prices_cleared: 10\n', output)
+        self.assertEqual(OilPrice.objects.count(), 12000 - 10)
+        self.assertLess(second_queries, 30)
+        # 첫 임포트도 셀당이 아니라 묶음 단위 쿼리
+        self.assertLess(first_queries, 12000 // 10)
+        logger.debug(f'[bench] import_oil_prices: 12000 cells, first {first_ms:.0f}ms/{first_queries} queries, '
+                     f'reimport {second_ms:.0f}ms/{second_queries} queries')
+
+    def test_export_round_trips_through_importer(self):
+        _write_price_workbook(self.path, 20)
+        self._import()
+        # 단가표 세대 규칙(GENERATION_PARENTS) 밖의 세대 + 서브 브랜드
+        kia = CarBrand.objects.get(name='기아')
+        k5 = CarModel.objects.create(brand=kia, name='K5')
+        dl3 = CarModel.objects.create(brand=kia, name='DL3', parent=k5)
+        kgm = CarModel.objects.create(brand=CarBrand.objects.create(name='KG모빌리티', order=9), name='토레스')
+        gasoline, diesel = FuelType.objects.get(name='휘발유'), FuelType.objects.get(name='경유')
+        hybrid = FuelType.objects.get(name='하이브리드')
+        for tier in ('standard', 'racing'):
+            product = OilProduct.objects.get(tier=tier)
+            for car_model in (dl3, kgm):
+                OilPrice.objects.create(car_model=car_model, oil_product=product, fuel_type=gasoline, price=77000)
+                OilPrice.objects.create(car_model=car_model, oil_product=product, fuel_type=hybrid, price=77000)
+            OilPrice.objects.create(car_model=kgm, oil_product=product, fuel_type=diesel, price=88000)
+        total = OilPrice.objects.count()
+
+        exported = os.path.join(os.path.dirname(self.path), 'export.xlsx')
+        with CaptureQueriesContext(connection) as ctx:
+            call_command('export_oil_prices', exported, stdout=StringIO())
+        # 브랜드 블록 4 + 서브 브랜드 2 (차종 커서, 가격 수와 무관) + 통계 2
+        self.assertEqual(len(ctx), 8)
+
+        self.path = exported
+        plan = json.loads(self._import('--plan', '--json', '--clear', '--force')[0])['summary']
+        self.assertEqual((plan['added'], plan['changed'], plan['removed'], plan['new_models']), (0, 0, 0, 0))
+        self.assertEqual(plan['unchanged'], total)
+
+        session = self.client.session
+        session['staff_auth_time'] = timezone.now().isoformat()
+        session.save()
+        response = self.client.get('/staff/oil-prices/export/?format=csv')
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual(len(lines), total + 1)
+        self.assertIn('기아,K5,DL3,휘발유,standard,77000', lines)
+        response = self.client.get('/staff/oil-prices/export/')
+        self.assertTrue(response.streaming)
+        downloaded = load_workbook(BytesIO(b''.join(response.streaming_content)), read_only=True)
+        with open(exported, 'rb') as f:
+            saved = load_workbook(f, read_only=True)
+            self.assertEqual(downloaded.sheetnames, saved.sheetnames)
+            for name in saved.sheetnames:
+                self.assertEqual(list(downloaded[name].values), list(saved[name].values))
+
+
+class OilPriceExportAsgiTest(TestCase):
+    """가격 다운로드 - ASGI에서도 본문을 다 만들기 전에 첫 청크부터 전송"""
+
+    def setUp(self):
+        session = self.client.session
+        session['staff_auth_time'] = timezone.now().isoformat()
+        session.save()
+        self.async_client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+
+    async def test_csv_first_chunk_before_generator_is_exhausted(self):
+        exhausted = []
+
+        def lines():
+            yield '브랜드,차종\n'
+            yield '현대,쏘나타\n'
+            exhausted.append(True)
+
+        # 스레드 왕복 1회에 청크 1개씩 (기본은 STREAM_BATCH개)
+        with mock.patch('kiosk.price_sheet.csv_lines', lines), mock.patch('kiosk.views.STREAM_BATCH', 1):
+            response = await self.async_client.get('/staff/oil-prices/export/?format=csv')
+            # ASGI 핸들러와 같은 방식으로 본문을 읽음
+            body = aiter(response)
+            self.assertEqual(await anext(body), '브랜드,차종\n'.encode())
+            self.assertEqual(exhausted, [])
+            self.assertEqual([part async for part in body], ['현대,쏘나타\n'.encode()])
+        self.assertEqual(exhausted, [True])
+
+    async def test_xlsx_streams_under_asgi(self):
+        response = await self.async_client.get('/staff/oil-prices/export/')
+        self.assertEqual(response['Content-Disposition'][-6:], '.xlsx"')
+        body = b''.join([part async for part in response])
+        self.assertTrue(body.startswith(b'PK'))
+        self.assertEqual(load_workbook(BytesIO(body), read_only=True).sheetnames[0], '킥스 GX5')
+
+
+class OilPriceSaveTest(TransactionTestCase):
+    """가격 일괄 저장 API - 전체 검증 후 한 트랜잭션 묶음 반영, 셀별 결과와 매트릭스 버전 반환"""
+
+    def setUp(self):
+        session = self.client.session
+        session['staff_auth_time'] = timezone.now().isoformat()
+        session.save()
+        brand = CarBrand.objects.create(name='현대')
+        self.models = CarModel.objects.bulk_create(CarModel(brand=brand, name=f'차종{i}') for i in range(200))
+        self.products = [
+            OilProduct.objects.get_or_create(tier=tier, defaults={'name': tier, 'mileage_interval': 10000})[0]
+            for tier in TIERS[:5]
+        ]
+        self.fuel = FuelType.objects.get_or_create(name='휘발유')[0]
+
+    def _save(self, changes):
+        # 실제 커밋 후 on_commit 버전 증가가 응답에 반영되도록 TransactionTestCase 사용
+        response = self.client.post('/api/oil-prices/save/', json.dumps({'changes': changes}),
+                                    content_type='application/json')
+        return response.status_code, response.json()
+
+    def _changes(self, price):
+        return [
+            {'model_id': m.id, 'product_id': p.id, 'fuel_id': self.fuel.id, 'price': price(i)}
+            for i, (m, p) in enumerate((m, p) for m in self.models for p in self.products)
+        ]
+
+    def test_thousand_cell_save_is_constant_queries(self):
+        version = pricing.get_matrix().version
+        changes = self._changes(lambda i: 50000 + i)
+        self.assertEqual(len(changes), 1000)
+
+        start = time.perf_counter()
+        with CaptureQueriesContext(connection) as ctx:
+            status, data = self._save(changes)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        logger.debug(f'[가격 저장 1000셀] 생성 {elapsed_ms:.1f}ms / 쿼리 {len(ctx)}회')
+        self.assertEqual(status, 200)
+        self.assertEqual(data['created'], 1000)
+        self.assertEqual(OilPrice.objects.count(), 1000)
+        # 세션 + 참조 확인 3 + BEGIN + 기존 가격 1 + 가격 INSERT 5 + 이력 차종명 1 + 이력 INSERT 10 + COMMIT
+        # (INSERT는 SQLite 변수 제한으로 나뉨) + 커밋 후 버전 증가 (BEGIN + 행 잠금 + INSERT/UPDATE + COMMIT) + 응답 버전 조회
+        self.assertEqual(len(ctx), 28)
+        self.assertEqual({r['status'] for r in data['results']}, {'created'})
+        self.assertEqual(data['version'], version + 1)
+        self.assertEqual(data['version'], CacheVersion.objects.get(key=pricing.VERSION_KEY).version)
+
+        # 절반 변경, 1/4 삭제, 나머지 그대로
+        matrix = pricing.get_matrix()
+        version = matrix.version
+        changes = self._changes(lambda i: 60000 + i if i % 2 else (None if i % 4 == 0 else 50000 + i))
+        start = time.perf_counter()
+        with CaptureQueriesContext(connection) as ctx:
+            status, data = self._save(changes)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        logger.debug(f'[가격 저장 1000셀] 변경 {elapsed_ms:.1f}ms / 쿼리 {len(ctx)}회')
+        self.assertEqual(status, 200)
+        self.assertEqual((data['updated'], data['deleted'], data['unchanged']), (500, 250, 250))
+        self.assertLess(len(ctx), 30)
+        self.assertEqual(OilPrice.objects.count(), 750)
+        self.assertEqual(OilPriceRevision.objects.count(), 1750)
+
+        # 매트릭스는 재빌드 없이 셀만 갱신
+        self.assertEqual(data['version'], version + 1)
+        with self.assertNumQueries(0):
+            patched = pricing.get_matrix()
+        self.assertIs(patched, matrix)
+        product = self.products[1]
+        self.assertEqual(patched.get_price(self.models[0].id, self.fuel.id, product.id), 60001)
+
+    def test_invalid_cell_rejects_whole_batch(self):
+        changes = self._changes(lambda i: 50000)[:10]
+        changes[3]['price'] = -1
+        changes[5]['model_id'] = 999999
+        changes.append(dict(changes[0]))
+        version = catalog.get_version(pricing.VERSION_KEY)
+
+        status, data = self._save(changes)
+        self.assertEqual(status, 400)
+        self.assertFalse(data['success'])
+        self.assertEqual(
+            [i for i, r in enumerate(data['results']) if r.get('status') == 'error'], [3, 5, 10],
+        )
+        self.assertEqual(OilPrice.objects.count(), 0)
+        self.assertEqual(catalog.get_version(pricing.VERSION_KEY), version)
+
+
+@override_settings(STORAGES=PLAIN_STATIC_STORAGES)
+class OilPricePivotTest(TestCase):
+    """가격 관리 피벗 - 전체 브랜드×연료를 쿼리 1회로 읽어 페이지 JSON으로 제공, 버전이 같으면 재사용"""
+
+    def setUp(self):
+        session = self.client.session
+        session['staff_auth_time'] = timezone.now().isoformat()
+        session.save()
+        self.gasoline = FuelType.objects.get_or_create(name='휘발유')[0]
+        self.diesel = FuelType.objects.get_or_create(name='경유')[0]
+        self.product = OilProduct.objects.get(tier='premium')
+        prices = []
+        for b in range(6):
+            brand = CarBrand.objects.create(name=f'브랜드{b}', order=b)
+            for m in range(40):
+                car_model = CarModel.objects.create(brand=brand, name=f'차종{m:02d}', order=m)
+                targets = [car_model]
+                if m == 0:
+                    # 세대가 있는 차종은 세대 행만 표시
+                    targets = [CarModel.objects.create(brand=brand, parent=car_model, name=g) for g in ('DN8', 'LF')]
+                for target in targets:
+                    prices.append(OilPrice(car_model=target, oil_product=self.product, fuel_type=self.gasoline,
+                                           price=50000 + b * 100 + m))
+        OilPrice.objects.bulk_create(prices)
+        # bulk_create는 시그널이 없음 - 이전 테스트의 피벗 캐시를 쓰지 않도록 버전 증가
+        catalog.bump_version()
+        catalog.bump_version(pricing.VERSION_KEY)
+
+    def test_pages_cover_all_brands_with_one_matrix_query(self):
+        with CaptureQueriesContext(connection) as ctx:
+            first = self.client.get('/api/oil-prices/pivot/?page=1').json()
+        self.assertEqual(sum('kiosk_oilprice' in q['sql'] for q in ctx.captured_queries), 1)
+        self.assertLessEqual(len(ctx), 6)  # 세션 + 카탈로그 스냅샷 3 + 제품 1 + 차종×가격 1
+
+        self.assertEqual([b['rows'] for b in first['brands']], [41] * 6)
+        self.assertEqual(first['pages'], 3)
+        sections, page = list(first['sections']), first
+        while page['next']:
+            with self.assertNumQueries(1):  # 세션만
+                page = self.client.get(f"/api/oil-prices/pivot/?page={page['next']}").json()
+            sections.extend(page['sections'])
+        rows = [row for s in sections for row in s['rows']]
+        self.assertEqual(len(rows), 246)
+        self.assertEqual(sum(not s['continued'] for s in sections), 6)
+
+        fuel_pos = [f['id'] for f in first['fuels']].index(self.gasoline.id)
+        product_pos = [p['id'] for p in first['products']].index(self.product.id)
+        width = len(first['products'])
+        self.assertEqual([r[1:3] for r in rows[:3]], [['차종00', 'DN8'], ['차종00', 'LF'], [None, '차종01']])
+        self.assertEqual(rows[2][3][fuel_pos * width + product_pos], 50001)
+        self.assertEqual(self.client.get('/api/oil-prices/pivot/?page=9').status_code, 404)
+
+        # 가격 저장 후 다음 요청은 새 버전으로 재빌드
+        with self.captureOnCommitCallbacks(execute=True):
+            OilPrice.objects.filter(car_model_id=rows[2][0]).update(price=1)
+            pricing.invalidate()
+        page = self.client.get('/api/oil-prices/pivot/?page=1').json()
+        self.assertEqual(page['version'], first['version'] + 1)
+        self.assertEqual(page['sections'][0]['rows'][2][3][fuel_pos * width + product_pos], 1)
+
+    def test_brand_view_rows_from_pivot(self):
+        brand = CarBrand.objects.get(name='브랜드1')
+        response = self.client.get(f'/staff/oil-prices/?brand={brand.id}&fuel={self.gasoline.id}')
+        rows = response.context['rows']
+        self.assertEqual(len(rows), 41)
+        self.assertEqual(
+            [(r['name'], r['parent_name'], r['is_first_in_group'], r['group_size']) for r in rows[:3]],
+            [('DN8', '차종00', True, 2), ('LF', '차종00', False, 2), ('차종01', None, True, 1)],
+        )
+        prices = {p['product_id']: p['price'] for p in rows[2]['prices']}
+        self.assertEqual(prices[self.product.id], 50101)
+        self.assertEqual(len(prices), OilProduct.objects.filter(is_active=True).count())
+
+        response = self.client.get(f'/staff/oil-prices/?brand={brand.id}&fuel={self.diesel.id}')
+        self.assertTrue(all(p['price'] is None for r in response.context['rows'] for p in r['prices']))
+        self.assertContains(self.client.get('/staff/oil-prices/all/'), '/api/oil-prices/pivot/')
+
+    def test_rebuilds_after_change_in_other_process(self):
+        catalog.bump_version(pricing.VERSION_KEY)
+        first = self.client.get('/api/oil-prices/pivot/?page=1').json()
+        model_id = first['sections'][0]['rows'][2][0]
+        # 다른 프로세스의 저장: 시그널/메모 없이 가격과 공유 버전 행만 바뀜
+        OilPrice.objects.filter(car_model_id=model_id).update(price=1)
+        CacheVersion.objects.filter(key=pricing.VERSION_KEY).update(version=F('version') + 1)
+
+        with override_settings(VERSION_CHECK_INTERVAL=0):
+            page = self.client.get('/api/oil-prices/pivot/?page=1').json()
+        self.assertEqual(page['version'], CacheVersion.objects.get(key=pricing.VERSION_KEY).version)
+        self.assertIn(1, page['sections'][0]['rows'][2][3])
+
+
+class PriceRevisionTest(TestCase):
+    """가격 이력 - 변경마다 이력 추가, 시점 조회, 예약 변경은 활성화 때 현재 가격 테이블에 반영"""
+
+    def setUp(self):
+        session = self.client.session
+        session['staff_auth_time'] = timezone.now().isoformat()
+        session.save()
+        brand = CarBrand.objects.create(name='현대')
+        self.car_model = CarModel.objects.create(brand=brand, name='쏘나타')
+        self.fuel = FuelType.objects.get_or_create(name='휘발유')[0]
+        self.product = OilProduct.objects.get(tier='premium')
+        self.key = (self.car_model.id, self.product.id, self.fuel.id)
+
+    def _save(self, price, **extra):
+        change = {'model_id': self.key[0], 'product_id': self.key[1], 'fuel_id': self.key[2], 'price': price}
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post('/api/oil-prices/save/', json.dumps({'changes': [change], **extra}),
+                                    content_type='application/json').json()
+
+    def test_oil_price_as_of_and_scheduled_activation(self):
+        self._save(90000)
+        saved_at = timezone.now()
+        self._save(95000)
+        self.assertEqual(OilPriceRevision.objects.count(), 2)
+        with self.assertNumQueries(1):
+            self.assertEqual(price_history.oil_price_as_of(*self.key, at=saved_at), 90000)
+        self.assertEqual(price_history.oil_price_as_of(*self.key), 95000)
+        self.assertIsNone(price_history.oil_price_as_of(*self.key, at=saved_at - timedelta(days=30)))
+
+        # 다음 달 1일 예약 - 현재 가격/매트릭스는 그대로
+        first = (timezone.localdate().replace(day=1) + timedelta(days=32)).replace(day=1)
+        data = self._save(99000, effective_from=first.isoformat())
+        self.assertEqual(data['scheduled'], 1)
+        self.assertEqual(OilPrice.objects.get().price, 95000)
+        self.assertEqual(pricing.get_matrix().get_price(self.car_model.id, self.fuel.id, self.product.id), 95000)
+
+        # 적용 시각 전에는 반영 안 함, 지난 뒤 활성화하면 반영 (반복 실행 안전)
+        self.assertEqual(price_history.activate_due()['oil_cells'], 0)
+        activate_at = timezone.make_aware(datetime.combine(first, datetime.min.time())) + timedelta(minutes=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            stats = price_history.activate_due(now=activate_at)
+        self.assertEqual((stats['oil_revisions'], stats['oil_cells']), (1, 1))
+        self.assertEqual(OilPrice.objects.get().price, 99000)
+        self.assertEqual(pricing.get_matrix().get_price(self.car_model.id, self.fuel.id, self.product.id), 99000)
+        self.assertEqual(price_history.activate_due(now=activate_at)['oil_revisions'], 0)
+        self.assertEqual(OilPriceRevision.objects.count(), 3)
+        self.assertEqual(price_history.oil_price_as_of(*self.key, at=activate_at), 99000)
+
+    def test_superseded_schedule_is_not_applied(self):
+        self._save(90000)
+        start = timezone.now()
+        price_history.schedule_oil({self.key: 99000}, start + timedelta(hours=1))
+        # 예약 시각 이후 활성화 전에 직원이 바꾼 가격이 우선
+        with mock.patch('django.utils.timezone.now', return_value=start + timedelta(hours=2)):
+            self._save(80000)
+            stats = price_history.activate_due()
+        self.assertEqual((stats['oil_revisions'], stats['oil_cells']), (1, 0))
+        self.assertEqual(OilPrice.objects.get().price, 80000)
+
+    def test_history_kept_after_car_model_delete(self):
+        self._save(90000)
+        generation = CarModel.objects.create(brand=self.car_model.brand, parent=self.car_model, name='DN8')
+        with self.captureOnCommitCallbacks(execute=True):
+            OilPrice.objects.create(car_model=generation, oil_product=self.product, fuel_type=self.fuel, price=95000)
+        price_history.schedule_oil({self.key: 99000}, timezone.now() + timedelta(hours=1))
+        self.assertEqual(OilPriceRevision.objects.first().car_model_name, '현대 쏘나타')
+        version = catalog.get_version(pricing.VERSION_KEY, fresh=True)
+
+        # 부모 차종 삭제 → 세대까지 가격 비움, 삭제 이력 기록, 버전 1회 증가
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f'/api/car-models/{self.car_model.id}/delete/')
+        self.assertTrue(response.json()['success'])
+        self.assertEqual(OilPrice.objects.count(), 0)
+        self.assertFalse(CarModel.objects.exists())
+        self.assertEqual(catalog.get_version(pricing.VERSION_KEY, fresh=True), version + 1)
+        self.assertEqual(
+            list(OilPriceRevision.objects.order_by('id').values_list('car_model_id', 'car_model_name', 'price')),
+            [(None, '현대 쏘나타', 90000), (None, '현대 쏘나타', 99000),
+             (None, '현대 쏘나타', None), (None, '현대 쏘나타 DN8', None)],
+        )
+        # 삭제된 차종의 예약 변경은 반영 없이 처리 완료
+        stats = price_history.activate_due(now=timezone.now() + timedelta(hours=2))
+        self.assertEqual((stats['oil_revisions'], stats['oil_cells']), (1, 0))
+        self.assertEqual(OilPrice.objects.count(), 0)
+
+    def test_admin_price_edits_write_revisions(self):
+        self._save(90000)
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        price = OilPrice.objects.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f'/admin/kiosk/oilprice/{price.id}/change/', {
+                'car_model': self.key[0], 'oil_product': self.key[1], 'fuel_type': self.key[2], 'price': 93000,
+            })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(OilPrice.objects.get().price, 93000)
+        self.assertEqual(pricing.get_matrix().get_price(self.car_model.id, self.fuel.id, self.product.id), 93000)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/admin/kiosk/oilprice/', {
+                'action': 'delete_selected', '_selected_action': [price.id], 'post': 'yes',
+            })
+        self.assertFalse(OilPrice.objects.exists())
+        self.assertEqual(list(OilPriceRevision.objects.order_by('id').values_list('price', 'source')),
+                         [(90000, 'staff'), (93000, 'staff'), (None, 'staff')])
+
+    def test_service_price_revisions(self):
+        service = AdditionalService.objects.create(name='와이퍼', price=20000)
+        created_at = timezone.now()
+        response = self.client.post('/api/services/save/', json.dumps({'services': [
+            {'id': service.id, 'price': 25000},
+        ]}), content_type='application/json')
+        self.assertTrue(response.json()['success'])
+        self.assertEqual(price_history.service_price_as_of(service.id, at=created_at), 20000)
+        self.assertEqual(price_history.service_price_as_of(service.id), 25000)
+
+        # 이름만 바꾸면 이력 없음, 예약 변경은 활성화 때 반영
+        tomorrow = (timezone.localdate() + timedelta(days=1)).isoformat()
+        self.client.post('/api/services/save/', json.dumps({'services': [
+            {'id': service.id, 'name': '와이퍼 교체', 'price': 30000, 'effective_from': tomorrow},
+        ]}), content_type='application/json')
+        service.refresh_from_db()
+        self.assertEqual((service.name, service.price), ('와이퍼 교체', 25000))
+        self.assertEqual(ServicePriceRevision.objects.filter(service=service).count(), 3)
+
+        version = catalog.get_version(pricing.SERVICE_VERSION_KEY)
+        with self.captureOnCommitCallbacks(execute=True):
+            stats = price_history.activate_due(now=timezone.now() + timedelta(days=2))
+        self.assertEqual(stats['services'], 1)
+        service.refresh_from_db()
+        self.assertEqual(service.price, 30000)
+        self.assertEqual(catalog.get_version(pricing.SERVICE_VERSION_KEY), version + 1)
+
+
+class SharedVersionTest(TransactionTestCase):
+    """캐시 버전은 DB 공유 - 다른 프로세스(import_oil_prices 커맨드)의 변경 후 웹 프로세스 매트릭스/카탈로그 재빌드"""
+
+    def setUp(self):
+        for tier in TIERS:
+            OilProduct.objects.get_or_create(tier=tier, defaults={'name': tier, 'mileage_interval': 10000})
+        for name in ('휘발유', '경유', '하이브리드'):
+            FuelType.objects.get_or_create(name=name)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, '단가표.xlsx')
+
+    def test_import_in_other_process_invalidates_caches(self):
+        matrix = pricing.get_matrix()
+        snapshot = catalog.get_snapshot()
+        self.assertEqual(len(snapshot.brands), 0)
+
+        _write_price_workbook(self.path, 2)
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{connection.settings_dict['NAME']}")
+        subprocess.run(
+            [sys.executable, 'manage.py', 'import_oil_prices', self.path], env=env, check=True,
+            cwd=settings.BASE_DIR, capture_output=True, timeout=120,
+        )
+        # 버전 확인 주기가 지나면 (여기서는 즉시) 다른 프로세스의 증가가 보임
+        with override_settings(VERSION_CHECK_INTERVAL=0):
+            rebuilt = pricing.get_matrix()
+            self.assertGreater(rebuilt.version, matrix.version)
+            car_model = CarModel.objects.get(name='현대0')
+            gasoline = FuelType.objects.get(name='휘발유')
+            product = OilProduct.objects.get(tier='standard')
+            self.assertEqual(rebuilt.get_price(car_model.id, gasoline.id, product.id), 51000)
+            self.assertEqual(len(catalog.get_snapshot().brands), 4)
+
+            # 이 프로세스의 증가는 원자적 증가 결과를 그대로 사용
+            version = catalog.bump_version(pricing.VERSION_KEY)
+            self.assertEqual(CacheVersion.objects.get(key=pricing.VERSION_KEY).version, version)
+
+        # 확인 주기 안에서는 쿼리 없이 메모 사용
+        with override_settings(VERSION_CHECK_INTERVAL=60):
+            pricing.get_matrix()
+            with self.assertNumQueries(0):
+                pricing.get_matrix()
+
+
+@override_settings(STORAGES=PLAIN_STATIC_STORAGES, VERSION_CHECK_INTERVAL=60)
+class CatalogSnapshotTest(TestCase):
+    """차종 선택 - 평상시 DB 조회 없음, 카탈로그 변경 후 스냅샷 재빌드"""
+
+    def test_select_car_is_query_free_until_catalog_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            brand = CarBrand.objects.create(name='현대')
+            CarModel.objects.create(brand=brand, name='쏘나타')
+        self.client.get('/car/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/car/')
+        self.assertContains(response, '쏘나타')
+        self.assertNotContains(response, '그랜저')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CarModel.objects.create(brand=brand, name='그랜저')
+        with self.assertNumQueries(3):  # 스냅샷 재빌드 (차종/브랜드/연료)
+            response = self.client.get('/car/')
+        self.assertContains(response, '그랜저')
@@ -12,6 +12,7 @@ urlpatterns = [
 
     # API
     path('api/order/create/', views.create_order, name='create_order'),
+    path('api/today/changes/', views.today_changes, name='today_changes'),
     path('api/order/<int:order_id>/send-alimtalk/', views.send_alimtalk, name='send_alimtalk'),
 
     # 직원용
@@ -19,6 +20,8 @@ urlpatterns = [
     path('staff/', views.staff_dashboard, name='staff_dashboard'),
     path('staff/order/<int:order_id>/', views.order_detail, name='order_detail'),
     path('staff/search/', views.order_search, name='order_search'),
+    path('staff/events/', views.staff_events, name='staff_events'),
+    path('staff/integrations/stats/', views.integration_stats, name='integration_stats'),
     path('staff/settings/', views.store_settings, name='store_settings'),
 
     # 예약 관리
@@ -29,8 +32,11 @@ urlpatterns = [
 
     # 가격 관리
     path('staff/oil-prices/', views.oil_price_management, name='oil_price_management'),
+    path('staff/oil-prices/export/', views.oil_price_export, name='oil_price_export'),
+    path('staff/oil-prices/all/', views.oil_price_overview, name='oil_price_overview'),
     path('staff/services/', views.service_management, name='service_management'),
     path('api/oil-prices/save/', views.oil_price_save, name='oil_price_save'),
+    path('api/oil-prices/pivot/', views.oil_price_pivot, name='oil_price_pivot'),
     path('api/car-models/add/', views.car_model_add, name='car_model_add'),
     path('api/car-models/<int:model_id>/delete/', views.car_model_delete, name='car_model_delete'),
 
@@ -3,29 +3,47 @@ from functools import wraps
 from django.conf import settings
 from django.core.paginator import Paginator
 from django.shortcuts import render, get_object_or_404, redirect
-from django.contrib import messages
-from django.http import JsonResponse
-from django.views.decorators.http import require_POST
+from django.urls import reverse
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, HttpResponse, Http404, StreamingHttpResponse
+from django.views.decorators.http import require_POST, require_GET
 from django.utils import timezone
-from datetime import date, datetime, timedelta
-from .models import CarBrand, CarModel, FuelType, EngineOil, AdditionalService, ServiceOrder, ServiceOrderItem, StoreSettings, Customer, Reservation, OilProduct, OilPrice
-from .services import send_service_complete_message
-from .ecount import create_sales_slip, create_purchase_slip
+from django.utils.dateparse import parse_date, parse_datetime
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Q
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import islice
+from urllib.parse import quote
+from .models import CarBrand, CarModel, FuelType, EngineOil, AdditionalService, ServiceOrder, ServiceOrderItem, StoreSettings, Customer, Reservation, OilProduct, OilPrice, DailyOrderStats, business_date
+from .services import enqueue_service_complete
+from .ecount import enqueue_slips as enqueue_ecount_slips
+from .catalog import get_snapshot as get_catalog_snapshot, get_version, bump_version
+from .pricing import get_matrix as get_price_matrix, FALLBACK_PRICES, quote as get_quote
+from .pricing import get_services as get_active_services, bump_service_version
+from .integrations import latency_stats
+from . import events, price_history, price_pivot, price_sheet, pricing
 
 
 # ============================================
 # 스태프 인증
 # ============================================
 
+def _is_staff_authenticated(request):
+    auth_time = request.session.get('staff_auth_time')
+    if auth_time:
+        auth_dt = datetime.fromisoformat(auth_time)
+        if timezone.now() - auth_dt < timedelta(hours=24):
+            return True
+    return False
+
+
 def staff_required(view_func):
     """스태프 인증 데코레이터 - 세션 기반 24시간 유효"""
     @wraps(view_func)
     def wrapper(request, *args, **kwargs):
-        auth_time = request.session.get('staff_auth_time')
-        if auth_time:
-            auth_dt = datetime.fromisoformat(auth_time)
-            if timezone.now() - auth_dt < timedelta(hours=24):
-                return view_func(request, *args, **kwargs)
+        if _is_staff_authenticated(request):
+            return view_func(request, *args, **kwargs)
         # 인증 안 됨 → 로그인 페이지로
         return redirect(f'/staff/login/?next={request.get_full_path()}')
     return wrapper
@@ -49,135 +67,213 @@ def staff_login(request):
     })
 
 
-def start(request):
-    """시작 페이지 - 차량번호 입력 + 오늘의 예약/시공 사이드바"""
-    today = date.today()
+SIDEBAR_STATUS_BADGE = {
+    'reserved': '예약',
+    'arrived': '도착',
+    'in_progress': '시공중',
+    'completed': '완료',
+    'cancelled': '취소',
+    'no_show': '노쇼',
+}
 
-    # 예약 목록
-    reservations = Reservation.objects.filter(
-        date=today,
-    ).select_related('brand', 'car_model').order_by('time')
+# 델타 피드 커서 겹침 구간 (커밋 지연으로 updated_at이 커서보다 앞선 행 보완)
+CHANGES_OVERLAP = timedelta(seconds=2)
+# 예약/주문 삭제 버전 - 삭제된 행은 updated_at 델타로 알 수 없으므로 커서에 담아 두고 바뀌면 리셋
+SIDEBAR_DELETE_VERSION_KEY = 'sidebar_deletes'
 
-    # 시공(ServiceOrder) 목록
-    start_of_day = timezone.make_aware(datetime.combine(today, datetime.min.time()))
-    end_of_day = start_of_day + timedelta(days=1)
-    orders = ServiceOrder.objects.filter(
-        created_at__gte=start_of_day,
-        created_at__lt=end_of_day,
-    ).select_related('brand', 'car_model').order_by('created_at')
-
-    STATUS_BADGE = {
-        'reserved': '예약',
-        'arrived': '도착',
-        'in_progress': '시공중',
-        'completed': '완료',
-        'cancelled': '취소',
-        'no_show': '노쇼',
+
+def on_sidebar_item_deleted(sender, instance, **kwargs):
+    """시그널 핸들러: 예약/주문 삭제 → (커밋 후) 삭제 버전 증가"""
+    transaction.on_commit(lambda: bump_version(SIDEBAR_DELETE_VERSION_KEY))
+
+
+def _mask_name(name):
+    """고객명 마스킹 (홍길동 → 홍*동)"""
+    if len(name) == 2:
+        return name[0] + '*'
+    if len(name) >= 3:
+        return name[0] + '*' * (len(name) - 2) + name[-1]
+    return name
+
+
+def _sidebar_reservation_item(r):
+    """사이드바 항목 - 예약"""
+    if r.car_number:
+        display_label = r.car_number[-4:]
+    elif r.customer_name:
+        display_label = _mask_name(r.customer_name)
+    else:
+        display_label = '예약'
+
+    url = f"{reverse('select_car')}?car_number={quote(r.car_number or '')}"
+    if r.brand_id:
+        url += f'&brand={r.brand_id}'
+    if r.car_model_id:
+        url += f'&model={r.car_model_id}'
+    url += f'&reservation_id={r.id}'
+
+    return {
+        'type': 'reservation',
+        'id': r.id,
+        'key': f'reservation-{r.id}',
+        'url': url,
+        'time': r.time.strftime('%H:%M'),
+        'sort_key': r.time.strftime('%H%M'),
+        'display_label': display_label,
+        'model_name': r.car_model.name if r.car_model else '-',
+        'badge': SIDEBAR_STATUS_BADGE.get(r.status, r.status),
+        'status': r.status,
+        'car_number': r.car_number or '',
+        'brand_id': r.brand_id or '',
+        'model_id': r.car_model_id or '',
     }
 
-    sidebar_items = []
-
-    for r in reservations:
-        if r.car_number:
-            display_label = r.car_number[-4:]
-        elif r.customer_name:
-            name = r.customer_name
-            if len(name) == 2:
-                display_label = name[0] + '*'
-            elif len(name) >= 3:
-                display_label = name[0] + '*' * (len(name) - 2) + name[-1]
-            else:
-                display_label = name
-        else:
-            display_label = '예약'
-
-        model_name = r.car_model.name if r.car_model else '-'
-        badge = STATUS_BADGE.get(r.status, r.status)
-
-        sidebar_items.append({
-            'type': 'reservation',
-            'id': r.id,
-            'time': r.time.strftime('%H:%M'),
-            'sort_key': r.time.strftime('%H%M'),
-            'display_label': display_label,
-            'model_name': model_name,
-            'badge': badge,
-            'status': r.status,
-            'car_number': r.car_number or '',
-            'brand_id': r.brand_id or '',
-            'model_id': r.car_model_id or '',
-        })
 
-    for o in orders:
-        local_time = timezone.localtime(o.created_at)
-        if o.car_number:
-            display_label = o.car_number[-4:]
-        else:
-            display_label = '-'
-
-        model_name = o.car_model.name if o.car_model else '-'
-        badge = '완료' if o.status == 'completed' else '시공'
-
-        sidebar_items.append({
-            'type': 'order',
-            'id': o.id,
-            'time': local_time.strftime('%H:%M'),
-            'sort_key': local_time.strftime('%H%M'),
-            'display_label': display_label,
-            'model_name': model_name,
-            'badge': badge,
-            'status': o.status,
-            'car_number': o.car_number or '',
-            'brand_id': o.brand_id or '',
-            'model_id': o.car_model_id or '',
-        })
+def _sidebar_order_item(o):
+    """사이드바 항목 - 시공 주문"""
+    local_time = timezone.localtime(o.created_at)
+    return {
+        'type': 'order',
+        'id': o.id,
+        'key': f'order-{o.id}',
+        'url': reverse('order_detail', args=[o.id]),
+        'time': local_time.strftime('%H:%M'),
+        'sort_key': local_time.strftime('%H%M'),
+        'display_label': o.car_number[-4:] if o.car_number else '-',
+        'model_name': o.car_model.name if o.car_model else '-',
+        'badge': '완료' if o.status == 'completed' else '시공',
+        'status': o.status,
+        'car_number': o.car_number or '',
+        'brand_id': o.brand_id or '',
+        'model_id': o.car_model_id or '',
+    }
+
+
+def _encode_cursor(dt, delete_version):
+    """커서 = '마이크로초 타임스탬프.삭제 버전'"""
+    return f'{int(dt.timestamp() * 1_000_000)}.{delete_version}'
+
+
+def _decode_cursor(value):
+    """(시각, 삭제 버전) - 형식이 틀리면 (None, None)"""
+    try:
+        timestamp, delete_version = value.split('.')
+        return datetime.fromtimestamp(int(timestamp) / 1_000_000, tz=dt_timezone.utc), int(delete_version)
+    except (AttributeError, TypeError, ValueError, OverflowError, OSError):
+        return None, None
+
+
+def _today_sidebar_items(today):
+    """오늘의 예약 + 시공 사이드바 항목 전체 (시간순)"""
+    reservations = Reservation.objects.filter(
+        date=today,
+    ).select_related('car_model').order_by('time')
+    orders = ServiceOrder.objects.filter(
+        business_date=today,
+    ).select_related('car_model').order_by('created_at')
 
+    sidebar_items = [_sidebar_reservation_item(r) for r in reservations]
+    sidebar_items += [_sidebar_order_item(o) for o in orders]
     sidebar_items.sort(key=lambda x: x['sort_key'])
+    return sidebar_items
+
+
+def start(request):
+    """시작 페이지 - 차량번호 입력 + 오늘의 예약/시공 사이드바"""
+    # 버전을 항목보다 먼저 읽음 → 그 사이 삭제는 다음 폴링에서 리셋으로 반영
+    cursor = _encode_cursor(timezone.now(), get_version(SIDEBAR_DELETE_VERSION_KEY))
 
     context = {
-        'sidebar_items': sidebar_items,
+        'sidebar_items': _today_sidebar_items(business_date()),
+        'sidebar_cursor': cursor,
     }
     return render(request, 'start.html', context)
 
 
-def _build_brands_data(include_generations=True):
-    """브랜드/차종/세대 JSON 데이터 빌드"""
-    brands = CarBrand.objects.prefetch_related('models', 'models__generations').all()
-    brands_data = []
-    for brand in brands:
-        models_data = []
-        for m in brand.models.filter(parent=None):
-            model_info = {'id': m.id, 'name': m.name}
-            if include_generations:
-                gens = list(m.generations.all())
-                if gens:
-                    model_info['generations'] = [{'id': g.id, 'name': g.name} for g in gens]
-            models_data.append(model_info)
-        brands_data.append({
-            'id': brand.id,
-            'name': brand.name,
-            'models': models_data,
+@require_GET
+def today_changes(request):
+    """
+    사이드바 델타 피드 API - since 커서 이후 생성/변경된 항목만 반환.
+    항목은 key(type-id) 기준 upsert이므로 겹침 구간의 중복 전달은 무해하다.
+    커서 이후 예약/주문이 삭제됐으면(삭제 버전 변경) 오늘 전체를 다시 보낸다.
+    """
+    now = timezone.now()
+    today = business_date(now)
+    delete_version = get_version(SIDEBAR_DELETE_VERSION_KEY)
+    since, since_delete_version = _decode_cursor(request.GET.get('since'))
+
+    # 커서 없음/날짜 변경/삭제 발생 → 오늘 전체를 다시 보냄
+    if since is None or business_date(since) != today or since_delete_version != delete_version:
+        return JsonResponse({
+            'cursor': _encode_cursor(now, delete_version),
+            'reset': True,
+            'items': _today_sidebar_items(today),
+            'removed': [],
         })
-    return brands, brands_data
+
+    window_start = since - CHANGES_OVERLAP
+    items = []
+    removed = []
+
+    # updated_at 인덱스 범위 조회 → 오늘 행 전체를 다시 읽지 않음
+    for r in Reservation.objects.filter(updated_at__gt=window_start).select_related('car_model'):
+        if r.date == today:
+            items.append(_sidebar_reservation_item(r))
+        else:
+            removed.append(f'reservation-{r.id}')  # 다른 날짜로 변경됨
+
+    orders = ServiceOrder.objects.filter(
+        updated_at__gt=window_start,
+        business_date=today,
+    ).select_related('car_model')
+    items += [_sidebar_order_item(o) for o in orders]
+
+    return JsonResponse({
+        'cursor': _encode_cursor(now, delete_version),
+        'reset': False,
+        'items': items,
+        'removed': removed,
+    })
 
 
 def select_car(request):
     """차종 선택 페이지 (브랜드/차종/연료 한 페이지에서)"""
     car_number = request.GET.get('car_number', '')
-    brands, brands_data = _build_brands_data()
-    fuel_types = FuelType.objects.all()
-
-    fuels_data = [{'id': f.id, 'name': f.name} for f in fuel_types]
+    snapshot = get_catalog_snapshot()
 
     context = {
         'car_number': car_number,
-        'brands': brands,
-        'brands_json': json.dumps(brands_data, ensure_ascii=False),
-        'fuels_json': json.dumps(fuels_data, ensure_ascii=False),
+        'brands': snapshot.brands,
+        'brands_json': snapshot.brands_json,
+        'fuels_json': snapshot.fuels_json,
     }
     return render(request, 'select_car.html', context)
 
 
+def _resolve_vehicle(brand_id, model_id, fuel_id):
+    """브랜드/차종/연료 id → 카탈로그 스냅샷 항목 (DB 조회 없음, 없는 id면 404)"""
+    snapshot = get_catalog_snapshot()
+
+    def _lookup(mapping, value):
+        if not value:
+            return None
+        try:
+            return mapping[int(value)]
+        except (KeyError, ValueError):
+            raise Http404
+
+    return (
+        _lookup(snapshot.brand_map, brand_id),
+        _lookup(snapshot.model_map, model_id),
+        _lookup(snapshot.fuel_map, fuel_id),
+    )
+
+
+def _parse_service_ids(value):
+    """'1,2,3' → [1, 2, 3]"""
+    return [int(x) for x in (value or '').split(',') if x.isdigit()]
+
+
 def select_oil(request):
     """엔진오일 선택 페이지"""
     car_number = request.GET.get('car_number', '')
@@ -185,53 +281,20 @@ def select_oil(request):
     model_id = request.GET.get('model')
     fuel_id = request.GET.get('fuel')
 
-    brand = get_object_or_404(CarBrand, id=brand_id) if brand_id else None
-    car_model = get_object_or_404(CarModel.objects.select_related('parent'), id=model_id) if model_id else None
-    fuel_type = get_object_or_404(FuelType, id=fuel_id) if fuel_id else None
-
-    # DB에서 차종×연료 조합의 가격 조회
-    prices = OilPrice.objects.filter(
-        car_model=car_model, fuel_type=fuel_type
-    ).select_related('oil_product')
-    price_map = {p.oil_product.tier: p.price for p in prices}
-
-    # 하이브리드면 premium 가격을 벤졸(premium_hybrid) 가격으로 교체
-    if fuel_type and fuel_type.name == '하이브리드' and 'premium_hybrid' in price_map:
-        price_map['premium'] = price_map['premium_hybrid']
-
-    # 가시적인 오일 제품 목록 생성
-    oil_products = OilProduct.objects.filter(is_active=True, is_visible=True).order_by('order')
-    has_db_prices = bool(price_map)
-
-    # 폴백 가격 (DB에 가격 데이터가 없는 수입차 등)
-    FALLBACK_PRICES = {
-        'economy': 50000,
-        'standard': 70000,
-        'premium': 90000,
-        'hyperformance': 120000,
-        'racing': 150000,
-    }
+    brand, car_model, fuel_type = _resolve_vehicle(brand_id, model_id, fuel_id)
 
-    oil_tiers = []
-    for op in oil_products:
-        if has_db_prices:
-            price = price_map.get(op.tier)
-            if price is None:
-                continue  # 이 티어는 해당 차종에 미제공
-        else:
-            price = FALLBACK_PRICES.get(op.tier, 0)
-
-        oil_tiers.append({
-            'id': op.tier,
-            'product_id': op.id,
-            'name': op.get_tier_display(),
-            'price': price,
-            'oil_type': op.oil_type,
-            'tagline': op.tagline,
-            'product_name': op.name,
-            'badge': op.badge or None,
-            'badge_type': op.badge_type or None,
-        })
+    # 가격 매트릭스에서 차종×연료 조합의 티어별 가격 조회 (하이브리드 치환/노출 필터 적용됨)
+    matrix = get_price_matrix()
+    priced_tiers = matrix.lookup(car_model['id'], fuel_type['id']) if car_model and fuel_type else ()
+    has_db_prices = bool(priced_tiers)
+
+    if has_db_prices:
+        oil_tiers = [dict(tier, price=price) for tier, price in priced_tiers]
+    else:
+        oil_tiers = [
+            dict(tier, price=FALLBACK_PRICES.get(tier['id'], 0))
+            for tier in matrix.visible_tiers()
+        ]
 
     is_domestic = has_db_prices  # DB에 가격이 있으면 국산
 
@@ -256,40 +319,32 @@ def select_service(request):
     model_id = request.GET.get('model')
     fuel_id = request.GET.get('fuel')
     oil_tier_id = request.GET.get('oil')
-    oil_price_param = request.GET.get('oil_price', '0')
-
-    brand = get_object_or_404(CarBrand, id=brand_id) if brand_id else None
-    car_model = get_object_or_404(CarModel.objects.select_related('parent'), id=model_id) if model_id else None
-    fuel_type = get_object_or_404(FuelType, id=fuel_id) if fuel_id else None
 
-    # OilProduct DB에서 조회
-    oil_product = OilProduct.objects.filter(tier=oil_tier_id).first()
-    oil_price = int(oil_price_param) if oil_price_param.isdigit() else 0
+    brand, car_model, fuel_type = _resolve_vehicle(brand_id, model_id, fuel_id)
 
-    oil = type('Oil', (), {
-        'name': oil_product.get_tier_display() if oil_product else '',
-        'price': oil_price,
-        'product_name': oil_product.name if oil_product else '',
-    })()
-
-    services = AdditionalService.objects.filter(is_active=True)
+    # 오일 가격은 서버 견적 엔진에서 계산 (URL 파라미터 신뢰 안 함)
+    quote = get_quote(
+        car_model['id'] if car_model else None,
+        fuel_type['id'] if fuel_type else None,
+        oil_tier_id,
+    )
+    if quote is None:
+        raise Http404
 
-    # JSON for JavaScript
-    services_data = [{'id': s.id, 'name': s.name, 'description': s.description, 'price': s.price} for s in services]
+    services = get_active_services()
 
     context = {
         'car_number': car_number,
         'brand': brand,
         'car_model': car_model,
         'fuel_type': fuel_type,
-        'oil': oil,
+        'oil': quote['oil'],
         'services': services,
-        'services_json': json.dumps(services_data, ensure_ascii=False),
+        'services_json': json.dumps(services, ensure_ascii=False),
         'brand_id': brand_id,
         'model_id': model_id,
         'fuel_id': fuel_id,
         'oil_id': oil_tier_id,
-        'oil_price': oil_price,
     }
     return render(request, 'select_service.html', context)
 
@@ -301,47 +356,32 @@ def estimate(request):
     model_id = request.GET.get('model')
     fuel_id = request.GET.get('fuel')
     oil_tier_id = request.GET.get('oil')
-    oil_price_param = request.GET.get('oil_price', '0')
     service_ids = request.GET.get('services', '')
 
-    brand = get_object_or_404(CarBrand, id=brand_id) if brand_id else None
-    car_model = get_object_or_404(CarModel.objects.select_related('parent'), id=model_id) if model_id else None
-    fuel_type = get_object_or_404(FuelType, id=fuel_id) if fuel_id else None
+    brand, car_model, fuel_type = _resolve_vehicle(brand_id, model_id, fuel_id)
 
-    # OilProduct DB에서 조회
-    oil_product = OilProduct.objects.filter(tier=oil_tier_id).first()
-    oil_price = int(oil_price_param) if oil_price_param.isdigit() else 0
-
-    oil = type('Oil', (), {
-        'name': oil_product.get_tier_display() if oil_product else '',
-        'price': oil_price,
-        'product_name': oil_product.name if oil_product else '',
-    })()
-
-    # 선택된 추가 서비스들
-    services = []
-    services_total = 0
-    if service_ids:
-        ids = [int(x) for x in service_ids.split(',') if x.isdigit()]
-        services = AdditionalService.objects.filter(id__in=ids, is_active=True)
-        services_total = sum(s.price for s in services)
-
-    total_price = oil.price + services_total
+    quote = get_quote(
+        car_model['id'] if car_model else None,
+        fuel_type['id'] if fuel_type else None,
+        oil_tier_id,
+        _parse_service_ids(service_ids),
+    )
+    if quote is None:
+        raise Http404
 
     context = {
         'car_number': car_number,
         'brand': brand,
         'car_model': car_model,
         'fuel_type': fuel_type,
-        'oil': oil,
-        'services': services,
-        'services_total': services_total,
-        'total_price': total_price,
+        'oil': quote['oil'],
+        'services': quote['services'],
+        'services_total': quote['services_total'],
+        'total_price': quote['total_price'],
         'brand_id': brand_id,
         'model_id': model_id,
         'fuel_id': fuel_id,
         'oil_id': oil_tier_id,
-        'oil_price': oil_price,
         'service_ids': service_ids,
     }
     return render(request, 'estimate.html', context)
@@ -356,43 +396,63 @@ def create_order(request):
     """시공 주문 생성 (견적서에서 '시공 진행' 클릭 시)"""
     data = json.loads(request.body)
 
-    brand = get_object_or_404(CarBrand, id=data.get('brand_id')) if data.get('brand_id') else None
-    car_model = get_object_or_404(CarModel, id=data.get('model_id')) if data.get('model_id') else None
-    fuel_type = get_object_or_404(FuelType, id=data.get('fuel_id')) if data.get('fuel_id') else None
+    brand, car_model, fuel_type = _resolve_vehicle(
+        data.get('brand_id'), data.get('model_id'), data.get('fuel_id'),
+    )
 
+    # 가격은 서버 견적 엔진으로 계산 (클라이언트 oil_price 무시)
     oil_tier_id = data.get('oil_id', '')
-    oil_price = int(data.get('oil_price', 0))
-
-    # OilProduct에서 정보 조회
-    oil_product = OilProduct.objects.filter(tier=oil_tier_id).first()
-
-    # 주문 생성
-    order = ServiceOrder.objects.create(
-        car_number=data.get('car_number', ''),
-        customer_phone=data.get('customer_phone', ''),
-        brand=brand,
-        car_model=car_model,
-        fuel_type=fuel_type,
-        oil_tier=oil_tier_id,
-        oil_name=oil_product.get_tier_display() if oil_product else '',
-        oil_product_name=oil_product.name if oil_product else '',
-        oil_price=oil_price,
-        status='pending',
+    quote = get_quote(
+        car_model['id'] if car_model else None,
+        fuel_type['id'] if fuel_type else None,
+        oil_tier_id,
+        _parse_service_ids(data.get('service_ids', '')),
     )
+    if quote is None:
+        return JsonResponse({'success': False, 'error': '선택할 수 없는 오일입니다.'}, status=400)
 
-    # 추가 서비스 저장
-    service_ids = data.get('service_ids', '')
-    if service_ids:
-        ids = [int(x) for x in service_ids.split(',') if x.isdigit()]
-        services = AdditionalService.objects.filter(id__in=ids, is_active=True)
-        for service in services:
-            ServiceOrderItem.objects.create(
-                order=order,
-                service=service,
-                name=service.name,
-                price=service.price,
+    # 같은 멱등 키로 이미 생성된 주문이면 그대로 반환 (더블탭/재시도)
+    idempotency_key = str(data.get('idempotency_key') or '')[:64] or None
+    if idempotency_key:
+        existing_id = ServiceOrder.objects.filter(idempotency_key=idempotency_key).values_list('id', flat=True).first()
+        if existing_id:
+            return JsonResponse({'success': True, 'order_id': existing_id})
+
+    try:
+        with transaction.atomic():
+            order = ServiceOrder.objects.create(
+                car_number=data.get('car_number', ''),
+                customer_phone=data.get('customer_phone', ''),
+                brand_id=brand['id'] if brand else None,
+                car_model_id=car_model['id'] if car_model else None,
+                fuel_type_id=fuel_type['id'] if fuel_type else None,
+                oil_tier=oil_tier_id,
+                oil_name=quote['oil']['name'],
+                oil_product_name=quote['oil']['product_name'],
+                oil_price=quote['oil']['price'],
+                services_total=quote['services_total'],
+                status='pending',
+                idempotency_key=idempotency_key,
             )
 
+            # 추가 서비스 일괄 저장 (bulk_create는 시그널이 없으므로 합계는 위에서 직접 설정)
+            ServiceOrderItem.objects.bulk_create([
+                ServiceOrderItem(
+                    order=order,
+                    service_id=service['id'],
+                    name=service['name'],
+                    price=service['price'],
+                )
+                for service in quote['services']
+            ])
+    except IntegrityError:
+        # 동시 제출: 다른 요청이 같은 키로 먼저 커밋함
+        if not idempotency_key:
+            raise
+        existing_id = ServiceOrder.objects.filter(idempotency_key=idempotency_key).values_list('id', flat=True).get()
+        return JsonResponse({'success': True, 'order_id': existing_id})
+
+    events.publish('order_created', order_id=order.id, car_number=order.car_number, status=order.status)
     return JsonResponse({'success': True, 'order_id': order.id})
 
 
@@ -402,27 +462,33 @@ def staff_dashboard(request):
     status_filter = request.GET.get('status', 'pending')
     time_filter = request.GET.get('time', 'today')  # today or all
 
-    # 기본 쿼리셋
+    # 기본 쿼리셋 (영업일 인덱스 동등 비교)
     if time_filter == 'today':
-        today = timezone.now().date()
-        base_qs = ServiceOrder.objects.filter(created_at__date=today)
+        base_qs = ServiceOrder.objects.filter(business_date=business_date())
+        # 통계 - 조건부 집계 1회
+        stats = base_qs.aggregate(
+            pending=Count('id', filter=~Q(status='completed')),
+            completed=Count('id', filter=Q(status='completed')),
+        )
     else:
         base_qs = ServiceOrder.objects.all()
+        # 통계 - 일별 집계 테이블 합계 (주문 이력 크기와 무관)
+        totals = DailyOrderStats.totals()
+        stats = {
+            'pending': totals['orders'] - totals['completed'],
+            'completed': totals['completed'],
+        }
 
     if status_filter == 'completed':
         orders = base_qs.filter(status='completed').order_by('-completed_at')
     else:
         # 미완료 (pending, in_progress 모두)
         orders = base_qs.exclude(status='completed').order_by('-created_at')
+    orders = orders.select_related('brand', 'car_model')
 
-    # 통계
-    stats = {
-        'pending': base_qs.exclude(status='completed').count(),
-        'completed': base_qs.filter(status='completed').count(),
-    }
-
-    # 페이지네이션
+    # 페이지네이션 (전체 건수는 통계에서 이미 구했으므로 COUNT 생략)
     paginator = Paginator(orders, 20)
+    paginator.count = stats['completed'] if status_filter == 'completed' else stats['pending']
     page = request.GET.get('page', 1)
     orders_page = paginator.get_page(page)
 
@@ -438,7 +504,7 @@ def staff_dashboard(request):
 @staff_required
 def order_detail(request, order_id):
     """주문 상세 / 편집 페이지"""
-    order = get_object_or_404(ServiceOrder, id=order_id)
+    order = get_object_or_404(ServiceOrder.objects.prefetch_related('services'), id=order_id)
 
     # 오일별 교체 주기 - OilProduct DB에서 조회
     oil_product = OilProduct.objects.filter(tier=order.oil_tier).first()
@@ -446,6 +512,7 @@ def order_detail(request, order_id):
 
     if request.method == 'POST':
         action = request.POST.get('action', '')
+        previous_status = order.status
         order.mileage_current = request.POST.get('mileage_current') or None
         order.notes = request.POST.get('notes', '')
         order.membership_discount = request.POST.get('membership_discount') == 'on'
@@ -458,34 +525,19 @@ def order_detail(request, order_id):
             order.status = 'completed'
             order.completed_at = timezone.now()
 
-        order.save()
-
-        # 이카운트 ERP 연동
-        if settings.ECOUNT_API_KEY:
-            # 시공 완료 시 매출전표 생성
-            if action == 'complete':
-                ecount_result = create_sales_slip(order)
-                if ecount_result.get('success'):
-                    order.ecount_slip_no = ecount_result['slip_no']
-                    order.save(update_fields=['ecount_slip_no'])
-                else:
-                    messages.error(request, f'이카운트 매출전표 생성 실패: {ecount_result.get("error", "알 수 없는 오류")}')
-
-            # 멤버십 할인 ON + 아직 매입전표 없음 → 생성
-            if order.membership_discount and not order.ecount_purchase_slip_no:
-                purchase_result = create_purchase_slip(order)
-                if purchase_result.get('success'):
-                    order.ecount_purchase_slip_no = purchase_result['slip_no']
-                    order.save(update_fields=['ecount_purchase_slip_no'])
-                else:
-                    messages.error(request, f'이카운트 매입전표 생성 실패: {purchase_result.get("error", "알 수 없는 오류")}')
+        # 이카운트 전표는 아웃박스에 기록만 하고 워커(process_ecount_outbox)가 생성
+        with transaction.atomic():
+            order.save()
+            enqueue_ecount_slips(order, completed=action == 'complete')
+        if order.status != previous_status:
+            events.publish('order_status', order_id=order.id, status=order.status, previous_status=previous_status)
 
         # 예약↔시공 상태 연동
         if hasattr(order, 'reservation') and order.reservation:
             res = order.reservation
             if order.status == 'completed' and res.status != 'completed':
                 res.status = 'completed'
-                res.save(update_fields=['status'])
+                res.save(update_fields=['status', 'updated_at'])
 
         # 완료된 주문은 상세페이지로, 미완료는 대시보드로
         if order.status == 'completed':
@@ -495,6 +547,8 @@ def order_detail(request, order_id):
     context = {
         'order': order,
         'mileage_interval': mileage_interval,
+        'ecount_jobs': order.ecount_jobs.exclude(status='done'),
+        'notifications': order.notifications.all(),
     }
     return render(request, 'staff/order_detail.html', context)
 
@@ -547,8 +601,10 @@ def store_settings(request):
 @staff_required
 @require_POST
 def send_alimtalk(request, order_id):
-    """알림톡 발송"""
-    order = get_object_or_404(ServiceOrder, id=order_id)
+    """알림톡 발송 요청 - 발송 큐에 등록만 하고 즉시 응답 (워커 process_notifications가 발송)"""
+    order = get_object_or_404(
+        ServiceOrder.objects.select_related('brand', 'car_model').prefetch_related('services'), id=order_id,
+    )
 
     # 요청에서 전화번호 가져오기
     try:
@@ -565,9 +621,41 @@ def send_alimtalk(request, order_id):
     if not order.customer_phone:
         return JsonResponse({'success': False, 'error': '고객 전화번호가 없습니다.'})
 
-    result = send_service_complete_message(order)
+    notification = enqueue_service_complete(order)
+
+    return JsonResponse({
+        'success': True,
+        'queued': True,
+        'notification_id': notification.id,
+        'status': notification.status,
+    })
+
 
-    return JsonResponse(result)
+@staff_required
+@require_GET
+def integration_stats(request):
+    """외부 연동(이카운트/뿌리오) 지연 히스토그램 + 서킷 상태 (이 워커 프로세스 기준)"""
+    return JsonResponse(latency_stats())
+
+
+async def staff_events(request):
+    """
+    스태프 실시간 이벤트 스트림 (SSE) - 주문 생성/상태 변경/예약 변경
+    ASGI(config.asgi)에서만 구독한다. WSGI에서는 연결마다 워커를 붙잡으므로 204로 재연결을 멈추고
+    화면은 주기적 새로고침으로 대신한다 (staff_base.html).
+    """
+    if not await sync_to_async(_is_staff_authenticated)(request):
+        return HttpResponse(status=403)
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+
+    response = StreamingHttpResponse(
+        events.stream(),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 
 # ============================================
@@ -582,21 +670,18 @@ def reservation_list(request):
         try:
             target_date = datetime.strptime(target_date, '%Y-%m-%d').date()
         except:
-            target_date = date.today()
+            target_date = business_date()
     else:
-        target_date = date.today()
+        target_date = business_date()
 
     # 쿼리 최적화: select_related로 JOIN
     reservations = list(Reservation.objects.filter(date=target_date)
         .select_related('brand', 'car_model')
         .order_by('time'))
 
-    # 시간대를 고려해서 해당 날짜의 주문 조회
-    start_of_day = timezone.make_aware(datetime.combine(target_date, datetime.min.time()))
-    end_of_day = start_of_day + timedelta(days=1)
+    # 해당 영업일의 주문 조회
     orders = list(ServiceOrder.objects.filter(
-        created_at__gte=start_of_day,
-        created_at__lt=end_of_day
+        business_date=target_date,
     ).select_related('brand', 'car_model').order_by('created_at'))
 
     # 주문별 로컬 시간 미리 계산
@@ -703,12 +788,12 @@ def reservation_add(request):
         return redirect('reservation_list')
 
     # GET: 폼 표시
-    brands, brands_data = _build_brands_data(include_generations=False)
+    snapshot = get_catalog_snapshot()
 
     context = {
-        'brands': brands,
-        'brands_json': json.dumps(brands_data, ensure_ascii=False),
-        'today': date.today(),
+        'brands': snapshot.brands,
+        'brands_json': snapshot.brands_flat_json,
+        'today': business_date(),
         'oil_choices': [
             '이코노미 (DX5, GX5)',
             '스탠다드 (DX7)',
@@ -730,23 +815,31 @@ def reservation_edit(request, reservation_id):
         action = request.POST.get('action')
 
         if action == 'delete':
+            events.publish('reservation_updated', reservation_id=reservation.id, status='deleted', date=str(reservation.date))
             reservation.delete()
             return redirect('reservation_list')
 
         if action == 'cancel':
             reservation.status = 'cancelled'
             reservation.save()
+            events.publish('reservation_updated', reservation_id=reservation.id, status=reservation.status, date=str(reservation.date))
             if reservation.order:
                 reservation.order.status = 'cancelled'
-                reservation.order.save(update_fields=['status'])
+                reservation.order.save(update_fields=['status', 'updated_at'])
+                events.publish('order_status', order_id=reservation.order.id, status='cancelled')
             return redirect('reservation_list')
 
         if action == 'no_show':
             reservation.status = 'no_show'
             reservation.save()
+            events.publish('reservation_updated', reservation_id=reservation.id, status=reservation.status, date=str(reservation.date))
             return redirect('reservation_list')
 
-        # 수정
+        # 수정 - 일시가 바뀌면 전날 안내를 새 일정으로 다시 보내도록 발송 상태 초기화
+        if (request.POST.get('date') != str(reservation.date)
+                or (request.POST.get('time') or '')[:5] != reservation.time.strftime('%H:%M')):
+            reservation.reminder_status = ''
+            reservation.reminded_at = None
         reservation.date = request.POST.get('date')
         reservation.time = request.POST.get('time')
         reservation.customer_name = request.POST.get('customer_name', '')
@@ -763,6 +856,7 @@ def reservation_edit(request, reservation_id):
         reservation.car_model = CarModel.objects.filter(id=model_id).first() if model_id else None
 
         reservation.save()
+        events.publish('reservation_updated', reservation_id=reservation.id, status=reservation.status, date=str(reservation.date))
 
         # 예약↔시공 상태 연동
         if reservation.order:
@@ -776,17 +870,18 @@ def reservation_edit(request, reservation_id):
                 reservation.order.status = mapped
                 if mapped == 'completed':
                     reservation.order.completed_at = timezone.now()
-                reservation.order.save(update_fields=['status'] + (['completed_at'] if mapped == 'completed' else []))
+                reservation.order.save(update_fields=['status', 'updated_at'] + (['completed_at'] if mapped == 'completed' else []))
+                events.publish('order_status', order_id=reservation.order.id, status=mapped)
 
         return redirect('reservation_list')
 
     # GET
-    brands, brands_data = _build_brands_data(include_generations=False)
+    snapshot = get_catalog_snapshot()
 
     context = {
         'reservation': reservation,
-        'brands': brands,
-        'brands_json': json.dumps(brands_data, ensure_ascii=False),
+        'brands': snapshot.brands,
+        'brands_json': snapshot.brands_flat_json,
         'oil_choices': [
             '이코노미 (DX5, GX5)',
             '스탠다드 (DX7)',
@@ -808,7 +903,7 @@ def check_reservation(request):
         return JsonResponse({'found': False})
 
     # 오늘 예약 중 매칭
-    today = date.today()
+    today = business_date()
     reservation = Reservation.objects.filter(
         customer_phone__endswith=phone[-8:],  # 뒤 8자리 매칭
         date=today,
@@ -872,71 +967,10 @@ def oil_price_management(request):
     if not selected_fuel:
         selected_fuel = fuel_types.first()
 
-    # 오일 제품 목록 (premium_hybrid 포함, 스태프용이라 is_visible 무시)
-    oil_products = list(OilProduct.objects.filter(is_active=True).order_by('order'))
-
-    # 해당 브랜드의 차종 (parent=None) + 세대(generations) prefetch
-    car_models = CarModel.objects.filter(
-        brand=selected_brand, parent=None
-    ).prefetch_related('generations').order_by('order', 'name')
-
-    # 세대 모델 ID 목록 수집
-    all_model_ids = []
-    for model in car_models:
-        gens = list(model.generations.all())
-        if gens:
-            all_model_ids.extend([g.id for g in gens])
-        else:
-            all_model_ids.append(model.id)
-
-    # OilPrice 벌크 쿼리
-    prices = OilPrice.objects.filter(
-        car_model_id__in=all_model_ids,
-        fuel_type=selected_fuel,
-    ).select_related('oil_product')
-
-    # price_map: {(model_id, product_id): price}
-    price_map = {}
-    for p in prices:
-        price_map[(p.car_model_id, p.oil_product_id)] = p.price
-
-    # 테이블 행 데이터 구성
-    rows = []
-    for model in car_models:
-        gens = list(model.generations.all())
-        if gens:
-            for gen in gens:
-                price_list = []
-                for op in oil_products:
-                    price_list.append({
-                        'product_id': op.id,
-                        'price': price_map.get((gen.id, op.id)),
-                    })
-                rows.append({
-                    'model_id': gen.id,
-                    'parent_id': model.id,
-                    'parent_name': model.name,
-                    'name': gen.name,
-                    'is_first_in_group': gen == gens[0],
-                    'group_size': len(gens),
-                    'prices': price_list,
-                })
-        else:
-            price_list = []
-            for op in oil_products:
-                price_list.append({
-                    'product_id': op.id,
-                    'price': price_map.get((model.id, op.id)),
-                })
-            rows.append({
-                'model_id': model.id,
-                'parent_id': None,
-                'parent_name': None,
-                'name': model.name,
-                'is_first_in_group': True,
-                'group_size': 1,
-                'prices': price_list,
-            })
+    # 차종(세대)×가격 피벗 (카탈로그·가격 버전별 캐시, 제품은 premium_hybrid 포함 전체 활성 제품)
+    pivot = price_pivot.get_pivot()
+    oil_products = pivot.products
+    rows = pivot.brand_rows(selected_brand.id, selected_fuel.id) if selected_brand and selected_fuel else []
 
     context = {
         'brands': brands,
@@ -949,6 +983,69 @@ def oil_price_management(request):
     return render(request, 'staff/oil_prices.html', context)
 
 
+@staff_required
+def oil_price_overview(request):
+    """오일 가격 전체 보기 - 전체 브랜드 × 전체 연료 피벗 (브랜드 구간을 스크롤하며 지연 로딩)"""
+    return render(request, 'staff/oil_prices_all.html')
+
+
+@staff_required
+@require_GET
+def oil_price_pivot(request):
+    """오일 가격 피벗 API - ?page=N (1페이지에 연료/제품/브랜드 목록 포함, next가 null이면 끝)"""
+    try:
+        number = int(request.GET.get('page', 1))
+    except ValueError:
+        number = 0
+    body = price_pivot.get_pivot().page(number)
+    if body is None:
+        return JsonResponse({'success': False, 'error': '페이지 범위 오류'}, status=404)
+    response = HttpResponse(body, content_type='application/json; charset=utf-8')
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+@staff_required
+@require_GET
+def oil_price_export(request):
+    """오일 가격 전체 다운로드 (?format=xlsx 단가표 | csv)"""
+    filename = f"quickoil_oil_prices_{business_date():%Y%m%d}"
+    if request.GET.get('format') == 'csv':
+        chunks, extension, content_type = price_sheet.csv_lines(), 'csv', 'text/csv; charset=utf-8'
+    else:
+        chunks, extension = price_sheet.xlsx_chunks(), 'xlsx'
+        content_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    response = StreamingHttpResponse(_stream_chunks(request, chunks), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{extension}"'
+    return response
+
+
+# ASGI 스트리밍 응답에서 스레드 왕복 1회에 넘기는 청크 수
+STREAM_BATCH = 100
+
+
+def _stream_chunks(request, chunks):
+    """
+    응답 본문 이터레이터 - ASGI에서는 비동기 이터레이터로 감싼다.
+    (동기 이터레이터를 주면 Django가 sync_to_async(list)로 전부 읽은 뒤에야 보내기 시작함)
+    """
+    if not isinstance(request, ASGIRequest):
+        return chunks
+    return _async_chunks(iter(chunks))
+
+
+async def _async_chunks(chunks):
+    # thread_sensitive(기본) → 같은 스레드에서 이어 읽으므로 DB 서버 측 커서도 그대로 사용
+    take = sync_to_async(lambda: list(islice(chunks, STREAM_BATCH)))
+    try:
+        while batch := await take():
+            for chunk in batch:
+                yield chunk
+    finally:
+        if hasattr(chunks, 'close'):
+            await sync_to_async(chunks.close)()
+
+
 @staff_required
 def service_management(request):
     """추가 서비스 관리 페이지"""
@@ -956,57 +1053,142 @@ def service_management(request):
     return render(request, 'staff/service_management.html', {'services': services})
 
 
+# 일괄 저장 한 번에 받는 최대 셀 수 / 셀 가격 상한
+OIL_PRICE_SAVE_MAX_CELLS = 5000
+OIL_PRICE_MAX = 10_000_000
+
+
+def _parse_id(value):
+    if isinstance(value, bool):
+        return None
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return None
+    return value if value > 0 else None
+
+
+def _parse_price_changes(changes):
+    """
+    변경 목록 검증 → (cells, results, 오류 여부)
+    cells: {(model_id, product_id, fuel_id): 가격 또는 None}, results: 입력 순서대로 셀별 결과
+    """
+    cells = {}
+    results = []
+    for item in changes:
+        if not isinstance(item, dict):
+            results.append({'status': 'error', 'error': '잘못된 항목'})
+            continue
+        key = tuple(_parse_id(item.get(field)) for field in ('model_id', 'product_id', 'fuel_id'))
+        result = {'model_id': key[0], 'product_id': key[1], 'fuel_id': key[2]}
+        results.append(result)
+        price = item.get('price')
+        if None in key:
+            result.update(status='error', error='차종/제품/연료 ID 오류')
+            continue
+        if key in cells:
+            result.update(status='error', error='같은 셀이 중복됨')
+            continue
+        if price is None or price == '':
+            price = None
+        else:
+            try:
+                price = None if isinstance(price, (bool, float)) else int(price)
+            except (TypeError, ValueError):
+                price = None
+            if price is None or not 0 < price <= OIL_PRICE_MAX:
+                result.update(status='error', error=f'가격은 1 ~ {OIL_PRICE_MAX:,} 사이 정수')
+                continue
+        cells[key] = price
+
+    # 참조 대상 존재 확인 (종류별 1쿼리)
+    valid = cells and {
+        0: set(CarModel.objects.filter(pk__in={k[0] for k in cells}).values_list('pk', flat=True)),
+        1: set(OilProduct.objects.filter(pk__in={k[1] for k in cells}).values_list('pk', flat=True)),
+        2: set(FuelType.objects.filter(pk__in={k[2] for k in cells}).values_list('pk', flat=True)),
+    }
+    for result in results:
+        if 'status' in result:
+            continue
+        key = (result['model_id'], result['product_id'], result['fuel_id'])
+        if not all(key[i] in valid[i] for i in range(3)):
+            result.update(status='error', error='없는 차종/제품/연료')
+    return cells, results, any(r.get('status') == 'error' for r in results)
+
+
+def _parse_effective_from(value):
+    """예약 적용 시각 (ISO 일시 또는 YYYY-MM-DD → 그날 0시). 비었거나 지난 시각이면 None(즉시 적용)"""
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'적용 시각 형식 오류: {value}')
+        parsed = datetime.combine(day, datetime.min.time())
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed if parsed > timezone.now() else None
+
+
 @staff_required
 @require_POST
 def oil_price_save(request):
-    """오일 가격 일괄 저장 API"""
+    """
+    오일 가격 일괄 저장 API
+    전체 변경을 먼저 검증하고(하나라도 오류면 아무것도 반영 안 함), 한 트랜잭션에서 묶음 반영한다.
+    응답의 version은 반영 후 가격 매트릭스 버전 (CacheVersion 테이블 값 - 워커/재시작과 무관, 클라이언트/캐시 무효화용).
+    effective_from이 미래면 현재 가격은 두고 예약 변경으로 등록한다 (activate_price_revisions가 반영).
+    """
     try:
         data = json.loads(request.body)
-        changes = data.get('changes', [])
-
-        created = 0
-        updated = 0
-        deleted = 0
-
-        for item in changes:
-            model_id = item.get('model_id')
-            product_id = item.get('product_id')
-            fuel_id = item.get('fuel_id')
-            price = item.get('price')
-
-            if not all([model_id, product_id, fuel_id]):
-                continue
+    except ValueError:
+        return JsonResponse({'success': False, 'error': '잘못된 요청 형식'}, status=400)
+    changes = data.get('changes') if isinstance(data, dict) else None
+    if not isinstance(changes, list):
+        return JsonResponse({'success': False, 'error': 'changes 목록이 필요합니다'}, status=400)
+    try:
+        effective_from = _parse_effective_from(data.get('effective_from'))
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    if len(changes) > OIL_PRICE_SAVE_MAX_CELLS:
+        return JsonResponse({
+            'success': False, 'error': f'한 번에 최대 {OIL_PRICE_SAVE_MAX_CELLS:,}셀까지 저장할 수 있습니다',
+        }, status=400)
 
-            if price is None or price == '':
-                # 빈 값이면 삭제
-                count, _ = OilPrice.objects.filter(
-                    car_model_id=model_id,
-                    oil_product_id=product_id,
-                    fuel_type_id=fuel_id,
-                ).delete()
-                if count:
-                    deleted += count
-            else:
-                price = int(price)
-                obj, was_created = OilPrice.objects.update_or_create(
-                    car_model_id=model_id,
-                    oil_product_id=product_id,
-                    fuel_type_id=fuel_id,
-                    defaults={'price': price},
-                )
-                if was_created:
-                    created += 1
-                else:
-                    updated += 1
+    cells, results, has_error = _parse_price_changes(changes)
+    if has_error:
+        errors = sum(1 for r in results if r.get('status') == 'error')
+        return JsonResponse({
+            'success': False, 'error': f'{errors}개 셀 오류 - 저장하지 않았습니다', 'results': results,
+        }, status=400)
 
+    if effective_from:
+        scheduled = price_history.schedule_oil(cells, effective_from)
+        for result in results:
+            result['status'] = 'scheduled'
         return JsonResponse({
             'success': True,
-            'created': created,
-            'updated': updated,
-            'deleted': deleted,
+            'scheduled': scheduled,
+            'effective_from': effective_from.isoformat(),
+            'version': get_version(pricing.VERSION_KEY, fresh=True),
+            'results': results,
         })
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+    with transaction.atomic():
+        stats = pricing.bulk_apply(cells)
+    for result in results:
+        result['status'] = stats['outcomes'][(result['model_id'], result['product_id'], result['fuel_id'])]
+
+    return JsonResponse({
+        'success': True,
+        'created': stats['created'],
+        'updated': stats['updated'],
+        'deleted': stats['deleted'],
+        'unchanged': stats['unchanged'],
+        'version': get_version(pricing.VERSION_KEY, fresh=True),
+        'results': results,
+    })
 
 
 @staff_required
@@ -1046,35 +1228,39 @@ def car_model_add(request):
 @staff_required
 @require_POST
 def car_model_delete(request, model_id):
-    """차종 삭제 API (가격도 함께 삭제)"""
+    """차종 삭제 API (가격도 함께 삭제, 가격 이력은 차종명과 함께 남김)"""
     try:
-        model = get_object_or_404(CarModel, id=model_id)
-
-        # 시공 주문에서 참조 중인지 확인
-        order_count = ServiceOrder.objects.filter(car_model=model).count()
-        if order_count > 0:
-            return JsonResponse({
-                'success': False,
-                'error': f'시공 주문 {order_count}건에서 사용 중이라 삭제할 수 없습니다.',
-            }, status=400)
-
-        # 세대 모델이면 세대만 삭제, 부모 모델이면 세대까지 모두 삭제
-        if model.parent is None:
-            # 자식 세대들도 주문 참조 확인
-            children = model.generations.all()
-            child_order_count = ServiceOrder.objects.filter(car_model__in=children).count()
-            if child_order_count > 0:
+        with transaction.atomic():
+            model = get_object_or_404(CarModel, id=model_id)
+
+            # 시공 주문에서 참조 중인지 확인
+            order_count = ServiceOrder.objects.filter(car_model=model).count()
+            if order_count > 0:
                 return JsonResponse({
                     'success': False,
-                    'error': f'하위 세대가 시공 주문 {child_order_count}건에서 사용 중입니다.',
+                    'error': f'시공 주문 {order_count}건에서 사용 중이라 삭제할 수 없습니다.',
                 }, status=400)
-            # 자식 가격 + 자식 모델 삭제
-            OilPrice.objects.filter(car_model__in=children).delete()
-            children.delete()
 
-        # 본인 가격 + 모델 삭제
-        OilPrice.objects.filter(car_model=model).delete()
-        model.delete()
+            # 세대 모델이면 세대만 삭제, 부모 모델이면 세대까지 모두 삭제
+            model_ids = [model.id]
+            if model.parent is None:
+                # 자식 세대들도 주문 참조 확인
+                children = model.generations.all()
+                child_order_count = ServiceOrder.objects.filter(car_model__in=children).count()
+                if child_order_count > 0:
+                    return JsonResponse({
+                        'success': False,
+                        'error': f'하위 세대가 시공 주문 {child_order_count}건에서 사용 중입니다.',
+                    }, status=400)
+                model_ids += list(children.values_list('id', flat=True))
+
+            # 가격은 일괄 반영으로 비움 → 삭제 이력 기록, 매트릭스 버전 1회 증가
+            keys = OilPrice.objects.filter(car_model_id__in=model_ids).values_list(
+                'car_model_id', 'oil_product_id', 'fuel_type_id',
+            )
+            pricing.bulk_apply(dict.fromkeys(keys))
+            CarModel.objects.filter(id__in=model_ids).exclude(id=model.id).delete()
+            model.delete()
 
         return JsonResponse({'success': True})
     except Exception as e:
@@ -1102,7 +1288,12 @@ def service_save(request):
             if 'description' in item:
                 svc.description = item['description']
             if 'price' in item:
-                svc.price = int(item['price'])
+                effective_from = _parse_effective_from(item.get('effective_from'))
+                if effective_from:
+                    # 예약 변경 - 현재 가격은 그대로
+                    price_history.schedule_service(svc.id, int(item['price']), effective_from)
+                else:
+                    svc.price = int(item['price'])
             if 'is_active' in item:
                 svc.is_active = bool(item['is_active'])
             svc.save()
@@ -1158,6 +1349,8 @@ def service_reorder(request):
         order_list = data.get('order', [])  # [{id, order}, ...]
         for item in order_list:
             AdditionalService.objects.filter(id=item['id']).update(order=item['order'])
+        # update()는 시그널이 없으므로 직접 버전 증가
+        transaction.on_commit(bump_service_version)
         return JsonResponse({'success': True})
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=400)